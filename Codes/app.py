@@ -3,29 +3,57 @@ AutoFillForm - Main Entry Point
 
 Migrated from V4: Tkinter -> PySide6, Selenium -> Playwright
 """
+import multiprocessing
 import os
 import sys
-from PySide6.QtWidgets import QApplication, QMainWindow
-from PySide6.QtCore import QSettings
 
 # Add parent directory to path for imports
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from utils.startup_trace import StartupTrace
+
+# Created first so spans are measured from (nearly) process start
+STARTUP_TRACE = StartupTrace()
+
+from PySide6.QtWidgets import QApplication, QMainWindow
+from PySide6.QtCore import QSettings, QTimer
+
 # Import version from main package
 import version as version_info
 
-from models import SurveyModel, RuleModel, HistoryModel
-from views import MainView, WorkflowView, HistoryView
-from controllers import MainController, WorkflowController, HistoryController
+from models import SurveyModel, RuleModel, HistoryModel, JobQueue
+from views import MainView, WorkflowView, RuleEditorView, HistoryView, QueueView
+from controllers import (MainController, WorkflowController, RuleEditorController,
+                         HistoryController, QueueController)
 from utils import GuiLogger
+from utils.import_warmup import start_import_warmup
+
+STARTUP_TRACE.mark("模块导入")
+
+# Delay after show() before heavy modules are imported in the background,
+# so the warm-up does not compete with the first paint
+IMPORT_WARMUP_DELAY_MS = 300
+
+
+def get_app_dir():
+    """Directory of the application (of the executable in frozen builds)."""
+    if getattr(sys, 'frozen', False):
+        return os.path.dirname(sys.executable)
+    return os.path.dirname(os.path.abspath(__file__))
 
 
 class AutoFillFormApp(QMainWindow):
     """Main application class with PySide6."""
 
-    def __init__(self):
-        """Initialize the application."""
+    def __init__(self, trace=STARTUP_TRACE):
+        """
+        Initialize the application.
+
+        Args:
+            trace (StartupTrace): Records the time taken by each component.
+        """
         super().__init__()
+        self.trace = trace
         self.setWindowTitle(version_info.__fullname__)
         self.resize(900, 700)
 
@@ -33,58 +61,60 @@ class AutoFillFormApp(QMainWindow):
         self.settings = QSettings(version_info.__title__, version_info.__legacy_version__)
 
         # Get the script directory
-        if getattr(sys, 'frozen', False):
-            self.script_dir = os.path.dirname(sys.executable)
-        else:
-            self.script_dir = os.path.dirname(os.path.abspath(__file__))
+        self.script_dir = get_app_dir()
 
         # Create logger
-        self.logger = GuiLogger(
-            name="AutoFillForm",
-            log_dir=os.path.join(self.script_dir, "history")
-        )
+        with trace.span("日志"):
+            self.logger = GuiLogger(
+                name="AutoFillForm",
+                log_dir=os.path.join(self.script_dir, "history")
+            )
 
         # Create models
-        self.models = {
-            'survey': SurveyModel(config_dir=os.path.join(self.script_dir, "history")),
-            'rule': RuleModel(rules_dir=os.path.join(self.script_dir, "rules")),
-            'history': HistoryModel(history_dir=os.path.join(self.script_dir, "history"))
-        }
+        with trace.span("数据模型"):
+            self.models = {
+                'survey': SurveyModel(config_dir=os.path.join(self.script_dir, "history")),
+                'rule': RuleModel(rules_dir=os.path.join(self.script_dir, "rules")),
+                'history': HistoryModel(history_dir=os.path.join(self.script_dir, "history")),
+                'job_queue': JobQueue(queue_dir=os.path.join(self.script_dir, "history")),
+            }
+            self.models['rule'].watch_rules_dir()
 
         # Create main view and set as central widget
-        self.main_view = MainView(self)
-        self.setCentralWidget(self.main_view)
+        with trace.span("主界面"):
+            self.main_view = MainView(self)
+            self.setCentralWidget(self.main_view)
 
-        # Create sub-views
-        self.views = {
-            'main': self.main_view,
-            'workflow': WorkflowView(self.main_view.get_workflow_widget()),
-            'history': HistoryView(self.main_view.get_history_widget())
-        }
+        # Create sub-views; the other tabs are built when first shown
+        with trace.span("工作流界面"):
+            self.views = {
+                'main': self.main_view,
+                'workflow': WorkflowView(self.main_view.get_workflow_widget()),
+            }
 
         # Create controllers
-        self.controllers = {
-            'workflow': WorkflowController(
-                self.models['survey'],
-                self.views['workflow'],
-                self.models['rule'],
-                self.models['history'],
-                self.logger
-            ),
-            'history': HistoryController(
-                self.models['survey'],
-                self.views['history'],
-                self.models['history']
-            )
-        }
+        with trace.span("工作流控制器"):
+            self.controllers = {
+                'workflow': WorkflowController(
+                    self.models['survey'],
+                    self.views['workflow'],
+                    self.models['rule'],
+                    self.models['history'],
+                    self.logger
+                ),
+            }
 
         # Create main controller
         self.main_controller = MainController(
             self,
             self.models,
             self.views,
-            self.controllers
+            self.controllers,
+            logger=self.logger
         )
+        self.main_view.set_tab_builder(self.main_view.get_rule_editor_widget(), self._build_rule_editor_tab)
+        self.main_view.set_tab_builder(self.main_view.get_history_widget(), self._build_history_tab)
+        self.main_view.set_tab_builder(self.main_view.get_queue_widget(), self._build_queue_tab)
 
         # Set initial status
         self.main_view.set_status(f"就绪 - {version_info.__fullname__}")
@@ -95,6 +125,48 @@ class AutoFillFormApp(QMainWindow):
         # Load window geometry if saved
         self._load_window_geometry()
 
+    def _build_rule_editor_tab(self):
+        """Create the rule editor view and controller on first activation of the tab."""
+        first_span = len(self.trace.spans)
+        with self.trace.span("规则编辑页"):
+            self.views['rule_editor'] = RuleEditorView(self.main_view.get_rule_editor_widget())
+            self.controllers['rule_editor'] = RuleEditorController(
+                self.models['survey'],
+                self.views['rule_editor'],
+                self.models['rule']
+            )
+        self.trace.report(self.logger.debug, start=first_span)
+
+    def _build_history_tab(self):
+        """Create the history view and controller on first activation of the tab."""
+        first_span = len(self.trace.spans)
+        with self.trace.span("历史记录页"):
+            self.views['history'] = HistoryView(self.main_view.get_history_widget())
+            self.controllers['history'] = HistoryController(
+                self.models['survey'],
+                self.views['history'],
+                self.models['history'],
+                self.models['job_queue']
+            )
+            self.main_controller.wire_history_controller()
+        self.trace.report(self.logger.debug, start=first_span)
+
+    def _build_queue_tab(self):
+        """Create the job queue view and controller on first activation of the tab."""
+        first_span = len(self.trace.spans)
+        with self.trace.span("任务队列页"):
+            self.views['queue'] = QueueView(self.main_view.get_queue_widget())
+            self.controllers['queue'] = QueueController(
+                self.models['survey'],
+                self.views['queue'],
+                self.models['job_queue'],
+                self.models['history'],
+                self.models['rule'],
+                self.logger
+            )
+            self.main_controller.wire_queue_controller()
+        self.trace.report(self.logger.debug, start=first_span)
+
     def _load_window_geometry(self):
         """Load and restore window geometry from QSettings."""
         geometry = self.settings.value("window_geometry")
@@ -106,34 +178,49 @@ class AutoFillFormApp(QMainWindow):
 
     def closeEvent(self, event):
         """Handle window closing event."""
+        # Use main controller's close handler; it may be cancelled
+        if not self.main_controller.on_closing():
+            event.ignore()
+            return
+
         # Save window geometry
         self.settings.setValue("window_geometry", self.saveGeometry())
-
-        # Use main controller's close handler
-        self.main_controller.on_closing()
         event.accept()
 
     def run(self):
         """Run the application main loop."""
         self.show()
+        self.trace.mark("窗口显示")
+        self.trace.report(self.logger.debug)
+        QTimer.singleShot(IMPORT_WARMUP_DELAY_MS,
+                          lambda: start_import_warmup(log_callback=self.logger.debug))
 
 
 def main():
     """Main entry point."""
+    # Required for sharded fill worker processes in frozen builds
+    multiprocessing.freeze_support()
+
     # Suppress harmless Qt DPI awareness warning on Windows
     os.environ.setdefault("QT_LOGGING_RULES", "qt.qpa.window=false")
 
-    app = QApplication(sys.argv)
-    app.setApplicationName("AutoFillForm")
-    app.setOrganizationName("AutoFillForm")
+    with STARTUP_TRACE.span("QApplication"):
+        app = QApplication(sys.argv)
+        app.setApplicationName("AutoFillForm")
+        app.setOrganizationName("AutoFillForm")
 
-    # Apply global dark theme
-    from views.styles import get_global_stylesheet
-    app.setStyleSheet(get_global_stylesheet())
+    # Apply global dark theme, rendered once and cached under history/
+    with STARTUP_TRACE.span("样式表"):
+        from views.styles import get_global_stylesheet
+        app.setStyleSheet(get_global_stylesheet(os.path.join(get_app_dir(), "history", "style_cache")))
 
     window = AutoFillFormApp()
     window.run()
 
+    # Used by tools/check_startup.py to time the first window
+    if os.environ.get("AUTOFILLFORM_EXIT_AFTER_SHOW"):
+        QTimer.singleShot(0, app.quit)
+
     sys.exit(app.exec())
 
 
@@ -1,6 +1,25 @@
 # Automation package
-from .form_filler import FormFiller
-from .verification import VerificationHandler
-from .browser_setup import BrowserSetup
+#
+# Exports are imported on first access so that importing one submodule does
+# not load the others (and, through them, Playwright or pyautogui).
+import importlib
 
-__all__ = ['FormFiller', 'VerificationHandler', 'BrowserSetup']
+_EXPORTS = {
+    'FormFiller': '.form_filler',
+    'VerificationHandler': '.verification',
+    'BrowserSetup': '.browser_setup',
+    'BrowserManager': '.browser_manager',
+    'FillRunner': '.fill_runner',
+    'ShardedFillRunner': '.sharded_runner',
+    'ShardError': '.sharded_runner',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
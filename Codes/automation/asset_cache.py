@@ -0,0 +1,273 @@
+"""
+Persistent on-disk cache for static survey assets.
+
+Every setup_browser call starts a fresh context, and enabling context.route
+disables the browser HTTP cache, so each run would otherwise re-download the
+same JS/CSS bundles. The cache serves them through context.route instead,
+keyed by URL and revalidated with the stored ETag/Last-Modified validators.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+
+
+class AssetCache:
+    """LRU, size-capped asset cache served through context.route."""
+
+    # Resource types worth caching (documents and XHR are always fetched)
+    CACHEABLE_TYPES = ("script", "stylesheet", "font", "image")
+
+    # Response headers replayed when serving from the cache
+    STORED_HEADERS = ("content-type", "cache-control", "etag", "last-modified",
+                      "access-control-allow-origin")
+
+    def __init__(self, cache_dir, max_bytes=100 * 1024 * 1024, read_only=False):
+        """
+        Initialize the asset cache.
+
+        Args:
+            cache_dir (str): Directory holding the cached bodies and index.
+            max_bytes (int): Size cap; least recently used entries are evicted
+                             once the cached bodies exceed it.
+            read_only (bool): Serve hits only and never write, for processes
+                              sharing the directory with a writer.
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.read_only = read_only
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index_file = os.path.join(cache_dir, "index.json")
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self._load_index()
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Reset the per-run counters."""
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.bytes_served = 0
+
+    def attach(self, context):
+        """
+        Install the cache on a browser context.
+
+        Args:
+            context: Playwright BrowserContext.
+        """
+        context.route("**/*", self._handle_route)
+
+    # --- Route handling ---
+
+    def _handle_route(self, route):
+        request = route.request
+        if request.method != "GET" or request.resource_type not in self.CACHEABLE_TYPES:
+            route.fallback()
+            return
+
+        url = request.url
+        entry = self._get_entry(url)
+        if entry is not None and entry["expires"] > time.time():
+            if self._fulfill_from_cache(route, url, entry):
+                with self._lock:
+                    self.hits += 1
+                return
+            entry = None
+
+        headers = dict(request.headers)
+        if entry is not None:
+            if entry.get("etag"):
+                headers["if-none-match"] = entry["etag"]
+            if entry.get("last_modified"):
+                headers["if-modified-since"] = entry["last_modified"]
+
+        try:
+            response = route.fetch(headers=headers)
+        except Exception:
+            route.fallback()
+            return
+
+        if response.status == 304 and entry is not None:
+            self._refresh_entry(url, response.headers)
+            if self._fulfill_from_cache(route, url, entry):
+                with self._lock:
+                    self.revalidated += 1
+                return
+            response = route.fetch()
+
+        body = response.body()
+        with self._lock:
+            self.misses += 1
+        if response.status == 200:
+            self._store(url, response.headers, body)
+        route.fulfill(response=response, body=body)
+
+    def _fulfill_from_cache(self, route, url, entry):
+        """Serve a cached body; returns False if the body file is gone."""
+        body = self._read_body(entry)
+        if body is None:
+            self._drop(url)
+            return False
+        with self._lock:
+            entry["last_access"] = time.time()
+            self._dirty = True
+            self.bytes_served += len(body)
+        route.fulfill(status=200, headers=entry["headers"], body=body)
+        return True
+
+    # --- Entries ---
+
+    @staticmethod
+    def _freshness_lifetime(headers):
+        """Seconds a response may be served without revalidation, or None if uncacheable."""
+        cache_control = headers.get("cache-control", "").lower()
+        if "no-store" in cache_control or "private" in cache_control:
+            return None
+        if "no-cache" in cache_control:
+            return 0
+        match = re.search(r"max-age=(\d+)", cache_control)
+        if match:
+            return int(match.group(1))
+        return 0
+
+    def _get_entry(self, url):
+        with self._lock:
+            return self.entries.get(url)
+
+    def _store(self, url, headers, body):
+        if self.read_only:
+            return
+        lifetime = self._freshness_lifetime(headers)
+        if lifetime is None or len(body) > self.max_bytes // 10:
+            return
+        if lifetime == 0 and not headers.get("etag") and not headers.get("last-modified"):
+            return  # Could neither be served fresh nor revalidated
+
+        file_name = hashlib.sha1(url.encode("utf-8")).hexdigest()
+        try:
+            with open(os.path.join(self.cache_dir, file_name), "wb") as file:
+                file.write(body)
+        except IOError:
+            return
+
+        now = time.time()
+        with self._lock:
+            self.entries[url] = {
+                "file": file_name,
+                "size": len(body),
+                "etag": headers.get("etag"),
+                "last_modified": headers.get("last-modified"),
+                "headers": {k: v for k, v in headers.items() if k in self.STORED_HEADERS},
+                "expires": now + lifetime,
+                "last_access": now,
+            }
+            self._dirty = True
+            self._evict_locked()
+
+    def _refresh_entry(self, url, headers):
+        lifetime = self._freshness_lifetime(headers) or 0
+        with self._lock:
+            entry = self.entries.get(url)
+            if entry is not None:
+                entry["expires"] = time.time() + lifetime
+                self._dirty = True
+
+    def _read_body(self, entry):
+        try:
+            with open(os.path.join(self.cache_dir, entry["file"]), "rb") as file:
+                return file.read()
+        except IOError:
+            return None
+
+    def _drop(self, url):
+        with self._lock:
+            entry = self.entries.pop(url, None)
+            self._dirty = True
+        if entry is not None and not self.read_only:
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+
+    def _evict_locked(self):
+        """Evict least recently used entries until the size cap holds."""
+        total = sum(e["size"] for e in self.entries.values())
+        if total <= self.max_bytes:
+            return
+        for url, entry in sorted(self.entries.items(), key=lambda kv: kv[1]["last_access"]):
+            if total <= self.max_bytes:
+                break
+            del self.entries[url]
+            total -= entry["size"]
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+
+    def total_bytes(self):
+        """Total size of the cached bodies."""
+        with self._lock:
+            return sum(e["size"] for e in self.entries.values())
+
+    # --- Persistence ---
+
+    def _load_index(self):
+        entries = {}
+        if os.path.exists(self.index_file):
+            try:
+                with open(self.index_file, "r", encoding="utf-8") as file:
+                    entries = json.load(file)
+            except (json.JSONDecodeError, IOError):
+                entries = {}
+
+        if not self.read_only:
+            # Bodies written after the last flush (e.g. before a crash) are unindexed
+            known = {e["file"] for e in entries.values()}
+            for name in os.listdir(self.cache_dir):
+                if name not in known and not name.startswith("index.json"):
+                    try:
+                        os.remove(os.path.join(self.cache_dir, name))
+                    except OSError:
+                        pass
+        return entries
+
+    def flush(self):
+        """Write the index to disk if it changed."""
+        if self.read_only:
+            return
+        with self._lock:
+            if not self._dirty:
+                return
+            data = json.dumps(self.entries, ensure_ascii=False)
+            self._dirty = False
+        tmp_file = self.index_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                file.write(data)
+            os.replace(tmp_file, self.index_file)
+        except IOError as e:
+            print(f"Error saving asset cache index: {e}")
+
+    def clear(self):
+        """Remove all cached assets."""
+        with self._lock:
+            entries, self.entries = self.entries, {}
+            self._dirty = True
+        for entry in entries.values():
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                pass
+        self.flush()
+
+    def format_stats(self):
+        """Format the counters as a one-line log message."""
+        with self._lock:
+            hits, revalidated, misses = self.hits, self.revalidated, self.misses
+            served = self.bytes_served
+        return (f"资源缓存: 命中 {hits}，验证后复用 {revalidated}，未命中 {misses}，"
+                f"本地提供 {served / 1024:.1f} KB")
@@ -0,0 +1,327 @@
+"""
+Shared Playwright driver and browsers with speculative warm-up.
+
+Playwright's sync API is bound to the thread that started it, so a driver
+and browser started ahead of time can only be used by code running on the
+same thread. BrowserManager owns one such thread and one driver on it.
+Analysis and fill tasks are submitted to the thread and get isolated
+contexts from shared browser processes (one per headless mode and channel)
+instead of each starting its own driver and Chromium. Browsers are
+reference-counted by their open contexts; an unused browser is kept for a
+while so the next task skips the cold start, then closed.
+"""
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import Future
+
+
+def _driver_pid(playwright_instance):
+    """PID of a Playwright driver process, or None if it cannot be found."""
+    # Not public API; only used to kill a driver that does not stop in time
+    try:
+        return playwright_instance._impl_obj._connection._transport._proc.pid
+    except AttributeError:
+        return None
+
+
+class _BrowserEntry:
+    """A shared browser process and the contexts open on it."""
+
+    __slots__ = ('browser', 'contexts', 'idle_until')
+
+    def __init__(self, browser):
+        self.browser = browser
+        self.contexts = set()
+        self.idle_until = None
+
+
+class BrowserManager:
+    """Runs browser tasks on a dedicated thread and shares one driver and its browsers."""
+
+    # Seconds an unused browser (or driver without browsers) is kept
+    WARM_UP_TTL = 120.0
+
+    def __init__(self, log_callback=None, warm_up_ttl=None):
+        """
+        Initialize the browser manager.
+
+        Args:
+            log_callback (callable): Optional callback for log messages.
+            warm_up_ttl (float): Seconds an unused browser is kept.
+                                 Defaults to WARM_UP_TTL.
+        """
+        self.log_callback = log_callback or (lambda msg: None)
+        self.warm_up_ttl = warm_up_ttl if warm_up_ttl is not None else self.WARM_UP_TTL
+        self._tasks = queue.Queue()
+        self._thread = None
+        self._thread_lock = threading.Lock()
+        # Owner-thread state
+        self._driver = None
+        self._driver_pid = None
+        self._driver_idle_until = None
+        self._browsers = {}  # (headless, channel) -> _BrowserEntry
+        self._warm_pending = False
+
+    # --- Task submission (any thread) ---
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        Run fn(*args, **kwargs) on the owner thread.
+
+        Returns:
+            Future: Resolves to fn's return value or exception.
+        """
+        future = Future()
+        self._ensure_thread()
+        self._tasks.put((future, fn, args, kwargs))
+        return future
+
+    def call(self, fn, *args, **kwargs):
+        """Run fn on the owner thread and wait for its result."""
+        if self.on_owner_thread():
+            return fn(*args, **kwargs)
+        return self.submit(fn, *args, **kwargs).result()
+
+    def on_owner_thread(self):
+        """Whether the calling thread is the owner thread."""
+        return threading.current_thread() is self._thread
+
+    def is_running(self):
+        """Whether the owner thread is running."""
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def _ensure_thread(self):
+        with self._thread_lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="playwright-owner", daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            timeout = None
+            deadline = self._next_expiry()
+            if deadline is not None:
+                timeout = max(0.0, deadline - time.monotonic())
+            try:
+                task = self._tasks.get(timeout=timeout)
+            except queue.Empty:
+                self._close_idle(time.monotonic())
+                continue
+            if task is None:
+                self.close_all()
+                return
+            future, fn, args, kwargs = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(fn(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+    # --- Warm-up ---
+
+    def warm_up(self, headless=True, channel="auto", launch_browser=True):
+        """
+        Start the driver, and optionally a browser, in the background.
+
+        Does nothing if a warm-up is pending.
+
+        Args:
+            headless (bool): Mode of the browser the next task is expected to need.
+            channel: Browser channel (see BrowserSetup.setup_browser), or a
+                     callable returning it, called on the owner thread so
+                     that a slow lookup does not block the caller.
+            launch_browser (bool): Also launch the browser. A visible browser
+                                   should not be opened speculatively, so
+                                   callers expecting a headed task only
+                                   warm the driver.
+        """
+        if self._warm_pending:
+            return
+        self._warm_pending = True
+        self.submit(self._warm_up, headless, channel, launch_browser)
+
+    def _warm_up(self, headless, channel, launch_browser):
+        self._warm_pending = False
+        if callable(channel):
+            channel = channel()
+        if self._driver is not None and (not launch_browser or (headless, channel) in self._browsers):
+            return
+        started = time.perf_counter()
+        try:
+            self._get_driver()
+            if launch_browser:
+                self._get_browser(headless, channel)
+        except Exception as e:
+            self.log_callback(f"浏览器预热失败: {e}")
+            return
+        self._mark_idle()
+        self.log_callback(f"浏览器已预热，耗时 {time.perf_counter() - started:.1f} 秒")
+
+    # --- Owner-thread API ---
+
+    def new_context(self, headless=False, channel="auto", resource_policy=None,
+                    asset_cache=None, har_archive=None):
+        """
+        Open an isolated context on a shared browser.
+
+        Launches the driver and a browser of the requested mode if none is
+        running. Must be called on the owner thread, i.e. from a submitted
+        task. Each context must be given back with release().
+
+        Args:
+            headless (bool): Whether the browser runs headless.
+            channel: Browser channel (see BrowserSetup.setup_browser).
+            resource_policy: Optional ResourcePolicy (see BrowserSetup.setup_browser).
+            asset_cache: Optional AssetCache (see BrowserSetup.setup_browser).
+            har_archive: Optional HarArchive (see BrowserSetup.setup_browser).
+
+        Returns:
+            tuple: (context, page)
+        """
+        from automation.browser_setup import BrowserSetup
+
+        entry = self._get_browser(headless, channel)
+        context, page = BrowserSetup.new_context(entry.browser, resource_policy=resource_policy,
+                                                 asset_cache=asset_cache, har_archive=har_archive)
+        entry.contexts.add(context)
+        entry.idle_until = None
+        self._driver_idle_until = None
+        return context, page
+
+    def release(self, context):
+        """
+        Close a context from new_context() and drop its browser reference.
+
+        The browser stays open for warm_up_ttl seconds after its last
+        context is released. Must be called on the owner thread.
+        """
+        try:
+            context.close()
+        except Exception:
+            pass
+        for entry in self._browsers.values():
+            if context in entry.contexts:
+                entry.contexts.discard(context)
+                if not entry.contexts:
+                    entry.idle_until = time.monotonic() + self.warm_up_ttl
+                break
+
+    def _get_driver(self):
+        from automation.browser_setup import BrowserSetup
+
+        if self._driver is None:
+            self._driver = BrowserSetup.start_driver()
+            self._driver_pid = _driver_pid(self._driver)
+        return self._driver
+
+    def _get_browser(self, headless, channel):
+        from automation.browser_setup import BrowserSetup
+
+        key = (headless, channel)
+        entry = self._browsers.get(key)
+        if entry is not None and not entry.browser.is_connected():
+            # Crashed or closed by the user; its contexts are gone too
+            del self._browsers[key]
+            entry = None
+        if entry is None:
+            browser = BrowserSetup.launch_browser(self._get_driver(), headless=headless, channel=channel)
+            entry = self._browsers[key] = _BrowserEntry(browser)
+        return entry
+
+    def _mark_idle(self):
+        """Start the expiry clock of everything not in use."""
+        expires = time.monotonic() + self.warm_up_ttl
+        for entry in self._browsers.values():
+            if not entry.contexts:
+                entry.idle_until = expires
+        if not self._browsers:
+            self._driver_idle_until = expires
+
+    def _next_expiry(self):
+        deadlines = [entry.idle_until for entry in self._browsers.values()
+                     if entry.idle_until is not None]
+        if self._driver_idle_until is not None:
+            deadlines.append(self._driver_idle_until)
+        return min(deadlines) if deadlines else None
+
+    def _close_idle(self, now):
+        """Close browsers unused past their expiry, then the driver once none remain."""
+        for key, entry in list(self._browsers.items()):
+            if entry.idle_until is not None and entry.idle_until <= now:
+                del self._browsers[key]
+                self._close_browser(entry)
+                self.log_callback("空闲的浏览器已关闭")
+        if self._browsers or self._driver is None:
+            return
+        if self._driver_idle_until is None:
+            self._driver_idle_until = now + self.warm_up_ttl
+        elif self._driver_idle_until <= now:
+            self._stop_driver()
+
+    def close_all(self):
+        """
+        Close every context, browser and the driver.
+
+        Must be called on the owner thread; shutdown() does so.
+        """
+        for entry in self._browsers.values():
+            self._close_browser(entry)
+        self._browsers.clear()
+        self._stop_driver()
+
+    @staticmethod
+    def _close_browser(entry):
+        for context in entry.contexts:
+            try:
+                context.close()
+            except Exception:
+                pass
+        entry.contexts.clear()
+        try:
+            entry.browser.close()
+        except Exception:
+            pass
+
+    def _stop_driver(self):
+        driver, self._driver, self._driver_idle_until = self._driver, None, None
+        self._driver_pid = None
+        if driver is not None:
+            try:
+                driver.stop()
+            except Exception:
+                pass
+
+    # --- Lifecycle ---
+
+    def shutdown(self, timeout=5.0):
+        """
+        Close all browsers and the driver, and stop the owner thread.
+
+        Tasks already queued run first; waits at most timeout seconds.
+        """
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+        self._tasks.put(None)
+        thread.join(timeout)
+
+    def kill(self):
+        """
+        Kill the driver process, e.g. when shutdown() did not finish in time.
+
+        Safe to call from any thread. Browsers exit with the driver, as
+        they are connected to it through a pipe; a task still running on
+        the owner thread fails with a connection error.
+        """
+        pid = self._driver_pid
+        if pid is None:
+            return
+        try:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        except OSError:
+            pass  # Already exited
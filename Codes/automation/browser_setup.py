@@ -6,7 +6,6 @@ import os
 import platform
 import subprocess
 import shutil
-from playwright.sync_api import sync_playwright, Browser, BrowserContext, Page
 
 
 class BrowserSetup:
@@ -75,25 +74,34 @@ class BrowserSetup:
             )
 
     @staticmethod
-    def setup_browser(headless=False, channel="auto"):
+    def start_driver():
         """
-        Setup browser with anti-detection measures using Playwright.
+        Start the Playwright driver.
+
+        Returns:
+            Playwright: The started Playwright instance; must be used and
+                        stopped on the thread that started it.
+        """
+        # Imported here so that importing this module does not load Playwright
+        from playwright.sync_api import sync_playwright
+        return sync_playwright().start()
+
+    @staticmethod
+    def launch_browser(playwright_instance, headless=False, channel="auto"):
+        """
+        Launch a browser with anti-detection arguments.
 
         Args:
+            playwright_instance: Started Playwright instance.
             headless (bool): Whether to run in headless mode.
-            channel: Browser channel to use.
-                     "auto" - auto-detect (Edge -> Chrome -> built-in Chromium)
-                     "msedge" / "chrome" - use the specified browser
-                     None - use Playwright built-in Chromium
+            channel: Browser channel to use (see setup_browser).
 
         Returns:
-            tuple: (playwright_instance, browser, context, page) - Playwright instance, browser, context, and page.
+            Browser: The launched browser.
         """
         if channel == "auto":
             channel = BrowserSetup._detect_channel()
 
-        playwright_instance = sync_playwright().start()
-
         launch_kwargs = dict(
             headless=headless,
             args=['--disable-blink-features=AutomationControlled'],
@@ -102,15 +110,57 @@ class BrowserSetup:
             launch_kwargs["channel"] = channel
 
         try:
-            browser = playwright_instance.chromium.launch(**launch_kwargs)
+            return playwright_instance.chromium.launch(**launch_kwargs)
         except Exception as e:
             if "Executable doesn't exist" in str(e) and channel is None:
                 # Built-in Chromium not installed — download it automatically
                 BrowserSetup._ensure_playwright_browsers()
-                browser = playwright_instance.chromium.launch(**launch_kwargs)
-            else:
-                raise
+                return playwright_instance.chromium.launch(**launch_kwargs)
+            raise
+
+    @staticmethod
+    def setup_browser(headless=False, channel="auto", resource_policy=None,
+                      asset_cache=None, har_archive=None):
+        """
+        Setup browser with anti-detection measures using Playwright.
+
+        Args:
+            headless (bool): Whether to run in headless mode.
+            channel: Browser channel to use.
+                     "auto" - auto-detect (Edge -> Chrome -> built-in Chromium);
+                              callers with an EnvironmentProbe pass its
+                              cached result instead
+                     "msedge" / "chrome" - use the specified browser
+                     None - use Playwright built-in Chromium
+            resource_policy: Optional ResourcePolicy installed on the context
+                             to block requests the run does not need.
+            asset_cache: Optional AssetCache serving static assets from disk.
+            har_archive: Optional HarArchive recording the session's traffic
+                         or replaying it offline.
+
+        Returns:
+            tuple: (playwright_instance, browser, context, page) - Playwright instance, browser, context, and page.
+        """
+        playwright_instance = BrowserSetup.start_driver()
+        browser = BrowserSetup.launch_browser(playwright_instance, headless=headless, channel=channel)
+        context, page = BrowserSetup.new_context(browser, resource_policy=resource_policy,
+                                                 asset_cache=asset_cache, har_archive=har_archive)
+        return playwright_instance, browser, context, page
+
+    @staticmethod
+    def new_context(browser, resource_policy=None, asset_cache=None, har_archive=None):
+        """
+        Create an isolated context with anti-detection settings and a first page.
+
+        Args:
+            browser: Launched Browser.
+            resource_policy: Optional ResourcePolicy (see setup_browser).
+            asset_cache: Optional AssetCache (see setup_browser).
+            har_archive: Optional HarArchive (see setup_browser).
 
+        Returns:
+            tuple: (context, page)
+        """
         # Generic Chrome user-agent (no Edg/ suffix)
         user_agent = (
             'Mozilla/5.0 (Windows NT 10.0; Win64; x64) '
@@ -119,10 +169,12 @@ class BrowserSetup:
         )
 
         # Create context with anti-detection settings
+        context_options = har_archive.context_options() if har_archive is not None else {}
         context = browser.new_context(
             viewport={'width': 1920, 'height': 1080},
             user_agent=user_agent,
-            locale='zh-CN'
+            locale='zh-CN',
+            **context_options
         )
 
         # Anti-detection scripts
@@ -156,31 +208,31 @@ class BrowserSetup:
             });
         """)
 
-        page = context.new_page()
-        page.set_default_timeout(10000)
-        page.set_default_navigation_timeout(30000)
+        # Routes run last-registered first: the policy blocks before the cache
+        # fetches, and both fall back to the HAR replay route
+        if har_archive is not None:
+            har_archive.attach(context)
+        if asset_cache is not None:
+            asset_cache.attach(context)
+        if resource_policy is not None:
+            resource_policy.attach(context)
 
-        return playwright_instance, browser, context, page
+        page = BrowserSetup.new_page(context)
+
+        return context, page
 
     @staticmethod
-    def setup_browser_for_fill(channel="auto"):
+    def new_page(context):
         """
-        Setup browser specifically for form filling (non-headless).
+        Open a new page in a context with the default timeouts.
 
         Args:
-            channel: Browser channel to use (see setup_browser).
+            context: Playwright BrowserContext.
 
         Returns:
-            tuple: (playwright_instance, browser, context, page) - Playwright instance, browser, context, and page.
+            Page: The new page.
         """
-        return BrowserSetup.setup_browser(headless=False, channel=channel)
-
-    @staticmethod
-    def setup_browser_for_analysis():
-        """
-        Setup browser for survey analysis (headless).
-
-        Returns:
-            tuple: (playwright_instance, browser, context, page) - Playwright instance, browser, context, and page.
-        """
-        return BrowserSetup.setup_browser(headless=True)
+        page = context.new_page()
+        page.set_default_timeout(10000)
+        page.set_default_navigation_timeout(30000)
+        return page
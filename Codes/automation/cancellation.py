@@ -0,0 +1,81 @@
+"""
+Cooperative cancellation of fill runs.
+
+Playwright's sync API blocks the calling thread for the whole duration of a
+wait, and its objects cannot be touched from another thread to abort one.
+Long waits are therefore split into short slices, with the stop event
+checked between them, so a stop request takes effect within about one slice
+instead of after the full timeout.
+"""
+import time
+
+
+# Milliseconds of a single wait slice; bounds the stop latency
+POLL_SLICE_MS = 200
+
+
+class FillCancelled(Exception):
+    """Raised inside a fill when its run has been asked to stop."""
+
+
+def check_stopped(stop_event):
+    """
+    Raise FillCancelled if stop_event is set.
+
+    Args:
+        stop_event: threading.Event or multiprocessing.Event, or None.
+    """
+    if stop_event is not None and stop_event.is_set():
+        raise FillCancelled()
+
+
+def interruptible_sleep(seconds, stop_event=None):
+    """
+    Sleep, waking up early if stop_event is set.
+
+    Args:
+        seconds (float): Time to sleep.
+        stop_event: Optional event interrupting the sleep.
+
+    Raises:
+        FillCancelled: If stop_event is set before or during the sleep.
+    """
+    if stop_event is None:
+        time.sleep(seconds)
+    elif stop_event.wait(seconds):
+        raise FillCancelled()
+
+
+def wait_sliced(wait, timeout_ms, stop_event=None, slice_ms=POLL_SLICE_MS):
+    """
+    Run a Playwright wait in slices until it succeeds or times out.
+
+    Args:
+        wait (callable): Called with a slice timeout in milliseconds; must
+                         raise Playwright's TimeoutError when the slice
+                         expires. Other exceptions propagate.
+        timeout_ms (float): Total time to wait in milliseconds.
+        stop_event: Optional event checked between slices.
+        slice_ms (float): Length of a slice in milliseconds.
+
+    Returns:
+        bool: True if wait succeeded, False if the total timeout expired.
+
+    Raises:
+        FillCancelled: If stop_event is set before the wait succeeds.
+    """
+    from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+
+    if stop_event is None:
+        slice_ms = timeout_ms
+    deadline = time.monotonic() + timeout_ms / 1000
+    while True:
+        check_stopped(stop_event)
+        remaining_ms = (deadline - time.monotonic()) * 1000
+        if remaining_ms <= 0:
+            return False
+        try:
+            wait(min(slice_ms, remaining_ms))
+            return True
+        except PlaywrightTimeoutError:
+            continue
@@ -0,0 +1,377 @@
+"""
+Per-form fill loop shared by the GUI worker thread and shard worker processes.
+"""
+import random
+import time
+from tools.url_change_judge import wait_for_url_change
+from automation.cancellation import FillCancelled, check_stopped, wait_sliced
+from automation.form_filler import FormFiller
+from automation.preflight import probe_rule_selectors
+
+
+def new_run_seed():
+    """Create a fresh seed for a fill run."""
+    return random.SystemRandom().randrange(2 ** 32)
+
+
+def summarize_timings(results):
+    """
+    Average the per-phase timings of fill results.
+
+    Args:
+        results (list): Result dicts returned by FillRunner.
+
+    Returns:
+        dict: Phase name -> average seconds, for phases present in results.
+    """
+    totals = {}
+    counts = {}
+    for result in results:
+        for phase, seconds in result.get("timings", {}).items():
+            totals[phase] = totals.get(phase, 0.0) + seconds
+            counts[phase] = counts.get(phase, 0) + 1
+    return {phase: round(totals[phase] / counts[phase], 3) for phase in totals}
+
+
+def form_rng(run_seed, form_index):
+    """
+    Create the RNG stream for one form of a run.
+
+    Each form gets its own stream derived from the run seed, so the answers
+    of form N do not depend on which process or in which order it was filled.
+
+    Args:
+        run_seed (int): Seed of the whole run.
+        form_index (int): 1-based index of the form in the run.
+
+    Returns:
+        random.Random: Seeded random generator.
+    """
+    return random.Random(f"{run_seed}:{form_index}")
+
+
+class FillRunner:
+    """Fills and submits forms one after another on a single page."""
+
+    # Milliseconds to wait for a survey page to become ready
+    NAVIGATION_TIMEOUT = 30000
+
+    # Milliseconds to wait for the page to leave the survey after submitting
+    # before treating the form as stopped by a verification challenge
+    SUBMIT_TIMEOUT = 5000
+
+    def __init__(self, url, rules, fill_count, run_seed, topics=None, log_callback=None,
+                 stop_event=None, verification_handler=None, delay=0.2, har_archive=None):
+        """
+        Initialize the fill runner.
+
+        Args:
+            url (str): Survey URL.
+            rules (list): Rule dicts with configured probabilities.
+            fill_count (int): Total number of forms in the run (for log messages).
+            run_seed (int): Seed the per-form RNG streams are derived from.
+            topics (list): Optional survey topic numbers of the rules (see
+                           FormFiller.fill_questions).
+            log_callback (callable): Optional callback for logging.
+            stop_event (threading.Event): Optional event that stops the run.
+                                          Waits inside a form are interrupted
+                                          too, abandoning that form.
+            verification_handler: Optional VerificationHandler. Without one,
+                                  a verification challenge marks the form as
+                                  unverified instead of being handled.
+            delay (float): Delay in seconds between questions.
+            har_archive (HarArchive): Optional archive the page's context
+                                      replays from; a submit answered by its
+                                      stub counts as submitted.
+        """
+        self.url = url
+        self.rules = rules
+        self.fill_count = fill_count
+        self.run_seed = run_seed
+        self.topics = topics
+        self.log_callback = log_callback or (lambda msg: None)
+        self.stop_event = stop_event
+        self.verification_handler = verification_handler
+        self.delay = delay
+        self.har_archive = har_archive if har_archive is not None and har_archive.replaying else None
+        self.form_filler = FormFiller(log_callback=self.log_callback, stop_event=stop_event)
+        self.window_title = None
+        self._selectors_probed = False
+
+    def log(self, message):
+        """Log a message using the callback if available."""
+        self.log_callback(message)
+
+    def is_stopped(self):
+        """Check whether the run has been asked to stop."""
+        return self.stop_event is not None and self.stop_event.is_set()
+
+    def run(self, page, form_indices, on_result=None):
+        """
+        Fill the given forms on a page.
+
+        Args:
+            page: Playwright Page instance.
+            form_indices (iterable): 1-based form indices to fill.
+            on_result (callable): Optional callback receiving each result dict.
+
+        Returns:
+            list: Result dicts of the forms that were attempted.
+        """
+        results = []
+        for form_index in form_indices:
+            if self.is_stopped():
+                break
+            try:
+                result = self.fill_one(page, form_index)
+            except FillCancelled:
+                self.abort((page,), form_index)
+                break
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+    def run_pipelined(self, pages, form_indices, on_result=None):
+        """
+        Fill the given forms alternating between two pages.
+
+        While one page is being filled and submitted, the other one already
+        navigates to the survey, so navigation latency overlaps with the
+        fill and submit wait of the previous form.
+
+        Args:
+            pages (tuple): Two Playwright Page instances of the same context.
+            form_indices (iterable): 1-based form indices to fill.
+            on_result (callable): Optional callback receiving each result dict.
+
+        Returns:
+            list: Result dicts of the forms that were attempted.
+        """
+        form_indices = list(form_indices)
+        results = []
+        if not form_indices:
+            return results
+
+        self.log(f"预加载模式: 使用 {len(pages)} 个页面交替填写")
+        self.preload(pages[0])
+        for n, form_index in enumerate(form_indices):
+            if self.is_stopped():
+                break
+            page = pages[n % 2]
+            next_page = pages[(n + 1) % 2]
+            has_next = n + 1 < len(form_indices)
+            try:
+                result = self.fill_one(
+                    page, form_index, preloaded=True,
+                    before_fill=(lambda p=next_page: self.preload(p)) if has_next else None,
+                )
+            except FillCancelled:
+                self.abort(pages, form_index)
+                break
+            results.append(result)
+            if on_result:
+                on_result(result)
+        return results
+
+    def preload(self, page):
+        """
+        Start navigating a page to the survey without waiting for it.
+
+        The current document is tagged first so wait_preloaded can tell the
+        old document from the freshly loaded one.
+        """
+        page.evaluate(
+            """url => {
+                document.documentElement.setAttribute('data-af-stale', '1');
+                window.location.href = url;
+            }""",
+            self.url,
+        )
+
+    def abort(self, pages, form_index):
+        """Stop any navigation in progress on the pages after a cancelled form."""
+        for page in pages:
+            try:
+                page.evaluate("window.stop()")
+            except Exception:
+                pass  # The page is closed with its context anyway
+        self.log(f"已中断第{form_index}份问卷")
+
+    def wait_preloaded(self, page):
+        """
+        Wait until a page started with preload has the survey DOM ready.
+
+        Raises:
+            FillCancelled: If the run is stopped during the wait.
+            RuntimeError: If the page fails to load or does not become ready in time.
+        """
+        def wait(slice_ms):
+            if page.url.startswith("chrome-error://"):
+                raise RuntimeError(f"无法打开问卷页面: {self.url}")
+            page.wait_for_selector(
+                'html:not([data-af-stale]) #divQuestion',
+                state='attached',
+                timeout=slice_ms,
+            )
+
+        if not wait_sliced(wait, self.NAVIGATION_TIMEOUT, self.stop_event):
+            raise RuntimeError(f"打开问卷页面超时: {self.url}")
+        page.wait_for_load_state("domcontentloaded")
+
+    def fill_one(self, page, form_index, preloaded=False, before_fill=None):
+        """
+        Open, fill and submit a single form.
+
+        Args:
+            page: Playwright Page instance.
+            form_index (int): 1-based index of the form in the run.
+            preloaded (bool): Whether navigation was already started with
+                              preload; only waits for it to finish.
+            before_fill (callable): Optional hook run once the page is ready,
+                                    before filling starts.
+
+        Returns:
+            dict: Result with index, status ("submitted", "failed",
+                  "unverified" or "interrupted" if stopped after submitting),
+                  duration in seconds and per-phase timings.
+
+        Raises:
+            PreflightError: If the first opened page lacks elements the rules address.
+            FillCancelled: If the run is stopped while the form is in progress.
+        """
+        started = time.perf_counter()
+        timings = {}
+        progress = f"({form_index}/{self.fill_count})"
+
+        self.log(f"正在打开网页... {progress}")
+        if not preloaded:
+            # Navigate without blocking so that a stop request can abandon
+            # the load between wait slices instead of after page.goto returns
+            try:
+                self.preload(page)
+            except Exception:
+                # The previous document is still being replaced (e.g. the
+                # page after submitting); navigate once it has committed
+                page.goto(self.url, wait_until="commit")
+        self.wait_preloaded(page)
+        phase_started = self._lap(timings, "navigate", started)
+
+        if self.window_title is None:
+            self.window_title = page.title()
+
+        if not self._selectors_probed:
+            # Once per run: a rule/survey mismatch fails here instead of as a
+            # locator timeout in the middle of filling
+            probe_rule_selectors(page, self.rules, self.topics)
+            self._selectors_probed = True
+
+        if before_fill:
+            before_fill()
+
+        self.log(f"填写问题... {progress}")
+        self.form_filler.rng = form_rng(self.run_seed, form_index)
+        success = self.form_filler.fill_questions(page, self.rules, delay=self.delay,
+                                                  topics=self.topics)
+        phase_started = self._lap(timings, "fill", phase_started)
+
+        if not success:
+            self.log(f"第{form_index}份问卷填写时出现问题")
+            return self._result(form_index, "failed", started, timings)
+
+        # Submit form
+        check_stopped(self.stop_event)
+        stubbed_before = self.har_archive.submission_count(page) if self.har_archive else 0
+        page.locator('.submitbtn').click()
+        self.log(f"提交问卷... {progress}")
+
+        # Check for verification
+        status = "submitted"
+        try:
+            if self.har_archive is not None:
+                # Replayed pages need not navigate after the stubbed submit
+                if not self._wait_for_stubbed_submit(page, stubbed_before):
+                    status = "unverified"
+            elif not wait_for_url_change(page, self.url, timeout=self.SUBMIT_TIMEOUT,
+                                         stop_event=self.stop_event):
+                self.log(f"触发了验证... {progress}")
+                if preloaded:
+                    page.bring_to_front()
+                if self.verification_handler is None or \
+                        not self._handle_verification(page, form_index):
+                    status = "unverified"
+        except FillCancelled:
+            # Already submitted: record the form so a resumed run does not
+            # submit it again, then let the run loop stop
+            status = "interrupted"
+        self._lap(timings, "submit", phase_started)
+
+        return self._result(form_index, status, started, timings)
+
+    def _wait_for_stubbed_submit(self, page, count_before):
+        """
+        Wait until the replay stub has answered a submit of the page.
+
+        Returns:
+            bool: True if the stub answered within SUBMIT_TIMEOUT.
+
+        Raises:
+            FillCancelled: If the run is stopped while waiting.
+        """
+        deadline = time.monotonic() + self.SUBMIT_TIMEOUT / 1000
+        while self.har_archive.submission_count(page) == count_before:
+            check_stopped(self.stop_event)
+            if time.monotonic() >= deadline:
+                return False
+            # Lets Playwright dispatch the route handler of the stub
+            page.wait_for_timeout(50)
+        return True
+
+    @staticmethod
+    def _lap(timings, phase, phase_started):
+        now = time.perf_counter()
+        timings[phase] = round(now - phase_started, 3)
+        return now
+
+    @staticmethod
+    def _result(form_index, status, started, timings):
+        return {
+            "index": form_index,
+            "status": status,
+            "duration": round(time.perf_counter() - started, 3),
+            "timings": timings,
+        }
+
+    def _handle_verification(self, page, form_index):
+        """
+        Handle verification challenges.
+
+        Returns:
+            bool: True if the page left the survey URL after verification.
+        """
+        handler = self.verification_handler
+        old_url = self.url
+        try:
+            locator = page.locator(".sm-txt")
+            if locator.count() > 0:
+                text = locator.inner_text()
+                if text == "点击按钮开始智能验证":
+                    handler.switch_window_to_edge(self.window_title)
+                    self.log(f"智能验证... ({form_index})")
+                    handler.intelligent_verification(page, locator)
+
+                    if wait_for_url_change(page, old_url, timeout=5000, stop_event=self.stop_event):
+                        return True
+                    locator_slide = page.locator("span", has_text="请按住滑块，拖动到最右边")
+                    if locator_slide.count() > 0:
+                        handler.switch_window_to_edge(self.window_title)
+                        self.log(f"滑块验证... ({form_index})")
+                        handler.slider_verification(page, locator_slide)
+                        return wait_for_url_change(page, old_url, timeout=10000,
+                                                   stop_event=self.stop_event)
+
+        except FillCancelled:
+            raise
+        except Exception as e:
+            self.log(f"验证处理失败: {e}")
+        return False
@@ -3,20 +3,28 @@ Core form filling functions with Playwright.
 Migrated from Selenium to Playwright.
 """
 import random
-import time
+
+from automation.cancellation import FillCancelled, interruptible_sleep
+from automation.preflight import question_number
+from models.text_pool import is_text_pool, open_text_pool
 
 
 class FormFiller:
     """Handles form filling operations for different question types using Playwright."""
 
-    def __init__(self, log_callback=None):
+    def __init__(self, log_callback=None, rng=None, stop_event=None):
         """
         Initialize the form filler.
 
         Args:
             log_callback (callable): Optional callback function for logging.
+            rng: Optional random.Random instance used for sampling. Defaults to
+                 the module-level random functions.
+            stop_event: Optional event interrupting the delay between questions.
         """
         self.log_callback = log_callback or (lambda msg: None)
+        self.rng = rng if rng is not None else random
+        self.stop_event = stop_event
 
     def log(self, message):
         """Log a message using the callback if available."""
@@ -32,7 +40,7 @@ class FormFiller:
             question_index (int): The 1-based index of the question.
         """
         total = sum(probabilities)
-        rand = random.randint(1, total)
+        rand = self.rng.randint(1, total)
         cumulative = 0
         for i, prob in enumerate(probabilities):
             cumulative += prob
@@ -53,7 +61,7 @@ class FormFiller:
         """
         select_option_num = 0
         for i, prob in enumerate(probabilities):
-            if random.randint(1, 100) <= prob:
+            if self.rng.randint(1, 100) <= prob:
                 option_id = f'q{question_index}_{i + 1}'
                 css = f"#{option_id} + a.jqcheck"
                 page.locator(css).click()
@@ -78,7 +86,7 @@ class FormFiller:
         """
         for i, probabilities in enumerate(probabilities_list):
             total = sum(probabilities)
-            rand = random.randint(1, total)
+            rand = self.rng.randint(1, total)
             cumulative = 0
             option_id = f'drv{question_index}_{i + 1}'
             for j, prob in enumerate(probabilities):
@@ -94,13 +102,20 @@ class FormFiller:
 
         Args:
             page: Playwright Page instance.
-            info_list (list): [text_list, probabilities_list] - text options and their probabilities.
+            info_list (list or dict): [text_list, probabilities_list] - text options and their
+                                      probabilities, or a text pool reference
+                                      {"text_pool": path, "weighted": bool}.
             question_index (int): The 1-based index of the question.
         """
+        if is_text_pool(info_list):
+            pool = open_text_pool(info_list['text_pool'], info_list.get('weighted', False))
+            page.locator(f"#q{question_index}").fill(pool.sample(self.rng))
+            return
+
         text_list = info_list[0]
         probabilities_list = info_list[1]
         total = sum(probabilities_list)
-        rand = random.randint(1, total)
+        rand = self.rng.randint(1, total)
         cumulative = 0
         option_id = f'q{question_index}'
         css = f"#{option_id}"
@@ -113,7 +128,7 @@ class FormFiller:
     def dropdown_selection(self, page, probabilities, question_index):
         """Handle dropdown (select) questions with weighted probabilities."""
         total = sum(probabilities)
-        rand = random.randint(1, total)
+        rand = self.rng.randint(1, total)
         cumulative = 0
         for i, prob in enumerate(probabilities):
             cumulative += prob
@@ -123,7 +138,7 @@ class FormFiller:
                 page.locator(css).select_option(value=str(i + 1))
                 break
 
-    def fill_questions(self, page, question_infos, delay=0.2):
+    def fill_questions(self, page, question_infos, delay=0.2, topics=None):
         """
         Fill all questions based on the configuration.
 
@@ -131,27 +146,36 @@ class FormFiller:
             page: Playwright Page instance.
             question_infos (list): List of question configurations from YAML.
             delay (float): Delay in seconds between questions.
+            topics (list): Optional survey topic numbers, one per rule. Without
+                           them a rule's question is addressed by its 1-based
+                           position, which assumes every question has a rule.
 
         Returns:
             bool: True if successful, False otherwise.
+
+        Raises:
+            FillCancelled: If stop_event is set between questions.
         """
         try:
             for index, dicts in enumerate(question_infos):
                 key, value = list(dicts.items())[0]
+                question_index = question_number(topics, index)
                 if key == "multiple_selection":
-                    self.multiple_selection(page, value, index + 1)
+                    self.multiple_selection(page, value, question_index)
                 elif key == "radio_selection":
-                    self.radio_selection(page, value, index + 1)
+                    self.radio_selection(page, value, question_index)
                 elif key == "matrix_radio_selection":
-                    self.matrix_radio_selection(page, value, index + 1)
+                    self.matrix_radio_selection(page, value, question_index)
                 elif key == "blank_filling":
-                    self.blank_filling(page, value, index + 1)
+                    self.blank_filling(page, value, question_index)
                 elif key == "dropdown_selection":
-                    self.dropdown_selection(page, value, index + 1)
+                    self.dropdown_selection(page, value, question_index)
                 else:
                     self.log(f"Unknown question type: {key}")
-                time.sleep(delay)
+                interruptible_sleep(delay, self.stop_event)
             return True
+        except FillCancelled:
+            raise
         except Exception as e:
             self.log(f"Error filling questions: {e}")
             return False
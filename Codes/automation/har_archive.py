@@ -0,0 +1,115 @@
+"""
+HAR record/replay of survey sessions for deterministic offline runs.
+
+Record mode lets Playwright write the network traffic of a context to a HAR
+archive. Replay mode serves every request from that archive, aborts anything
+that was not recorded and stubs the submit endpoint, so analysis and fill
+runs can be repeated without network access and without creating answers.
+
+The stub's reply does not follow a site's submit protocol, so a replayed
+page usually stays on the survey after submitting. FillRunner therefore
+treats a form whose submit request reached the stub as submitted (see
+submission_count) instead of waiting for the page to navigate.
+"""
+import os
+
+
+HAR_MODES = ("off", "record", "replay")
+
+# Survey submit endpoints answered by the stub in replay mode
+DEFAULT_SUBMIT_PATTERNS = (
+    "**/joinnew/processjq.ashx*",  # WJX
+    "**/submit",                   # tools/stand_in_survey_server.py
+)
+
+SUBMIT_STUB_BODY = "ok"
+
+
+class HarArchive:
+    """Configures a browser context to record to or replay from a HAR archive."""
+
+    def __init__(self, mode, archive_path, submit_patterns=DEFAULT_SUBMIT_PATTERNS):
+        """
+        Initialize the HAR archive.
+
+        Args:
+            mode (str): "record" or "replay" ("off" does nothing).
+            archive_path (str): Archive file; a .zip path stores bodies as
+                                attachments instead of inline base64.
+            submit_patterns (tuple): URL globs of submit endpoints stubbed in
+                                     replay mode.
+        """
+        if mode not in HAR_MODES:
+            raise ValueError(f"未知的HAR模式: {mode}")
+        self.mode = mode
+        self.archive_path = archive_path
+        self.submit_patterns = submit_patterns
+        self.stubbed_submissions = 0
+        # Page -> number of its submit requests answered by the stub
+        self._page_submissions = {}
+
+    @property
+    def recording(self):
+        return self.mode == "record"
+
+    @property
+    def replaying(self):
+        return self.mode == "replay"
+
+    def context_options(self):
+        """
+        Get extra keyword arguments for browser.new_context.
+
+        Returns:
+            dict: HAR recording options in record mode, otherwise empty.
+        """
+        if not self.recording:
+            return {}
+        os.makedirs(os.path.dirname(os.path.abspath(self.archive_path)), exist_ok=True)
+        options = {
+            "record_har_path": self.archive_path,
+            "record_har_mode": "full",
+        }
+        if self.archive_path.endswith(".zip"):
+            options["record_har_content"] = "attach"
+        return options
+
+    def attach(self, context):
+        """
+        Install replay routes on a browser context.
+
+        The recording itself is configured through context_options and
+        written when the context is closed.
+
+        Args:
+            context: Playwright BrowserContext.
+        """
+        if not self.replaying:
+            return
+        if not os.path.exists(self.archive_path):
+            raise FileNotFoundError(f"HAR存档不存在: {self.archive_path}")
+        context.route_from_har(self.archive_path, not_found="abort")
+        # Registered after the HAR route, so the stub takes precedence
+        for pattern in self.submit_patterns:
+            context.route(pattern, self._stub_submit)
+
+    def submission_count(self, page):
+        """
+        Get how many submit requests of a page the stub has answered.
+
+        Args:
+            page: Playwright Page.
+
+        Returns:
+            int: Number of stubbed submissions of the page.
+        """
+        return self._page_submissions.get(page, 0)
+
+    def _stub_submit(self, route):
+        if route.request.method != "POST":
+            route.fallback()
+            return
+        self.stubbed_submissions += 1
+        page = route.request.frame.page
+        self._page_submissions[page] = self._page_submissions.get(page, 0) + 1
+        route.fulfill(status=200, content_type="text/plain", body=SUBMIT_STUB_BODY)
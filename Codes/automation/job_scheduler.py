@@ -0,0 +1,258 @@
+"""
+Scheduler running queued fill jobs on a pool of worker processes.
+
+The pool has a fixed number of slots, each a headless worker process with
+its own browser (see ShardedFillRunner). Jobs are started in priority order
+and each takes up to its max_concurrency free slots, so with one slot the
+jobs run back to back, and with more slots than a job may use, several jobs
+run interleaved. Every job fills into its own HistoryModel session; a job
+that is stopped or interrupted resumes that session's remaining forms.
+"""
+import threading
+import time
+
+from automation.fill_runner import new_run_seed
+from automation.sharded_runner import ShardedFillRunner, ShardError
+
+
+class JobScheduler:
+    """Starts queued jobs while pool slots are free."""
+
+    # Seconds between writes of per-form results to the history file
+    RESULTS_FLUSH_INTERVAL = 1.0
+
+    def __init__(self, job_queue, history_model, pool_size=1, channel="auto",
+                 resource_preset="none", log_callback=None, on_change=None):
+        """
+        Initialize the scheduler.
+
+        Args:
+            job_queue (JobQueue): Queue the jobs are taken from.
+            history_model (HistoryModel): Model holding the job sessions.
+            pool_size (int): Number of worker processes shared by all jobs.
+            channel: Browser channel of the workers (see BrowserSetup.setup_browser).
+            resource_preset (str): ResourcePolicy preset used by the workers.
+            log_callback (callable): Optional callback for log messages; may
+                                     be called from worker threads.
+            on_change (callable): Optional callback run after a job's status
+                                  or progress changed; may be called from
+                                  worker threads.
+        """
+        self.job_queue = job_queue
+        self.history_model = history_model
+        self.pool_size = max(1, pool_size)
+        self.channel = channel
+        self.resource_preset = resource_preset
+        self.log_callback = log_callback or (lambda msg: None)
+        self.on_change = on_change or (lambda: None)
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._dispatcher = None
+        # Job ID -> (slots, stop event, runner or None)
+        self._running = {}
+
+    # --- Control ---
+
+    def is_running(self):
+        """Whether the scheduler is dispatching jobs."""
+        dispatcher = self._dispatcher
+        return dispatcher is not None and dispatcher.is_alive()
+
+    def start(self):
+        """Start dispatching queued jobs in the background."""
+        if self.is_running():
+            return
+        self._stopping.clear()
+        self._dispatcher = threading.Thread(target=self._dispatch, name="job-scheduler", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self):
+        """
+        Stop dispatching and stop running jobs.
+
+        Stopped jobs go back to the queue and resume where they stopped on
+        the next start().
+        """
+        self._stopping.set()
+        with self._lock:
+            for slots, stop_event, runner in self._running.values():
+                stop_event.set()
+        self._wake.set()
+
+    def set_pool_size(self, pool_size):
+        """Change the number of worker slots; applies as jobs start and finish."""
+        self.pool_size = max(1, pool_size)
+        self._wake.set()
+
+    def cancel_job(self, job_id):
+        """
+        Stop a running job without requeueing it.
+
+        Args:
+            job_id (str): Job ID.
+
+        Returns:
+            bool: True if the job was running.
+        """
+        with self._lock:
+            entry = self._running.get(job_id)
+        if entry is None:
+            return False
+        self.job_queue.update_job(job_id, status="cancelled")
+        entry[1].set()
+        return True
+
+    def notify(self):
+        """Wake the dispatcher, e.g. after jobs were added."""
+        self._wake.set()
+
+    def running_job_ids(self):
+        """IDs of the jobs currently running."""
+        with self._lock:
+            return list(self._running)
+
+    def terminate(self, timeout=None):
+        """
+        Stop and terminate the worker processes of all running jobs.
+
+        Args:
+            timeout (float): Seconds to wait for them to exit; None does not wait.
+        """
+        self.stop()
+        with self._lock:
+            runners = [runner for _, _, runner in self._running.values() if runner]
+        deadline = time.monotonic() + (timeout or 0)
+        for runner in runners:
+            runner.terminate(None if timeout is None else max(0.0, deadline - time.monotonic()))
+
+    def kill(self):
+        """Kill worker processes that did not exit after terminate()."""
+        with self._lock:
+            runners = [runner for _, _, runner in self._running.values() if runner]
+        for runner in runners:
+            runner.kill()
+
+    # --- Dispatching ---
+
+    def _free_slots(self):
+        return self.pool_size - sum(slots for slots, _, _ in self._running.values())
+
+    def _dispatch(self):
+        self.log_callback("任务队列已启动")
+        while not self._stopping.is_set():
+            with self._lock:
+                for job in self.job_queue.runnable_jobs():
+                    free = self._free_slots()
+                    if free <= 0:
+                        break
+                    if job["id"] in self._running:
+                        continue
+                    self._start_job(job, min(job["max_concurrency"], free))
+                idle = not self._running
+            if idle and not self.job_queue.runnable_jobs():
+                self.log_callback("任务队列已全部完成")
+                break
+            self._wake.wait(1.0)
+            self._wake.clear()
+
+        # Let stopped jobs record their results before reporting
+        while self.running_job_ids():
+            time.sleep(0.1)
+        self.on_change()
+
+    def _start_job(self, job, slots):
+        """Start a job on slots pool slots. Called with self._lock held."""
+        stop_event = threading.Event()
+        self._running[job["id"]] = (slots, stop_event, None)
+        self.job_queue.update_job(job["id"], status="running")
+        thread = threading.Thread(target=self._run_job, args=(job, slots, stop_event),
+                                  name=f"job-{job['id']}", daemon=True)
+        thread.start()
+        self.on_change()
+
+    def _open_session(self, job, slots):
+        """
+        Get the job's session, creating it on the first run.
+
+        Returns:
+            dict: HistoryModel session.
+        """
+        session = self.history_model.get_session(job["session_id"]) if job["session_id"] else None
+        if session is not None:
+            self.history_model.mark_resumed(session["id"])
+            return session
+        session_id = self.history_model.add_session(
+            job["rule_file"] or job["name"], job["url"], job["fill_count"], "running",
+            parsed_questions=job.get("parsed_questions"),
+            rules=job["rules"],
+            run_seed=new_run_seed(),
+            process_count=slots,
+            topics=job.get("topics"),
+            job_id=job["id"],
+        )
+        self.job_queue.update_job(job["id"], session_id=session_id)
+        return self.history_model.get_session(session_id)
+
+    def _run_job(self, job, slots, stop_event):
+        name = job["name"]
+        log = lambda msg: self.log_callback(f"[{name}] {msg}")
+        session = None
+        pending_results = []
+        last_flush = time.monotonic()
+
+        def flush():
+            nonlocal pending_results, last_flush
+            results, pending_results = pending_results, []
+            last_flush = time.monotonic()
+            self.history_model.add_form_results(session["id"], results)
+            self.job_queue.update_job(job["id"], completed=len(session.get("form_results") or []))
+            self.on_change()
+
+        def on_result(result):
+            pending_results.append(result)
+            if time.monotonic() - last_flush >= self.RESULTS_FLUSH_INTERVAL:
+                flush()
+
+        status = "completed"
+        try:
+            session = self._open_session(job, slots)
+            pending = self.history_model.pending_form_indices(session["id"])
+            log(f"开始: 剩余 {len(pending)}/{job['fill_count']} 份，使用 {slots} 个进程")
+            if pending:
+                runner = ShardedFillRunner(
+                    job["url"], job["rules"], job["fill_count"], session["run_seed"], slots,
+                    topics=job.get("topics"),
+                    resource_preset=self.resource_preset,
+                    channel=self.channel,
+                    log_callback=log,
+                    stop_event=stop_event,
+                )
+                with self._lock:
+                    self._running[job["id"]] = (slots, stop_event, runner)
+                runner.run(form_indices=pending, on_result=on_result)
+            if stop_event.is_set():
+                status = "stopped"
+        except ShardError as e:
+            # Workers failed, e.g. the survey no longer matches the rules;
+            # the job stays in the queue as failed until it is requeued
+            log(f"出错，可重新排队从中断处继续: {e}")
+            status = "error"
+            self.job_queue.update_job(job["id"], error=str(e))
+        except Exception as e:
+            log(f"出错: {e}")
+            status = "error"
+            self.job_queue.update_job(job["id"], error=str(e))
+        finally:
+            if session is not None:
+                flush()
+                self.history_model.update_session_status(session["id"], status)
+            current = self.job_queue.get_job(job["id"])
+            if current is not None and current["status"] != "cancelled":
+                # A job stopped with the queue is picked up again on the next start
+                self.job_queue.update_job(job["id"], status="queued" if status == "stopped" else status)
+            with self._lock:
+                self._running.pop(job["id"], None)
+            log({"completed": "已完成", "stopped": "已停止", "error": "已失败"}[status])
+            self.on_change()
+            self._wake.set()
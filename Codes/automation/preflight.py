@@ -0,0 +1,176 @@
+"""
+Pre-flight checks that a rule set fits the survey before forms are filled.
+
+A rule whose option counts do not match the survey, or whose weights sum to
+zero, otherwise only fails deep inside FormFiller (a locator timeout, or
+random.randint(1, 0) raising) after a browser was launched.
+"""
+from models.probability_store import TYPE_TO_RULE
+from models.text_pool import is_text_pool, open_text_pool
+
+
+class PreflightError(Exception):
+    """Raised when the survey page does not contain the elements the rules address."""
+
+
+# Rule types whose weights are sampled with randint(1, sum) and must not sum to zero
+WEIGHTED_RULES = ('radio_selection', 'dropdown_selection')
+
+
+def question_number(topics, index):
+    """
+    Survey question number a rule addresses.
+
+    Args:
+        topics (list): Optional topic numbers, one per rule.
+        index (int): 0-based position of the rule.
+
+    Returns:
+        int: The topic number if known, otherwise the 1-based rule position.
+    """
+    if topics and index < len(topics) and str(topics[index]).isdigit():
+        return int(topics[index])
+    return index + 1
+
+
+def _check_weights(label, weights):
+    if not isinstance(weights, list) or not weights:
+        return f"{label}: 概率必须是非空列表"
+    if any(not isinstance(w, int) or isinstance(w, bool) or w < 0 for w in weights):
+        return f"{label}: 概率必须是非负整数"
+    if sum(weights) == 0:
+        return f"{label}: 概率之和为0"
+    return None
+
+
+def check_rules(rules, parsed_questions=None):
+    """
+    Check rules for errors that would crash or misfire during a fill.
+
+    Without parsed_questions only the weights are checked; with them, every
+    rule is also compared against the analyzed question it belongs to.
+
+    Args:
+        rules (list): Rule dicts in question order.
+        parsed_questions (list): Optional freshly analyzed questions.
+
+    Returns:
+        list: Problem descriptions; empty if the rules can be run.
+    """
+    problems = []
+    for i, rule in enumerate(rules):
+        key, value = list(rule.items())[0]
+        label = f"规则{i + 1}({key})"
+        if key == 'matrix_radio_selection':
+            if not isinstance(value, list) or not value:
+                problems.append(f"{label}: 必须是非空列表")
+                continue
+            for r, row in enumerate(value):
+                problem = _check_weights(f"{label} 子题{r + 1}", row)
+                if problem:
+                    problems.append(problem)
+        elif key == 'blank_filling' and is_text_pool(value):
+            try:
+                open_text_pool(value['text_pool'], value.get('weighted', False))
+            except (OSError, ValueError) as e:
+                problems.append(f"{label}: 文本池无法使用: {e}")
+        elif key == 'blank_filling':
+            texts, weights = value if isinstance(value, list) and len(value) == 2 else (None, None)
+            if not isinstance(texts, list) or not isinstance(weights, list) or len(texts) != len(weights):
+                problems.append(f"{label}: 文本列表和概率列表长度必须相同")
+                continue
+            problem = _check_weights(label, weights)
+            if problem:
+                problems.append(problem)
+        elif key == 'multiple_selection':
+            # Options are drawn independently; all zero falls back to the first option
+            if not isinstance(value, list) or not value or \
+                    any(not isinstance(w, int) or w < 0 or w > 100 for w in value):
+                problems.append(f"{label}: 概率必须是0-100的整数列表")
+        elif key in WEIGHTED_RULES:
+            problem = _check_weights(label, value)
+            if problem:
+                problems.append(problem)
+
+    if parsed_questions is not None:
+        problems.extend(_check_against_questions(rules, parsed_questions))
+    return problems
+
+
+def _check_against_questions(rules, parsed_questions):
+    questions = [q for q in parsed_questions if q.get('type_code') in TYPE_TO_RULE]
+    problems = []
+    if len(rules) != len(questions):
+        problems.append(f"规则数量({len(rules)})与问卷题目数量({len(questions)})不一致")
+
+    for i, (rule, question) in enumerate(zip(rules, questions)):
+        key, value = list(rule.items())[0]
+        expected_key = TYPE_TO_RULE[question['type_code']]
+        label = f"第{question.get('topic', i + 1)}题"
+        if key != expected_key:
+            problems.append(f"{label}: 规则类型为 {key}，问卷题型为 {question.get('type', expected_key)}")
+            continue
+
+        if key in ('radio_selection', 'multiple_selection', 'dropdown_selection'):
+            option_count = len(question.get('options', []))
+            if isinstance(value, list) and len(value) != option_count:
+                problems.append(f"{label}: 规则有 {len(value)} 个选项概率，问卷有 {option_count} 个选项")
+        elif key == 'matrix_radio_selection':
+            sub_questions = question.get('sub_questions', [])
+            if isinstance(value, list) and len(value) != len(sub_questions):
+                problems.append(f"{label}: 规则有 {len(value)} 个子题，问卷有 {len(sub_questions)} 个子题")
+                continue
+            for r, (row, sub_q) in enumerate(zip(value, sub_questions)):
+                column_count = len(sub_q.get('options', []))
+                if isinstance(row, list) and len(row) != column_count:
+                    problems.append(f"{label} 子题{r + 1}: 规则有 {len(row)} 列，问卷有 {column_count} 列")
+    return problems
+
+
+def rule_selectors(rules, topics=None):
+    """
+    CSS selectors of the last element each rule addresses.
+
+    Finding the last option of every question confirms both that the question
+    exists on the page and that it has at least as many options as the rule.
+
+    Returns:
+        list: (rule position, selector) tuples.
+    """
+    selectors = []
+    for i, rule in enumerate(rules):
+        key, value = list(rule.items())[0]
+        n = question_number(topics, i)
+        if key == 'radio_selection':
+            selectors.append((i, f"#q{n}_{len(value)} + a.jqradio"))
+        elif key == 'multiple_selection':
+            selectors.append((i, f"#q{n}_{len(value)} + a.jqcheck"))
+        elif key == 'matrix_radio_selection' and value:
+            selectors.append((i, f"#drv{n}_{len(value)} a[dval='{max(len(row) for row in value)}']"))
+        elif key == 'blank_filling':
+            selectors.append((i, f"#q{n}"))
+        elif key == 'dropdown_selection':
+            selectors.append((i, f"#q{n} option[value='{len(value)}']"))
+    return selectors
+
+
+def probe_rule_selectors(page, rules, topics=None):
+    """
+    Check in a single round-trip that the page has every element the rules address.
+
+    Args:
+        page: Playwright Page instance showing the survey.
+        rules (list): Rule dicts.
+        topics (list): Optional topic numbers, one per rule.
+
+    Raises:
+        PreflightError: If any selector matches nothing.
+    """
+    selectors = rule_selectors(rules, topics)
+    missing = page.evaluate(
+        "selectors => selectors.filter(s => !document.querySelector(s))",
+        [selector for _, selector in selectors],
+    )
+    if missing:
+        raise PreflightError(f"问卷页面缺少规则所需的元素: {', '.join(missing[:5])}"
+                             + (f" 等 {len(missing)} 项" if len(missing) > 5 else ""))
@@ -0,0 +1,203 @@
+"""
+Network resource filtering for browser contexts.
+
+Neither the survey parser nor FormFiller needs images, fonts, media or
+third-party analytics, so a policy aborts those requests through
+context.route before they are downloaded.
+"""
+import json
+import os
+import threading
+from urllib.parse import urlsplit
+
+
+# Hosts of analytics/tracking scripts commonly embedded in survey pages
+TRACKER_HOSTS = (
+    "hm.baidu.com",
+    "cnzz.com",
+    "umeng.com",
+    "google-analytics.com",
+    "googletagmanager.com",
+    "doubleclick.net",
+    "growingio.com",
+    "sensorsdata.cn",
+)
+
+RESOURCE_PRESETS = {
+    # No filtering
+    "none": {
+        "block_types": (),
+        "block_trackers": False,
+    },
+    # Analysis only reads the DOM: drop everything that is only rendered
+    "analysis-minimal": {
+        "block_types": ("image", "media", "font", "stylesheet"),
+        "block_trackers": True,
+    },
+    # Filling clicks styled controls, so stylesheets (layout, visibility) stay
+    "fill-minimal": {
+        "block_types": ("image", "media", "font"),
+        "block_trackers": True,
+    },
+}
+
+DEFAULT_ANALYSIS_PRESET = "analysis-minimal"
+DEFAULT_FILL_PRESET = "fill-minimal"
+
+
+def format_resource_stats(stats):
+    """
+    Format resource policy counters as a one-line log message.
+
+    Args:
+        stats (dict): Counters as returned by ResourcePolicy.get_stats.
+
+    Returns:
+        str: Log message.
+    """
+    by_type = ", ".join(f"{k} {v}" for k, v in sorted(stats.get("blocked_by_type", {}).items()))
+    message = f"资源策略 {stats.get('preset', '')}: 拦截 {stats.get('blocked_requests', 0)} 个请求"
+    if by_type:
+        message += f" ({by_type})"
+    message += f"，节省约 {stats.get('bytes_saved', 0) / 1024:.1f} KB"
+    if stats.get("unknown_size_requests"):
+        message += f" (另有 {stats['unknown_size_requests']} 个大小未知)"
+    return message
+
+
+class ResourcePolicy:
+    """Blocks unneeded requests of a browser context and counts what was saved."""
+
+    # Maximum number of remembered URL sizes
+    MAX_SIZE_HINTS = 5000
+
+    def __init__(self, preset="none", size_hints_file=None):
+        """
+        Initialize the resource policy.
+
+        Args:
+            preset (str): Name of a preset in RESOURCE_PRESETS.
+            size_hints_file (str): Optional JSON file remembering response sizes
+                                   per URL, used to estimate the bytes saved by
+                                   blocking a request that was seen before.
+        """
+        if preset not in RESOURCE_PRESETS:
+            raise ValueError(f"未知的资源策略: {preset}")
+        self.preset = preset
+        config = RESOURCE_PRESETS[preset]
+        self.block_types = frozenset(config["block_types"])
+        self.block_trackers = config["block_trackers"]
+        self.size_hints_file = size_hints_file
+        self.size_hints = self._load_size_hints()
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    @property
+    def enabled(self):
+        """Whether the policy blocks anything at all."""
+        return bool(self.block_types) or self.block_trackers
+
+    def reset_stats(self):
+        """Reset the per-run counters."""
+        self.blocked_requests = 0
+        self.blocked_by_type = {}
+        self.bytes_saved = 0
+        self.unknown_size_requests = 0
+
+    def attach(self, context):
+        """
+        Install the policy on a browser context.
+
+        Args:
+            context: Playwright BrowserContext.
+        """
+        context.on("response", self._on_response)
+        if self.enabled:
+            context.route("**/*", self._handle_route)
+
+    def should_block(self, resource_type, url):
+        """
+        Decide whether a request is blocked.
+
+        Args:
+            resource_type (str): Playwright resource type (image, script, ...).
+            url (str): Request URL.
+
+        Returns:
+            bool: True if the request should be aborted.
+        """
+        if resource_type in self.block_types:
+            return True
+        if self.block_trackers:
+            host = urlsplit(url).hostname or ""
+            return any(host == h or host.endswith("." + h) for h in TRACKER_HOSTS)
+        return False
+
+    def _handle_route(self, route):
+        request = route.request
+        if not self.should_block(request.resource_type, request.url):
+            route.fallback()
+            return
+
+        with self._lock:
+            self.blocked_requests += 1
+            self.blocked_by_type[request.resource_type] = \
+                self.blocked_by_type.get(request.resource_type, 0) + 1
+            size = self.size_hints.get(request.url)
+            if size is None:
+                self.unknown_size_requests += 1
+            else:
+                self.bytes_saved += size
+        route.abort("blockedbyclient")
+
+    def _on_response(self, response):
+        length = response.headers.get("content-length")
+        if not length or not length.isdigit():
+            return
+        with self._lock:
+            if len(self.size_hints) < self.MAX_SIZE_HINTS or response.url in self.size_hints:
+                self.size_hints[response.url] = int(length)
+
+    def get_stats(self):
+        """
+        Get the counters of the current run.
+
+        Returns:
+            dict: preset, blocked_requests, blocked_by_type, bytes_saved and
+                  unknown_size_requests (blocked requests of unknown size).
+        """
+        with self._lock:
+            return {
+                "preset": self.preset,
+                "blocked_requests": self.blocked_requests,
+                "blocked_by_type": dict(self.blocked_by_type),
+                "bytes_saved": self.bytes_saved,
+                "unknown_size_requests": self.unknown_size_requests,
+            }
+
+    def format_stats(self):
+        """Format the counters as a one-line log message."""
+        return format_resource_stats(self.get_stats())
+
+    def _load_size_hints(self):
+        if not self.size_hints_file or not os.path.exists(self.size_hints_file):
+            return {}
+        try:
+            with open(self.size_hints_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def save_size_hints(self):
+        """Persist the learned response sizes, replacing the file atomically."""
+        if not self.size_hints_file:
+            return
+        with self._lock:
+            hints = dict(self.size_hints)
+        tmp_file = self.size_hints_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                json.dump(hints, file)
+            os.replace(tmp_file, self.size_hints_file)
+        except IOError as e:
+            print(f"Error saving resource size hints: {e}")
@@ -0,0 +1,270 @@
+"""
+Process-sharded fill runs for large load tests.
+
+Each shard is a separate process with its own Playwright driver and browser,
+so the Python-side work (JSON-RPC marshalling, answer sampling) is spread
+across CPU cores instead of saturating a single interpreter.
+"""
+import multiprocessing
+import queue
+import time
+
+
+def _shard_main(shard_index, url, rules, topics, fill_count, form_indices, run_seed,
+                headless, pipeline, resource_preset, asset_cache_dir, har_replay_path,
+                channel, messages, stop_event):
+    """Entry point of a shard worker process."""
+    from automation.browser_setup import BrowserSetup
+    from automation.fill_runner import FillRunner
+    from automation.resource_policy import ResourcePolicy
+    from automation.asset_cache import AssetCache
+    from automation.har_archive import HarArchive
+
+    playwright_instance = browser = None
+    resource_policy = ResourcePolicy(resource_preset)
+    # Read-only: the GUI process owns writes to the shared cache directory
+    asset_cache = AssetCache(asset_cache_dir, read_only=True) if asset_cache_dir else None
+    har_archive = HarArchive("replay", har_replay_path) if har_replay_path else None
+    try:
+        runner = FillRunner(
+            url, rules, fill_count, run_seed,
+            topics=topics,
+            log_callback=lambda msg: messages.put(("log", shard_index, msg)),
+            stop_event=stop_event,
+            har_archive=har_archive,
+        )
+        playwright_instance, browser, context, page = BrowserSetup.setup_browser(
+            headless=headless, channel=channel, resource_policy=resource_policy, asset_cache=asset_cache,
+            har_archive=har_archive)
+        on_result = lambda result: messages.put(("result", shard_index, result))
+        if pipeline:
+            runner.run_pipelined((page, BrowserSetup.new_page(context)), form_indices, on_result=on_result)
+        else:
+            runner.run(page, form_indices, on_result=on_result)
+    except Exception as e:
+        messages.put(("error", shard_index, str(e)))
+    finally:
+        if browser:
+            try:
+                browser.close()
+            except Exception:
+                pass
+        if playwright_instance:
+            try:
+                playwright_instance.stop()
+            except Exception:
+                pass
+        messages.put(("resources", shard_index, resource_policy.get_stats()))
+        messages.put(("done", shard_index, None))
+
+
+class ShardError(RuntimeError):
+    """Raised by ShardedFillRunner.run when worker processes failed."""
+
+    def __init__(self, errors):
+        """
+        Args:
+            errors (dict): Shard index -> error message.
+        """
+        self.errors = errors
+        details = "; ".join(f"进程{i + 1}: {msg}" for i, msg in sorted(errors.items()))
+        super().__init__(f"{len(errors)} 个填写进程出错: {details}")
+
+
+def shard_form_indices(fill_count, shard_count):
+    """
+    Split the 1-based form indices of a run across shards.
+
+    Indices are dealt round-robin so every shard gets an even share and the
+    run progresses uniformly over the whole range.
+
+    Returns:
+        list: One list of form indices per shard (empty shards are dropped).
+    """
+    shards = [list(range(i + 1, fill_count + 1, shard_count)) for i in range(shard_count)]
+    return [s for s in shards if s]
+
+
+class ShardedFillRunner:
+    """Runs one fill job across several worker processes."""
+
+    def __init__(self, url, rules, fill_count, run_seed, process_count, topics=None,
+                 headless=True, pipeline=False, resource_preset="none",
+                 asset_cache_dir=None, har_replay_path=None, channel="auto",
+                 log_callback=None, stop_event=None):
+        """
+        Initialize the sharded runner.
+
+        Args:
+            url (str): Survey URL.
+            rules (list): Rule dicts with configured probabilities.
+            fill_count (int): Total number of forms to fill.
+            run_seed (int): Seed the per-form RNG streams are derived from.
+            process_count (int): Number of worker processes.
+            topics (list): Optional survey topic numbers of the rules.
+            headless (bool): Whether worker browsers run headless.
+            pipeline (bool): Whether workers preload the next form on a
+                             second page (see FillRunner.run_pipelined).
+            resource_preset (str): ResourcePolicy preset used by the workers.
+            asset_cache_dir (str): Optional AssetCache directory the workers
+                                   serve cached assets from (read-only).
+            har_replay_path (str): Optional HAR archive the workers replay
+                                   instead of using the network.
+            channel: Browser channel of the workers (see BrowserSetup.setup_browser);
+                     passing a detected channel spares every worker the probe.
+            log_callback (callable): Optional callback for merged logs.
+            stop_event (threading.Event): Optional event that stops the run.
+        """
+        self.url = url
+        self.rules = rules
+        self.fill_count = fill_count
+        self.run_seed = run_seed
+        self.process_count = max(1, process_count)
+        self.topics = topics
+        self.headless = headless
+        self.pipeline = pipeline
+        self.resource_preset = resource_preset
+        self.asset_cache_dir = asset_cache_dir
+        self.har_replay_path = har_replay_path
+        self.channel = channel
+        self.resource_stats = {}
+        self.log_callback = log_callback or (lambda msg: None)
+        self.stop_event = stop_event
+        self._processes = []
+        self._terminated = False
+
+    def run(self, form_indices=None, on_result=None):
+        """
+        Run the shards and block until all of them have finished.
+
+        Args:
+            form_indices (list): Optional 1-based form indices to fill.
+                                 Defaults to the whole run.
+            on_result (callable): Optional callback receiving each result dict,
+                                  called on the calling thread.
+
+        Returns:
+            list: Result dicts of all attempted forms, ordered by form index.
+
+        Raises:
+            ShardError: If a worker failed or exited unexpectedly while the
+                        run was not being stopped; results of the forms it
+                        did fill have been passed to on_result already.
+        """
+        # spawn: forking a process that runs Qt and Playwright threads is unsafe
+        ctx = multiprocessing.get_context("spawn")
+        messages = ctx.Queue()
+        shard_stop = ctx.Event()
+
+        if form_indices is None:
+            shards = shard_form_indices(self.fill_count, self.process_count)
+        else:
+            form_indices = list(form_indices)
+            shards = [form_indices[i::self.process_count] for i in range(self.process_count)]
+            shards = [s for s in shards if s]
+
+        self._processes = []
+        self._terminated = False
+        self.resource_stats = {}
+        for shard_index, indices in enumerate(shards):
+            process = ctx.Process(
+                target=_shard_main,
+                args=(shard_index, self.url, self.rules, self.topics, self.fill_count, indices,
+                      self.run_seed, self.headless, self.pipeline,
+                      self.resource_preset, self.asset_cache_dir, self.har_replay_path,
+                      self.channel, messages, shard_stop),
+                daemon=True,
+            )
+            process.start()
+            self._processes.append(process)
+        self.log_callback(f"已启动 {len(self._processes)} 个填写进程")
+
+        results = []
+        errors = {}
+        pending = set(range(len(self._processes)))
+
+        def handle(kind, shard_index, payload):
+            if kind == "log":
+                self.log_callback(f"[进程{shard_index + 1}] {payload}")
+            elif kind == "result":
+                payload["shard"] = shard_index
+                results.append(payload)
+                if on_result:
+                    on_result(payload)
+            elif kind == "resources":
+                self._merge_resource_stats(payload)
+            elif kind == "error":
+                errors[shard_index] = payload
+                self.log_callback(f"[进程{shard_index + 1}] 出错: {payload}")
+            elif kind == "done":
+                pending.discard(shard_index)
+
+        while pending:
+            if self.stop_event is not None and self.stop_event.is_set():
+                shard_stop.set()
+            try:
+                handle(*messages.get(timeout=0.2))
+                continue
+            except queue.Empty:
+                pass
+
+            # A worker killed before posting "done" must not hang the run.
+            # A worker that has just exited normally may still have its last
+            # results and "done" in the queue, so read those first
+            dead = [i for i in pending if not self._processes[i].is_alive()]
+            if not dead:
+                continue
+            while True:
+                try:
+                    handle(*messages.get_nowait())
+                except queue.Empty:
+                    break
+            for i in dead:
+                if i in pending:
+                    pending.discard(i)
+                    errors.setdefault(i, f"进程意外退出 (退出码 {self._processes[i].exitcode})")
+
+        for process in self._processes:
+            process.join(timeout=5)
+        self._processes = []
+
+        # Workers ended by a stop or terminate() are not failures
+        stopped = self._terminated or (self.stop_event is not None and self.stop_event.is_set())
+        if errors and not stopped:
+            raise ShardError(errors)
+
+        results.sort(key=lambda r: r["index"])
+        return results
+
+    def _merge_resource_stats(self, stats):
+        merged = self.resource_stats
+        merged["preset"] = stats["preset"]
+        for key in ("blocked_requests", "bytes_saved", "unknown_size_requests"):
+            merged[key] = merged.get(key, 0) + stats[key]
+        by_type = merged.setdefault("blocked_by_type", {})
+        for resource_type, count in stats["blocked_by_type"].items():
+            by_type[resource_type] = by_type.get(resource_type, 0) + count
+
+    def terminate(self, timeout=None):
+        """
+        Forcefully terminate all running worker processes.
+
+        Args:
+            timeout (float): Seconds to wait for them to exit; None does not wait.
+        """
+        self._terminated = True
+        processes = list(self._processes)
+        for process in processes:
+            if process.is_alive():
+                process.terminate()
+        if timeout is None:
+            return
+        deadline = time.monotonic() + timeout
+        for process in processes:
+            process.join(max(0.0, deadline - time.monotonic()))
+
+    def kill(self):
+        """Kill worker processes that did not exit after terminate()."""
+        for process in list(self._processes):
+            if process.is_alive():
+                process.kill()
@@ -1,21 +1,26 @@
 """
 Verification handling for intelligent verification and slider verification.
 Migrated from Selenium to Playwright.
+
+pyautogui is imported on first use: importing it connects to the display
+server, which is not needed until a verification challenge appears.
 """
-import pyautogui
 
 
 class VerificationHandler:
     """Handles various types of verification challenges using Playwright."""
 
-    def __init__(self, ratio=1.0):
+    def __init__(self, ratio=1.0, stop_event=None):
         """
         Initialize the verification handler.
 
         Args:
             ratio (float): Windows DPI scaling ratio for coordinate calculation.
+            stop_event: Optional event interrupting the waits after switching
+                        windows.
         """
         self.ratio = ratio
+        self.stop_event = stop_event
 
     def get_element_screen_pos(self, page, element):
         """
@@ -60,13 +65,17 @@ class VerificationHandler:
         Args:
             window_title (str): Title of the window to switch to.
             sleep_time (int): Time to wait after switching.
+
+        Raises:
+            FillCancelled: If stop_event is set during the wait.
         """
+        import pyautogui
+        from automation.cancellation import interruptible_sleep
         windows = pyautogui.getWindowsWithTitle(window_title)
         for window in windows:
             if "Edge" in window.title:
                 window.activate()
-                import time
-                time.sleep(sleep_time)
+                interruptible_sleep(sleep_time, self.stop_event)
                 break
 
     def intelligent_verification(self, page, locator):
@@ -77,6 +86,7 @@ class VerificationHandler:
             page: Playwright Page instance.
             locator: Playwright Locator for the element.
         """
+        import pyautogui
         screen_x, screen_y = self.get_element_screen_pos(page, locator)
         click_pos = (screen_x, screen_y)
         pyautogui.click(click_pos)
@@ -89,6 +99,7 @@ class VerificationHandler:
             page: Playwright Page instance.
             locator_slide: Playwright Locator for the slider.
         """
+        import pyautogui
         screen_x, screen_y = self.get_element_screen_pos(page, locator_slide)
 
         # Get the slider button element
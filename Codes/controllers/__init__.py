@@ -1,6 +1,8 @@
 # Controllers package
 from .main_controller import MainController
 from .workflow_controller import WorkflowController
+from .rule_editor_controller import RuleEditorController
 from .history_controller import HistoryController
+from .queue_controller import QueueController
 
-__all__ = ['MainController', 'WorkflowController', 'HistoryController']
+__all__ = ['MainController', 'WorkflowController', 'RuleEditorController', 'HistoryController', 'QueueController']
@@ -3,13 +3,14 @@ History controller - session history management.
 Migrated to PySide6.
 """
 from PySide6.QtWidgets import QMessageBox
+from PySide6.QtCore import QTimer
 from datetime import datetime
 
 
 class HistoryController:
     """Controller for history management operations."""
 
-    def __init__(self, model, view, history_model):
+    def __init__(self, model, view, history_model, job_queue=None):
         """
         Initialize the history controller.
 
@@ -17,11 +18,14 @@ class HistoryController:
             model: SurveyModel instance.
             view: HistoryView instance.
             history_model: HistoryModel instance.
+            job_queue: Optional JobQueue owning the sessions of queued jobs.
         """
         self.model = model
         self.view = view
         self.history_model = history_model
+        self.job_queue = job_queue
         self._restore_callback = None
+        self._resume_callback = None
 
         # Setup view callbacks
         self.setup_view_callbacks()
@@ -29,8 +33,8 @@ class HistoryController:
         # Connect selection event
         self.view.tree.itemSelectionChanged.connect(self.on_selection_changed)
 
-        # Load initial history
-        self.refresh_history()
+        # Load initial history once the tab has been painted
+        QTimer.singleShot(0, self.refresh_history)
 
     def setup_view_callbacks(self):
         """Set up view button callbacks."""
@@ -38,6 +42,7 @@ class HistoryController:
         self.view.set_button_command("export", self.export_selected)
         self.view.set_button_command("clear", self.clear_all_history)
         self.view.set_button_command("view_logs", self.view_selected_logs)
+        self.view.set_button_command("resume", self.resume_selected)
         self.view.set_restore_command(self.restore_by_id)
 
     def refresh_history(self):
@@ -46,12 +51,16 @@ class HistoryController:
         sessions = self.history_model.get_sessions()
 
         for session in sessions:
+            fill_count = session['fill_count']
+            done = len(session.get('form_results') or [])
+            if session['status'] in self.history_model.RESUMABLE_STATUSES and done < fill_count:
+                fill_count = f"{done}/{fill_count}"
             self.view.add_session(
                 session['id'],
                 session['timestamp'],
                 session['rule_file'],
                 session['url'],
-                session['fill_count'],
+                fill_count,
                 session['status']
             )
 
@@ -125,6 +134,50 @@ class HistoryController:
         """
         self._restore_callback = callback
 
+    def set_resume_callback(self, callback):
+        """Store a callback to be invoked when resuming a session.
+
+        Args:
+            callback: Function that accepts a session dict.
+        """
+        self._resume_callback = callback
+
+    def resume_selected(self):
+        """Continue the selected unfinished session from its checkpoint."""
+        session_id = self.view.get_selected_session_id()
+        if not session_id:
+            QMessageBox.information(self.view, "提示", "请先选择一个会话")
+            return
+
+        session = self.history_model.get_session(session_id)
+        if not session:
+            self.view.show_error("错误", "未找到该会话")
+            return
+
+        if session['status'] not in self.history_model.RESUMABLE_STATUSES:
+            self.view.show_info("提示", "只能继续已停止、出错或中断的会话")
+            return
+
+        pending = self.history_model.pending_form_indices(session_id)
+        if not pending:
+            self.view.show_info("提示", "该会话的问卷已全部填写")
+            return
+
+        # The queue resumes its jobs' sessions itself; resuming one here as
+        # well would submit the same forms twice
+        job = self.job_queue.get_job(session.get('job_id')) if self.job_queue else None
+        if job and job['status'] in ('queued', 'running'):
+            self.view.show_info("提示", f"该会话属于任务队列中的任务「{job['name']}」，"
+                                      "请在任务队列中继续，或先删除该任务")
+            return
+
+        done = session['fill_count'] - len(pending)
+        if self._resume_callback and self.view.ask_to_confirm_resume(done, session['fill_count']):
+            if job:
+                # A cancelled or failed job must not be requeued onto this session
+                self.job_queue.remove_job(job['id'])
+            self._resume_callback(session)
+
     def restore_by_id(self, session_id):
         """Restore a session's survey configuration by session ID.
 
@@ -3,12 +3,13 @@ Main controller - coordinates between views and sub-controllers.
 Migrated to PySide6.
 """
 from PySide6.QtWidgets import QMessageBox
+from utils.shutdown import ShutdownCoordinator
 
 
 class MainController:
     """Main controller that coordinates all sub-controllers using PySide6."""
 
-    def __init__(self, main_window, models, views, controllers):
+    def __init__(self, main_window, models, views, controllers, logger=None):
         """
         Initialize the main controller.
 
@@ -17,41 +18,92 @@ class MainController:
             models: Dictionary of model instances.
             views: Dictionary of view instances.
             controllers: Dictionary of controller instances.
+            logger: Optional GuiLogger receiving shutdown timings.
         """
         self.main_window = main_window
         self.models = models
         self.views = views
         self.controllers = controllers
+        self.logger = logger
 
         self.setup_cross_controller_wiring()
 
     def setup_cross_controller_wiring(self):
-        """Wire cross-controller callbacks."""
+        """Wire cross-controller callbacks of the controllers created so far."""
+        if 'history' in self.controllers:
+            self.wire_history_controller()
+        if 'queue' in self.controllers:
+            self.wire_queue_controller()
+
+    def wire_history_controller(self):
+        """Wire the history controller, which is created when its tab is first shown."""
         def on_restore_session(session):
             self.controllers['workflow'].restore_session(session)
             self.views['main'].switch_to_tab(0)  # Switch to workflow tab
 
+        def on_resume_session(session):
+            # The session's queue job may have been removed
+            if 'queue' in self.controllers:
+                self.controllers['queue'].refresh_jobs()
+            self.views['main'].switch_to_tab(0)  # Switch to workflow tab
+            self.controllers['workflow'].resume_session(session)
+
         self.controllers['history'].set_restore_callback(on_restore_session)
+        self.controllers['history'].set_resume_callback(on_resume_session)
+
+    def wire_queue_controller(self):
+        """Wire the queue controller, which is created when its tab is first shown."""
+        self.controllers['queue'].set_current_config_callback(
+            self.controllers['workflow'].get_job_config)
 
     def on_closing(self):
-        """Handle window closing event."""
-        # Stop any running fills
-        if self.controllers['workflow'].check_is_running():
+        """
+        Handle window closing event.
+
+        Returns:
+            bool: False if the user chose to keep the window open.
+        """
+        workflow_controller = self.controllers['workflow']
+        rule_editor_controller = self.controllers.get('rule_editor')
+        queue_controller = self.controllers.get('queue')
+
+        # Ask every question before anything is stopped, so declining one
+        # leaves all running work untouched
+        questions = []
+        if workflow_controller.check_is_running():
+            questions.append("填写任务正在运行，确定要退出吗？")
+        if rule_editor_controller and rule_editor_controller.has_unsaved_changes():
+            questions.append("规则文件有未保存的修改，确定要退出吗？")
+        # Queued jobs stopped here resume where they stopped on the next start
+        if queue_controller and queue_controller.check_is_running():
+            questions.append("任务队列正在运行，确定要退出吗？\n未完成的任务将在下次启动队列时继续。")
+        for question in questions:
             reply = QMessageBox.question(
                 None,
                 "退出确认",
-                "填写任务正在运行，确定要退出吗？",
+                question,
                 QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
             )
             if reply == QMessageBox.StandardButton.No:
-                return
-            self.controllers['workflow'].stop_fill()
+                return False
+
+        # Stop any running fills
+        if workflow_controller.check_is_running():
+            workflow_controller.stop_fill()
 
         # Save configuration
         self.models['survey'].save_config_to_file()
 
-        # Clean up workflow controller
-        self.controllers['workflow'].cleanup()
+        # Close browsers, worker processes and caches concurrently, each
+        # within a timeout, so an unresponsive browser cannot hang the exit
+        coordinator = ShutdownCoordinator(log_callback=self.logger.info if self.logger else None)
+        workflow_controller.register_shutdown(coordinator)
+        if queue_controller:
+            queue_controller.register_shutdown(coordinator)
+        if rule_editor_controller:
+            rule_editor_controller.register_shutdown(coordinator)
+        coordinator.run()
+        return True
 
     def get_controller(self, name):
         """Get a sub-controller by name."""
@@ -0,0 +1,237 @@
+"""
+Queue controller - queued fill jobs for several surveys and rule files.
+"""
+import os
+from automation.job_scheduler import JobScheduler
+from automation.preflight import check_rules
+from automation.resource_policy import DEFAULT_FILL_PRESET
+from models.text_pool import resolve_text_pools
+
+
+class QueueController:
+    """Controller for the job queue tab."""
+
+    # Seconds queue worker processes may take to exit on shutdown
+    PROCESS_CLOSE_TIMEOUT = 2.0
+
+    def __init__(self, model, view, job_queue, history_model, rule_model, logger):
+        """
+        Initialize the queue controller.
+
+        Args:
+            model: SurveyModel instance (configuration).
+            view: QueueView instance.
+            job_queue: JobQueue instance.
+            history_model: HistoryModel instance holding the job sessions.
+            rule_model: RuleModel instance.
+            logger: GuiLogger instance.
+        """
+        self.model = model
+        self.view = view
+        self.job_queue = job_queue
+        self.history_model = history_model
+        self.rule_model = rule_model
+        self.logger = logger
+        self._current_config_callback = None
+
+        pool_size = min(self.model.get_config("queue_pool_size", 1), os.cpu_count() or 1)
+        self.scheduler = JobScheduler(
+            job_queue,
+            history_model,
+            pool_size=pool_size,
+            resource_preset=self.model.get_config("fill_resource_preset", DEFAULT_FILL_PRESET),
+            log_callback=self.view.append_log,
+            on_change=self.view.notify_jobs_changed,
+        )
+
+        self.view.set_pool_size(pool_size)
+        self.setup_view_callbacks()
+        self.refresh_rule_files()
+        self.refresh_jobs()
+
+    def setup_view_callbacks(self):
+        """Set up view button callbacks."""
+        self.view.set_button_command("add_selected", self.add_selected_rule_files)
+        self.view.set_button_command("add_files", self.add_rule_files)
+        self.view.set_button_command("add_current", self.add_current)
+        self.view.set_button_command("raise", lambda: self.change_priority(1))
+        self.view.set_button_command("lower", lambda: self.change_priority(-1))
+        self.view.set_button_command("requeue", self.requeue_selected)
+        self.view.set_button_command("remove", self.remove_selected)
+        self.view.set_button_command("clear_finished", self.clear_finished)
+        self.view.set_button_command("start", self.start_queue)
+        self.view.set_button_command("stop", self.stop_queue)
+        self.view.set_jobs_changed_command(self.refresh_jobs)
+        self.view.set_pool_size_changed_command(self.on_pool_size_changed)
+        self.view.set_shown_command(self.refresh_rule_files)
+
+    def set_current_config_callback(self, callback):
+        """Set the callback returning the workflow's survey for add_current()."""
+        self._current_config_callback = callback
+
+    def refresh_jobs(self):
+        """Refresh the job table and the queue buttons."""
+        self.view.show_jobs(self.job_queue.get_jobs())
+        self.view.set_queue_running(self.scheduler.is_running())
+
+    def refresh_rule_files(self):
+        """Refresh the list of rule files from the rule index."""
+        self.view.show_rule_files(self.rule_model.get_rule_index())
+
+    # --- Adding jobs ---
+
+    def add_selected_rule_files(self):
+        """Add one job per rule file selected in the list."""
+        names = self.view.get_selected_rule_files()
+        if not names:
+            self.view.show_info("提示", "请先在列表中选择规则文件")
+            return
+        entries = self.rule_model.get_rule_index()
+        self._add_rule_file_paths([entries[name]["path"] for name in names if name in entries])
+
+    def add_rule_files(self):
+        """Add one job per rule file chosen in a file dialog, e.g. outside the rules directory."""
+        file_paths = self.view.ask_rule_files(self.rule_model.get_rules_dir())
+        if file_paths:
+            self._add_rule_file_paths(file_paths)
+
+    def _add_rule_file_paths(self, file_paths):
+        """Add one job per rule file, using the file's URL and count."""
+        errors = []
+        for file_path in file_paths:
+            name = os.path.basename(file_path)
+            data, is_valid, error = self.rule_model.read_rule(file_path)
+            if data is None or not is_valid:
+                errors.append(f"{name}: {error}")
+                continue
+            # Relative pool paths are relative to the rule file
+            try:
+                rules, pool_warnings = resolve_text_pools(data["rules"], os.path.dirname(file_path))
+            except (OSError, ValueError) as e:
+                errors.append(f"{name}: {e}")
+                continue
+            # Caught here rather than as failed forms in every worker
+            problems = check_rules(rules)
+            if problems:
+                errors.append(f"{name}: " + "; ".join(problems[:3])
+                              + (f" ... 共 {len(problems)} 个问题" if len(problems) > 3 else ""))
+                continue
+            for warning in pool_warnings:
+                self.view.append_log(warning)
+            self.job_queue.add_job(
+                name, data["url"].strip(), rules,
+                data["number_of_questionnaires_to_be_filled_out"],
+                priority=self.view.get_priority(),
+                max_concurrency=self.view.get_max_concurrency(),
+                rule_file=name,
+            )
+            self.view.append_log(f"已添加任务: {name}")
+
+        if errors:
+            self.view.show_error("部分规则文件未添加", "\n".join(errors))
+        self._jobs_added()
+
+    def add_current(self):
+        """Add the survey and rules of the workflow tab as a job."""
+        config = self._current_config_callback() if self._current_config_callback else None
+        if config is None:
+            return
+
+        name = config["url"].rstrip("/").rsplit("/", 1)[-1] or config["url"]
+        self.job_queue.add_job(
+            name, config["url"], config["rules"], self.view.get_fill_count(),
+            priority=self.view.get_priority(),
+            max_concurrency=self.view.get_max_concurrency(),
+            topics=config["topics"],
+            parsed_questions=config["parsed_questions"],
+        )
+        self.view.append_log(f"已添加任务: {name}")
+        self._jobs_added()
+
+    def _jobs_added(self):
+        self.refresh_jobs()
+        self.scheduler.notify()
+
+    # --- Job actions ---
+
+    def _selected_job(self):
+        job_id = self.view.get_selected_job_id()
+        if not job_id:
+            self.view.show_info("提示", "请先选择一个任务")
+            return None
+        return self.job_queue.get_job(job_id)
+
+    def change_priority(self, delta):
+        """Raise or lower the priority of the selected job."""
+        job = self._selected_job()
+        if job:
+            self.job_queue.update_job(job["id"], priority=job["priority"] + delta)
+            self.refresh_jobs()
+
+    def requeue_selected(self):
+        """Queue the selected cancelled or failed job again."""
+        job = self._selected_job()
+        if not job:
+            return
+        if job["status"] not in ("cancelled", "error"):
+            self.view.show_info("提示", "只有已取消或出错的任务可以重新排队")
+            return
+        self.job_queue.requeue(job["id"])
+        self._jobs_added()
+
+    def remove_selected(self):
+        """Remove the selected job, stopping it if it is running."""
+        job = self._selected_job()
+        if not job:
+            return
+        is_running = job["id"] in self.scheduler.running_job_ids()
+        if not self.view.ask_to_confirm_remove(job["name"], is_running):
+            return
+        self.scheduler.cancel_job(job["id"])
+        # Its session stays in the history and can be resumed from there
+        self.job_queue.remove_job(job["id"])
+        self.refresh_jobs()
+
+    def clear_finished(self):
+        """Remove completed, cancelled and failed jobs."""
+        self.job_queue.clear_finished()
+        self.refresh_jobs()
+
+    # --- Queue control ---
+
+    def start_queue(self):
+        """Start running queued jobs."""
+        if not self.job_queue.runnable_jobs():
+            self.view.show_info("提示", "队列中没有待运行的任务")
+            return
+        self.scheduler.start()
+        self.refresh_jobs()
+
+    def stop_queue(self):
+        """Stop the queue; running jobs resume where they stopped on the next start."""
+        self.scheduler.stop()
+        self.view.append_log("正在停止任务队列...")
+
+    def on_pool_size_changed(self, pool_size):
+        """Apply and save the number of worker processes."""
+        self.scheduler.set_pool_size(pool_size)
+        self.model.set_config("queue_pool_size", pool_size)
+
+    def check_is_running(self):
+        """Check if the queue is running jobs."""
+        return self.scheduler.is_running()
+
+    def register_shutdown(self, coordinator):
+        """
+        Stop the queue and register its teardown step.
+
+        Args:
+            coordinator (ShutdownCoordinator): Runs the steps concurrently.
+        """
+        if self.scheduler.running_job_ids():
+            coordinator.add("任务队列",
+                            lambda: self.scheduler.terminate(self.PROCESS_CLOSE_TIMEOUT),
+                            timeout=self.PROCESS_CLOSE_TIMEOUT,
+                            kill=self.scheduler.kill)
+        else:
+            self.scheduler.stop()
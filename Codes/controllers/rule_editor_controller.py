@@ -2,9 +2,62 @@
 Rule editor controller - YAML rule editor logic.
 Migrated to PySide6.
 """
+import threading
+
+from tools.read_list_data_from_file import dump_yaml
 from utils.yaml_validator import YamlValidator
 
 
+class _ValidationWorker:
+    """
+    Background thread validating the latest submitted editor snapshot.
+
+    Only one job is pending at a time: a newer snapshot replaces a job that
+    has not started yet, and results of superseded generations are dropped
+    by the receiver.
+    """
+
+    def __init__(self, on_result):
+        """
+        Args:
+            on_result (callable): Called on the worker thread with
+                                  (generation, (is_valid, message, line)).
+        """
+        self.on_result = on_result
+        self._condition = threading.Condition()
+        self._pending = None
+        self._stopped = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def submit(self, generation, content):
+        """Queue a snapshot, replacing any job that has not started yet."""
+        with self._condition:
+            self._pending = (generation, content)
+            self._condition.notify()
+
+    def stop(self):
+        with self._condition:
+            self._stopped = True
+            self._condition.notify()
+
+    def _run(self):
+        while True:
+            with self._condition:
+                while self._pending is None and not self._stopped:
+                    self._condition.wait()
+                if self._stopped:
+                    return
+                generation, content = self._pending
+                self._pending = None
+            # An unexpected validator error must not end live validation
+            try:
+                result = YamlValidator.validate_content(content)
+            except Exception as e:
+                result = (False, f"验证出错: {e}", None)
+            self.on_result(generation, result)
+
+
 class RuleEditorController:
     """Controller for rule editor operations."""
 
@@ -21,6 +74,10 @@ class RuleEditorController:
         self.view = view
         self.rule_model = rule_model
 
+        self._validation_generation = 0
+        self._validation_worker = _ValidationWorker(self.view.signals.validation_finished.emit)
+        self.view.signals.validation_finished.connect(self.on_live_validation_finished)
+
         # Setup view callbacks
         self.setup_view_callbacks()
 
@@ -33,6 +90,7 @@ class RuleEditorController:
         self.view.set_button_command("save_as", self.save_rule_as)
         self.view.set_button_command("validate", self.validate_rule)
         self.view.set_button_command("template", self.new_from_template)
+        self.view.set_validation_command(self.schedule_live_validation)
 
     def new_rule(self):
         """Create a new rule file."""
@@ -50,8 +108,7 @@ class RuleEditorController:
                 return
 
         template = self.rule_model.create_template_rule()
-        import yaml
-        content = yaml.dump(template, allow_unicode=True, default_flow_style=False)
+        content = dump_yaml(template)
         self.view.set_content(content)
         self.view.set_status("已从模板创建新规则")
 
@@ -100,16 +157,39 @@ class RuleEditorController:
     def validate_rule(self):
         """Validate the current rule content."""
         content = self.view.get_content()
+        is_valid, error_msg, line = YamlValidator.validate_content(content)
+        self.view.show_live_validation(is_valid, error_msg, line)
+        self.view.show_validation_result(is_valid, error_msg if not is_valid else "语法正确，结构有效")
 
-        # Validate syntax
-        is_valid, error_msg, data = YamlValidator.validate_syntax(content)
-        if not is_valid:
-            self.view.show_validation_result(False, error_msg)
+    def schedule_live_validation(self):
+        """Validate the current content in the background (debounced by the view)."""
+        self._validation_generation += 1
+        content = self.view.get_content()
+        if not content.strip():
+            self.view.show_live_validation(True, "", None)
+            self.view.set_status("就绪")
             return
+        self._validation_worker.submit(self._validation_generation, content)
 
-        # Validate structure
-        is_valid, error_msg = YamlValidator.validate_rule_structure(data)
-        self.view.show_validation_result(is_valid, error_msg if not is_valid else "语法正确，结构有效")
+    def on_live_validation_finished(self, generation, result):
+        """Show a live validation result unless the content changed since."""
+        if generation != self._validation_generation:
+            return
+        is_valid, error_msg, line = result
+        self.view.show_live_validation(is_valid, error_msg, line)
+
+    def cleanup(self):
+        """Stop the background validation thread."""
+        self._validation_worker.stop()
+
+    def register_shutdown(self, coordinator):
+        """
+        Register this controller's teardown step.
+
+        Args:
+            coordinator (ShutdownCoordinator): Runs the steps concurrently.
+        """
+        coordinator.add("规则验证", self.cleanup)
 
     def load_rule_by_name(self, file_name):
         """Load a rule by file name (called from other controllers)."""
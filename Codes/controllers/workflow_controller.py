@@ -1,18 +1,42 @@
 """
 Workflow controller - merges analyze + fill into an integrated workflow.
 """
+import os
 import threading
 import time
-from bs4 import BeautifulSoup
-from tools.url_change_judge import wait_for_url_change
-from automation.form_filler import FormFiller
-from automation.verification import VerificationHandler
-from automation.browser_setup import BrowserSetup
+from automation.fill_runner import FillRunner, new_run_seed, summarize_timings
+from automation.sharded_runner import ShardedFillRunner
+from automation.browser_manager import BrowserManager
+# bs4, Playwright (via BrowserSetup, which BrowserManager also imports lazily)
+# and pyautogui (via VerificationHandler) are imported where first needed,
+# keeping them off the startup path
+from automation.asset_cache import AssetCache
+from automation.har_archive import HarArchive
+from automation.preflight import check_rules
+from models.text_pool import resolve_text_pools
+from automation.resource_policy import (ResourcePolicy, format_resource_stats,
+                                        DEFAULT_ANALYSIS_PRESET, DEFAULT_FILL_PRESET)
+from models.question_diff import remap_rules, format_diff_summary
+from utils.env_probe import EnvironmentProbe, ENV_PROBE_FILE
+from utils.shutdown import ShutdownCoordinator
 
 
 class WorkflowController:
     """Controller for the integrated workflow: analyze -> configure -> fill."""
 
+    # Seconds between writes of per-form results to the history file
+    RESULTS_FLUSH_INTERVAL = 1.0
+
+    # Seconds a browser launch waits for a first-run environment probe
+    ENV_PROBE_TIMEOUT = 15.0
+
+    # Milliseconds after startup before an opt-in browser warm-up starts
+    BROWSER_WARMUP_DELAY_MS = 2000
+
+    # Seconds teardown steps may take before their processes are killed
+    BROWSER_CLOSE_TIMEOUT = 3.0
+    PROCESS_CLOSE_TIMEOUT = 2.0
+
     def __init__(self, model, view, rule_model, history_model, logger):
         self.model = model
         self.view = view
@@ -21,8 +45,6 @@ class WorkflowController:
         self.logger = logger
 
         # Analysis state
-        self.analysis_playwright_instance = None
-        self.analysis_browser = None
         self.analysis_context = None
         self.analysis_page = None
         self.parsed_questions = []
@@ -32,14 +54,21 @@ class WorkflowController:
         self.stop_flag = threading.Event()
         self.current_session_id = None
         self.current_rules = None
-        self.playwright_instance = None
-        self.browser = None
         self.context = None
         self.page = None
+        self.sharded_runner = None
 
-        # DPI ratio
-        from tools.screen_resolution import get_scale_ratio
-        self.ratio = get_scale_ratio()
+        # Static asset cache shared by analysis and fill sessions
+        self.asset_cache = self._create_asset_cache()
+
+        # DPI ratio and browser channel, probed in the background on first run
+        self.env_probe = EnvironmentProbe(os.path.join(self.model.config_dir, ENV_PROBE_FILE))
+        self.env_probe.start()
+
+        # All Playwright work runs on the manager's owner thread; analysis and
+        # fill get contexts from one shared driver, which can be started
+        # ahead of time when "browser_warmup" is enabled
+        self.browser_manager = BrowserManager(log_callback=self.view.append_log)
 
         # Load saved link if available
         saved_link = self.model.get_survey_link()
@@ -47,6 +76,8 @@ class WorkflowController:
             self.view.link_edit.setText(saved_link)
 
         self.setup_view_callbacks()
+        if self.model.get_config("browser_warmup", False) and saved_link:
+            self.view.after(self.BROWSER_WARMUP_DELAY_MS, self._warm_up_browser)
 
     def setup_view_callbacks(self):
         """Set up view button callbacks."""
@@ -54,7 +85,30 @@ class WorkflowController:
         self.view.set_start_command(self.start_fill)
         self.view.set_stop_command(self.stop_fill)
         self.view.set_equalize_command(self.equalize_probabilities)
+        self.view.set_analysis_complete_command(self.on_analysis_complete)
         self.view.set_reset_command(self.reset_tree)
+        self.view.set_link_changed_command(self._on_link_changed)
+
+    # --- Browser warm-up ---
+
+    def _on_link_changed(self, text):
+        """Warm up a browser once a survey link has been entered."""
+        if text.strip().startswith(("http://", "https://")) \
+                and self.model.get_config("browser_warmup", False):
+            self._warm_up_browser()
+
+    def _warm_up_browser(self):
+        """Start a browser for the task the user is most likely to run next."""
+        if self.is_running:
+            return
+        # Without analysis results the next task is the headless analysis;
+        # otherwise it is a visible fill, so only the driver is started
+        # rather than popping up a browser window speculatively
+        self.browser_manager.warm_up(
+            headless=True,
+            channel=self._browser_channel,
+            launch_browser=not self.parsed_questions,
+        )
 
     # --- Analysis ---
 
@@ -70,28 +124,35 @@ class WorkflowController:
         self.view.set_status("正在分析问卷...")
         self.view.append_log("开始分析问卷...")
 
-        thread = threading.Thread(target=self._analyze_worker, args=(link,))
-        thread.daemon = True
-        thread.start()
+        self.browser_manager.submit(self._analyze_worker, link)
 
     def _analyze_worker(self, link):
-        """Worker thread for survey analysis with Playwright."""
+        """Survey analysis with Playwright, run on the browser manager's thread."""
+        resource_policy = self._create_resource_policy("analysis_resource_preset", DEFAULT_ANALYSIS_PRESET)
         try:
+            har_archive = self._create_har_archive("analysis", self.view.append_log)
             if self.analysis_page is None:
-                self.analysis_playwright_instance, self.analysis_browser, self.analysis_context, self.analysis_page = \
-                    BrowserSetup.setup_browser_for_analysis()
+                self.analysis_context, self.analysis_page = self.browser_manager.new_context(
+                    headless=True,
+                    channel=self._browser_channel(),
+                    resource_policy=resource_policy,
+                    asset_cache=self._asset_cache_for(har_archive),
+                    har_archive=har_archive,
+                )
 
             self.analysis_page.goto(link, wait_until="domcontentloaded")
             self.analysis_page.wait_for_selector('#divQuestion', timeout=10000)
             page_content = self.analysis_page.content()
             questions = self._analyze_survey_page(page_content)
-            self.parsed_questions = questions
 
             if questions:
                 self.view.signals.analysis_complete.emit(questions)
                 self.view.append_log(f"分析完成，共发现 {len(questions)} 个问题")
             else:
                 self.view.append_log("未找到问题，请确认链接是否正确")
+            if resource_policy.enabled:
+                self.view.append_log(resource_policy.format_stats())
+            self._log_asset_cache_stats(self.view.append_log)
 
         except Exception as e:
             error_msg = str(e)
@@ -103,11 +164,84 @@ class WorkflowController:
                 self._cleanup_analysis_browser()
             except Exception:
                 pass
+            resource_policy.save_size_hints()
             self.view.after(0, lambda: self.view.analyze_button.setEnabled(True))
             self.view.set_status("就绪")
 
+    @property
+    def scale_ratio(self):
+        """DPI scale ratio used for verification mouse coordinates."""
+        return self.env_probe.get("scale_ratio", 1.0, timeout=self.ENV_PROBE_TIMEOUT)
+
+    def _browser_channel(self):
+        """Detected browser channel, or "auto" if the probe has not finished."""
+        return self.env_probe.get("browser_channel", "auto", timeout=self.ENV_PROBE_TIMEOUT)
+
+    def _create_har_archive(self, kind, log):
+        """
+        Create the HAR archive for an analysis or fill session.
+
+        Args:
+            kind (str): "analysis" or "fill"; selects the archive file.
+            log (callable): Logging function.
+
+        Returns:
+            HarArchive or None: None when HAR mode is off.
+        """
+        mode = self.model.get_config("har_mode", "off")
+        if mode == "off":
+            return None
+
+        har_dir = os.path.join(self.model.config_dir, "har")
+        archive_path = os.path.join(har_dir, f"{kind}.har.zip")
+        if mode == "replay" and not os.path.exists(archive_path):
+            # A fill can replay the analysis recording of the same survey and vice versa
+            other_kind = "fill" if kind == "analysis" else "analysis"
+            other_path = os.path.join(har_dir, f"{other_kind}.har.zip")
+            if os.path.exists(other_path):
+                archive_path = other_path
+
+        har_archive = HarArchive(mode, archive_path)
+        if har_archive.recording:
+            log(f"HAR录制: {archive_path}")
+        elif har_archive.replaying:
+            log(f"HAR回放(离线): {archive_path}")
+        return har_archive
+
+    def _asset_cache_for(self, har_archive):
+        """The asset cache is bypassed in replay so runs depend only on the archive."""
+        if har_archive is not None and har_archive.replaying:
+            return None
+        return self.asset_cache
+
+    def _create_asset_cache(self):
+        """Create the on-disk asset cache, or None if disabled in the config."""
+        max_mb = self.model.get_config("asset_cache_max_mb", 100)
+        if not max_mb:
+            return None
+        return AssetCache(os.path.join(self.model.config_dir, "asset_cache"),
+                          max_bytes=int(max_mb) * 1024 * 1024)
+
+    def _log_asset_cache_stats(self, log):
+        """Log and persist the asset cache after a run."""
+        if self.asset_cache is not None:
+            log(self.asset_cache.format_stats())
+            self.asset_cache.reset_stats()
+            self.asset_cache.flush()
+
+    def _create_resource_policy(self, config_key, default_preset):
+        """Create the resource policy configured for analysis or fill runs."""
+        preset = self.model.get_config(config_key, default_preset)
+        size_hints_file = os.path.join(self.model.config_dir, "resource_size_hints.json")
+        try:
+            return ResourcePolicy(preset, size_hints_file=size_hints_file)
+        except ValueError as e:
+            self.view.append_log(f"{e}，已改用 {default_preset}")
+            return ResourcePolicy(default_preset, size_hints_file=size_hints_file)
+
     def _analyze_survey_page(self, page_content):
         """Analyze the survey page structure using BeautifulSoup."""
+        from bs4 import BeautifulSoup
         soup = BeautifulSoup(page_content, 'html.parser')
         form = soup.find('div', id='divQuestion')
 
@@ -175,6 +309,17 @@ class WorkflowController:
 
         return questions
 
+    def on_analysis_complete(self, questions):
+        """Show freshly analyzed questions, carrying over already configured rules."""
+        previous = self.parsed_questions
+        self.parsed_questions = questions
+        if previous:
+            rules, summary = remap_rules(previous, self.view.build_rules_from_tree(), questions)
+            self.view.update_tree(questions, rules)
+            self.view.append_log(format_diff_summary(summary))
+        else:
+            self.view.populate_tree(questions)
+
     # --- Fill ---
 
     def log_callback(self, message):
@@ -193,6 +338,21 @@ class WorkflowController:
             self.view.show_error("错误", "请先分析问卷并配置规则")
             return
 
+        # History keeps only the pool reference and its content hash
+        try:
+            rules, pool_warnings = resolve_text_pools(rules, self.rule_model.get_rules_dir())
+        except (OSError, ValueError) as e:
+            self.view.show_error("文本池错误", str(e))
+            return
+
+        problems = check_rules(rules, self.parsed_questions or None)
+        if problems:
+            details = "\n".join(problems[:10])
+            if len(problems) > 10:
+                details += f"\n... 共 {len(problems)} 个问题"
+            self.view.show_error("规则与问卷不匹配", details)
+            return
+
         fill_count = self.view.get_fill_count()
         if fill_count < 1:
             self.view.show_error("错误", "填写数量必须大于0")
@@ -201,187 +361,289 @@ class WorkflowController:
         # Snapshot values for worker thread (thread safety)
         self._fill_url = url
         self._fill_count = fill_count
+        self._fill_indices = list(range(1, fill_count + 1))
+        self._fill_process_count = min(self.view.get_process_count(), fill_count)
+        self._fill_seed = new_run_seed()
+        self._fill_pipeline = self.view.get_pipeline_enabled()
+        self._fill_topics = self.view.get_question_topics()
         self.current_rules = rules
 
-        # Reset state
-        self.stop_flag.clear()
-        self.is_running = True
-        self.view.set_running_state(True)
-        self.view.clear_log()
-        self.view.set_progress(0)
-
-        # Set up logger callback
-        self.logger.set_gui_callback(self.log_callback)
+        self._begin_run(pool_warnings)
 
         # Create history session with parsed questions and rules
         self.current_session_id = self.history_model.add_session(
             "workflow", url, fill_count, "running",
             parsed_questions=self.parsed_questions,
             rules=rules,
+            run_seed=self._fill_seed,
+            process_count=self._fill_process_count,
+            topics=self._fill_topics,
         )
 
-        # Start filling in background thread
-        self.fill_thread = threading.Thread(target=self._fill_worker)
-        self.fill_thread.daemon = True
-        self.fill_thread.start()
+        self._start_fill_thread()
+
+    def get_job_config(self):
+        """
+        Validate the current survey and rules for adding them to the job queue.
+
+        Shows an error and returns None if they cannot be queued.
+
+        Returns:
+            dict or None: url, rules (text pools resolved), topics and
+                          parsed_questions of the current survey.
+        """
+        url = self.view.get_survey_link()
+        if not url:
+            self.view.show_error("错误", "请输入问卷链接")
+            return None
+
+        rules = self.view.build_rules_from_tree()
+        if not rules:
+            self.view.show_error("错误", "请先分析问卷并配置规则")
+            return None
 
-    def _fill_worker(self):
-        """Worker thread for form filling with Playwright."""
         try:
-            url = self._fill_url
-            fill_count = self._fill_count
-            question_infos = self.current_rules
+            rules, pool_warnings = resolve_text_pools(rules, self.rule_model.get_rules_dir())
+        except (OSError, ValueError) as e:
+            self.view.show_error("文本池错误", str(e))
+            return None
+
+        problems = check_rules(rules, self.parsed_questions or None)
+        if problems:
+            details = "\n".join(problems[:10])
+            if len(problems) > 10:
+                details += f"\n... 共 {len(problems)} 个问题"
+            self.view.show_error("规则与问卷不匹配", details)
+            return None
+
+        return {
+            "url": url,
+            "rules": rules,
+            "topics": self.view.get_question_topics(),
+            "parsed_questions": self.parsed_questions,
+        }
 
-            form_filler = FormFiller(log_callback=self.logger.info)
-            verification_handler = VerificationHandler(ratio=self.ratio)
+    def resume_session(self, session):
+        """
+        Continue an unfinished session with its remaining forms.
 
-            self.logger.info("正在打开浏览器...")
-            self.playwright_instance, self.browser, self.context, self.page = BrowserSetup.setup_browser_for_fill()
+        The forms are filled with the session's rules and run seed, so each
+        remaining form gets the same answers it would have got in the
+        original run; results are appended to the same session.
 
-            fill_form_num = 0
-            window_title = None
+        Args:
+            session (dict): Session from the history model.
+        """
+        if self.is_running:
+            self.view.show_error("错误", "已有填写任务正在运行")
+            return
+        if session.get("run_seed") is None or not session.get("rules"):
+            self.view.show_error("无法继续", "该会话没有保存规则或随机种子，无法从断点继续")
+            return
+        pending = self.history_model.pending_form_indices(session["id"])
+        if not pending:
+            self.view.show_info("提示", "该会话的问卷已全部填写")
+            return
 
-            while fill_form_num < fill_count and not self.stop_flag.is_set():
-                fill_form_num += 1
+        # Pool references are re-resolved to warn if a pool file changed
+        try:
+            rules, pool_warnings = resolve_text_pools(session["rules"], self.rule_model.get_rules_dir())
+        except (OSError, ValueError) as e:
+            self.view.show_error("文本池错误", str(e))
+            return
 
-                self.logger.info(f"正在打开网页... ({fill_form_num}/{fill_count})")
-                self.page.goto(url, wait_until="domcontentloaded")
+        self.restore_session(session)
 
-                if window_title is None:
-                    window_title = self.page.title()
+        self._fill_url = session["url"]
+        self._fill_count = session["fill_count"]
+        self._fill_indices = pending
+        self._fill_process_count = min(session.get("process_count") or 1, len(pending))
+        self._fill_seed = session["run_seed"]
+        self._fill_pipeline = self.view.get_pipeline_enabled()
+        self._fill_topics = session.get("topics") or self.view.get_question_topics()
+        self.current_rules = rules
 
-                self.logger.info(f"填写问题... ({fill_form_num}/{fill_count})")
-                success = form_filler.fill_questions(
-                    self.page,
-                    question_infos,
-                    delay=0.2
-                )
+        self._begin_run(pool_warnings)
+        self.view.set_progress((self._fill_count - len(pending)) / self._fill_count * 100)
+        self.current_session_id = session["id"]
+        self.history_model.mark_resumed(session["id"])
+        self.logger.info(f"从断点继续会话 {session['id']}: "
+                         f"已完成 {self._fill_count - len(pending)}/{self._fill_count} 份，"
+                         f"剩余 {len(pending)} 份")
 
-                if not success:
-                    self.logger.warning(f"第{fill_form_num}份问卷填写时出现问题")
-                    continue
+        self._start_fill_thread()
 
-                # Submit form
-                self.page.locator('.submitbtn').click()
-                self.logger.info(f"提交问卷... ({fill_form_num}/{fill_count})")
-                time.sleep(2)
+    def _begin_run(self, pool_warnings):
+        """Reset run state and the log before a run starts."""
+        self.stop_flag.clear()
+        self.is_running = True
+        self.view.set_running_state(True)
+        self.view.clear_log()
+        self.view.set_progress(0)
+        for warning in pool_warnings:
+            self.view.append_log(warning)
 
-                # Check for verification
-                old_url = url
-                if not wait_for_url_change(self.page, old_url, timeout=3000):
-                    self.logger.info(f"触发了验证... ({fill_form_num}/{fill_count})")
-                    self._handle_verification(verification_handler, window_title, old_url, fill_form_num)
+        # Set up logger callback
+        self.logger.set_gui_callback(self.log_callback)
 
-                # Update progress
-                progress = (fill_form_num / fill_count) * 100
-                self.view.set_progress(progress)
+    def _start_fill_thread(self):
+        """Start filling in a background thread."""
+        self.fill_thread = threading.Thread(target=self._fill_worker)
+        self.fill_thread.daemon = True
+        self.fill_thread.start()
+
+    def _fill_worker(self):
+        """Worker thread for form filling with Playwright."""
+        url = self._fill_url
+        fill_count = self._fill_count
+        # A resumed run counts the forms of its earlier attempts as done
+        self._completed_forms = fill_count - len(self._fill_indices)
+        self._run_results = []
+        self._pending_results = []
+        self._last_results_flush = time.monotonic()
+        try:
+            if self._fill_process_count > 1:
+                self._fill_sharded(url, fill_count)
+            else:
+                self.browser_manager.call(self._fill_in_thread, url, fill_count)
 
             # Update final status
             if self.stop_flag.is_set():
-                self.logger.info(f"填写已停止，已完成{fill_form_num}/{fill_count}份问卷")
+                self.logger.info(f"填写已停止，已完成{self._completed_forms}/{fill_count}份问卷")
                 self.history_model.update_session_status(self.current_session_id, "stopped")
             else:
                 self.logger.info(f"问卷已填写{fill_count}份，任务完成")
                 self.history_model.update_session_status(self.current_session_id, "completed")
+            self._log_timing_summary()
 
         except Exception as e:
+            # Includes ShardError when worker processes of a sharded run failed
             self.logger.error(f"填写过程中出错: {e}")
             self.history_model.update_session_status(self.current_session_id, "error")
 
         finally:
-            self._cleanup_fill_browser()
+            self._flush_form_results()
+            if self.context is not None:
+                self.browser_manager.call(self._cleanup_fill_browser)
+            self.sharded_runner = None
             self.is_running = False
             self.logger.save_session_logs(self.current_session_id, self.history_model)
             self.view.set_running_state(False)
 
+    def _fill_in_thread(self, url, fill_count):
+        """Fill all forms with a single browser, on the browser manager's thread."""
+        from automation.browser_setup import BrowserSetup
+        from automation.verification import VerificationHandler
+        har_archive = self._create_har_archive("fill", self.logger.info)
+        runner = FillRunner(
+            url, self.current_rules, fill_count, self._fill_seed,
+            topics=self._fill_topics,
+            log_callback=self.logger.info,
+            stop_event=self.stop_flag,
+            verification_handler=VerificationHandler(ratio=self.scale_ratio, stop_event=self.stop_flag),
+            har_archive=har_archive,
+        )
+
+        resource_policy = self._create_resource_policy("fill_resource_preset", DEFAULT_FILL_PRESET)
+
+        self.logger.info("正在打开浏览器...")
+        self.context, self.page = self.browser_manager.new_context(
+            headless=False,
+            channel=self._browser_channel(),
+            resource_policy=resource_policy,
+            asset_cache=self._asset_cache_for(har_archive),
+            har_archive=har_archive,
+        )
+
+        form_indices = self._fill_indices
+        if self._fill_pipeline:
+            pages = (self.page, BrowserSetup.new_page(self.context))
+            runner.run_pipelined(pages, form_indices, on_result=self._on_form_result)
+        else:
+            runner.run(self.page, form_indices, on_result=self._on_form_result)
+
+        if resource_policy.enabled:
+            self.logger.info(resource_policy.format_stats())
+        resource_policy.save_size_hints()
+        self._log_asset_cache_stats(self.logger.info)
+        if har_archive is not None and har_archive.replaying:
+            self.logger.info(f"HAR回放: 已拦截 {har_archive.stubbed_submissions} 次提交")
+
+    def _fill_sharded(self, url, fill_count):
+        """Fill all forms across several worker processes."""
+        self.logger.info(f"正在以 {self._fill_process_count} 个进程并行填写...")
+        har_archive = self._create_har_archive("fill", self.logger.info)
+        har_replay_path = None
+        if har_archive is not None:
+            if har_archive.replaying:
+                har_replay_path = har_archive.archive_path
+            else:
+                self.logger.warning("多进程填写不支持HAR录制，本次不录制")
+        self.sharded_runner = ShardedFillRunner(
+            url, self.current_rules, fill_count, self._fill_seed,
+            self._fill_process_count,
+            topics=self._fill_topics,
+            pipeline=self._fill_pipeline,
+            resource_preset=self.model.get_config("fill_resource_preset", DEFAULT_FILL_PRESET),
+            asset_cache_dir=self.asset_cache.cache_dir if self.asset_cache and not har_replay_path else None,
+            har_replay_path=har_replay_path,
+            channel=self._browser_channel(),
+            log_callback=self.logger.info,
+            stop_event=self.stop_flag,
+        )
+        self.sharded_runner.run(form_indices=self._fill_indices, on_result=self._on_form_result)
+        if self.sharded_runner.resource_stats.get("blocked_requests"):
+            self.logger.info(format_resource_stats(self.sharded_runner.resource_stats))
+
+    def _on_form_result(self, result):
+        """Record a finished form and update progress."""
+        self._completed_forms += 1
+        self._run_results.append(result)
+        self._pending_results.append(result)
+        if time.monotonic() - self._last_results_flush >= self.RESULTS_FLUSH_INTERVAL:
+            self._flush_form_results()
+
+        progress = (self._completed_forms / self._fill_count) * 100
+        self.view.set_progress(progress)
+
+    def _log_timing_summary(self):
+        """Log average per-phase timings of the finished run."""
+        averages = summarize_timings(self._run_results)
+        if averages:
+            self.logger.info(
+                "平均耗时: 打开 {navigate:.2f}s, 填写 {fill:.2f}s, 提交 {submit:.2f}s".format(
+                    navigate=averages.get("navigate", 0.0),
+                    fill=averages.get("fill", 0.0),
+                    submit=averages.get("submit", 0.0),
+                )
+            )
+
+    def _flush_form_results(self):
+        """Persist buffered per-form results to the current session."""
+        results, self._pending_results = self._pending_results, []
+        self._last_results_flush = time.monotonic()
+        self.history_model.add_form_results(self.current_session_id, results)
+
     def stop_fill(self):
         """Stop the form filling process."""
         if self.is_running:
             self.stop_flag.set()
             self.logger.info("正在停止...")
 
-    def _handle_verification(self, handler, window_title, old_url, fill_num):
-        """Handle verification challenges."""
-        try:
-            locator = self.page.locator(".sm-txt")
-            if locator.count() > 0:
-                text = locator.inner_text()
-                if text == "点击按钮开始智能验证":
-                    handler.switch_window_to_edge(window_title)
-                    self.logger.info(f"智能验证... ({fill_num})")
-                    handler.intelligent_verification(self.page, locator)
-
-                    if not wait_for_url_change(self.page, old_url, timeout=5000):
-                        locator_slide = self.page.locator("span", has_text="请按住滑块，拖动到最右边")
-                        if locator_slide.count() > 0:
-                            handler.switch_window_to_edge(window_title)
-                            self.logger.info(f"滑块验证... ({fill_num})")
-                            handler.slider_verification(self.page, locator_slide)
-                            wait_for_url_change(self.page, old_url, timeout=10000)
-
-        except Exception as e:
-            self.logger.error(f"验证处理失败: {e}")
-
     def _cleanup_fill_browser(self):
-        """Clean up fill browser resources."""
-        if self.page:
-            try:
-                self.page.close()
-            except:
-                pass
-            self.page = None
-
+        """Release the fill context; the shared browser is closed once unused."""
+        self.page = None
         if self.context:
-            try:
-                self.context.close()
-            except:
-                pass
+            self.browser_manager.release(self.context)
             self.context = None
 
-        if self.browser:
-            try:
-                self.browser.close()
-            except:
-                pass
-            self.browser = None
-
-        if self.playwright_instance:
-            try:
-                self.playwright_instance.stop()
-            except:
-                pass
-            self.playwright_instance = None
-
     def _cleanup_analysis_browser(self):
-        """Clean up analysis browser resources."""
-        if self.analysis_page:
-            try:
-                self.analysis_page.close()
-            except:
-                pass
-            self.analysis_page = None
-
+        """Release the analysis context; the shared browser is closed once unused."""
+        self.analysis_page = None
         if self.analysis_context:
-            try:
-                self.analysis_context.close()
-            except:
-                pass
+            self.browser_manager.release(self.analysis_context)
             self.analysis_context = None
 
-        if self.analysis_browser:
-            try:
-                self.analysis_browser.close()
-            except:
-                pass
-            self.analysis_browser = None
-
-        if self.analysis_playwright_instance:
-            try:
-                self.analysis_playwright_instance.stop()
-            except:
-                pass
-            self.analysis_playwright_instance = None
-
     # --- Restore ---
 
     def restore_session(self, session):
@@ -395,7 +657,7 @@ class WorkflowController:
             self.model.set_survey_link(url)
 
         self.parsed_questions = parsed_questions
-        self.view.populate_tree(parsed_questions, rules)
+        self.view.update_tree(parsed_questions, rules)
         self.view.append_log(f"已恢复会话 {session.get('id', '')} 的问卷配置")
 
     # --- Tree helpers ---
@@ -407,7 +669,7 @@ class WorkflowController:
     def reset_tree(self):
         """Reset the tree to the last analysis results."""
         if self.parsed_questions:
-            self.view.populate_tree(self.parsed_questions)
+            self.view.update_tree(self.parsed_questions)
         else:
             self.view.show_info("提示", "没有可重置的数据，请先分析问卷")
 
@@ -415,8 +677,40 @@ class WorkflowController:
 
     def cleanup(self):
         """Clean up all browser resources."""
-        self._cleanup_analysis_browser()
-        self._cleanup_fill_browser()
+        coordinator = ShutdownCoordinator(log_callback=self.logger.info)
+        self.register_shutdown(coordinator)
+        coordinator.run()
+
+    def register_shutdown(self, coordinator):
+        """
+        Stop any run and register this controller's teardown steps.
+
+        Args:
+            coordinator (ShutdownCoordinator): Runs the steps concurrently.
+        """
+        self.stop_flag.set()
+
+        sharded_runner = self.sharded_runner
+        if sharded_runner:
+            coordinator.add("填写进程",
+                            lambda: sharded_runner.terminate(self.PROCESS_CLOSE_TIMEOUT),
+                            timeout=self.PROCESS_CLOSE_TIMEOUT,
+                            kill=sharded_runner.kill)
+
+        if self.browser_manager.is_running():
+            def close_browsers():
+                # Browser objects belong to the owner thread: release this
+                # controller's contexts behind any running task (which the
+                # stop flag ends), then close the shared browsers and driver
+                self.browser_manager.submit(self._cleanup_analysis_browser)
+                self.browser_manager.submit(self._cleanup_fill_browser)
+                self.browser_manager.shutdown(timeout=self.BROWSER_CLOSE_TIMEOUT)
+
+            coordinator.add("浏览器", close_browsers, timeout=self.BROWSER_CLOSE_TIMEOUT,
+                            kill=self.browser_manager.kill)
+
+        if self.asset_cache is not None:
+            coordinator.add("资源缓存", self.asset_cache.flush)
 
     def check_is_running(self):
         """Check if filling is currently running."""
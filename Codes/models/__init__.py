@@ -1,6 +1,25 @@
 # Models package
-from .survey_model import SurveyModel
-from .rule_model import RuleModel
-from .history_model import HistoryModel
+#
+# Exports are imported on first access, so that importing a light module such
+# as models.probability_store (e.g. in a fill worker process) does not load
+# rule_model and with it PyYAML and the Qt-based utils package.
+import importlib
 
-__all__ = ['SurveyModel', 'RuleModel', 'HistoryModel']
+_EXPORTS = {
+    'SurveyModel': '.survey_model',
+    'RuleModel': '.rule_model',
+    'HistoryModel': '.history_model',
+    'JobQueue': '.job_queue',
+    'ProbabilityStore': '.probability_store',
+    'TextPool': '.text_pool',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -3,12 +3,16 @@ History model for session history storage.
 """
 import os
 import json
+import threading
 from datetime import datetime
 
 
 class HistoryModel:
     """Model for managing session history."""
 
+    # Statuses of sessions that can be resumed with their remaining forms
+    RESUMABLE_STATUSES = ("stopped", "error", "interrupted")
+
     def __init__(self, history_dir="history"):
         """
         Initialize the history model.
@@ -19,7 +23,10 @@ class HistoryModel:
         self.history_dir = history_dir
         os.makedirs(history_dir, exist_ok=True)
         self.history_file = os.path.join(history_dir, "sessions.json")
+        # Sessions are updated from fill worker and job queue threads
+        self._lock = threading.RLock()
         self.sessions = self.load_sessions()
+        self.mark_interrupted_sessions()
 
     def load_sessions(self):
         """
@@ -36,16 +43,34 @@ class HistoryModel:
                 return []
         return []
 
+    def mark_interrupted_sessions(self):
+        """
+        Mark sessions left "running" by a crashed or killed app as "interrupted".
+
+        Called on load, when no run of this app can be in progress yet.
+        """
+        interrupted = [s for s in self.sessions if s.get("status") == "running"]
+        for session in interrupted:
+            session["status"] = "interrupted"
+        if interrupted:
+            self.save_sessions()
+
     def save_sessions(self):
-        """Save sessions to file."""
+        """Save sessions to file, replacing it atomically."""
+        # A partially written file would load as no sessions at all,
+        # losing the checkpoints of unfinished runs
+        tmp_file = self.history_file + ".tmp"
         try:
-            with open(self.history_file, "w", encoding="utf-8") as file:
-                json.dump(self.sessions, file, indent=2, ensure_ascii=False)
+            with self._lock:
+                with open(tmp_file, "w", encoding="utf-8") as file:
+                    json.dump(self.sessions, file, indent=2, ensure_ascii=False)
+                os.replace(tmp_file, self.history_file)
         except IOError as e:
             print(f"Error saving history: {e}")
 
     def add_session(self, rule_file, url, fill_count, status="completed",
-                    parsed_questions=None, rules=None):
+                    parsed_questions=None, rules=None, run_seed=None,
+                    process_count=1, topics=None, job_id=None):
         """
         Add a new session to history.
 
@@ -56,25 +81,41 @@ class HistoryModel:
             status (str): Session status (completed, stopped, error).
             parsed_questions (list): Parsed question dicts from survey analysis.
             rules (list): Rule dicts with configured probabilities.
+            run_seed (int): Seed the per-form answer RNG streams derive from.
+            process_count (int): Number of worker processes used by the run.
+            topics (list): Survey topic numbers of the rules.
+            job_id (str): ID of the queue job the session belongs to, if any.
 
         Returns:
             str: Session ID (timestamp).
         """
-        session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
-        session = {
-            "id": session_id,
-            "timestamp": datetime.now().isoformat(),
-            "rule_file": rule_file,
-            "url": url,
-            "fill_count": fill_count,
-            "status": status,
-            "logs": [],
-            "parsed_questions": parsed_questions,
-            "rules": rules,
-        }
-        self.sessions.insert(0, session)  # Add to beginning
-        self.save_sessions()
-        return session_id
+        with self._lock:
+            base_id = session_id = datetime.now().strftime("%Y%m%d_%H%M%S")
+            # Queued jobs can start several sessions within the same second
+            suffix = 1
+            while self.get_session(session_id) is not None:
+                suffix += 1
+                session_id = f"{base_id}_{suffix}"
+            session = {
+                "id": session_id,
+                "timestamp": datetime.now().isoformat(),
+                "rule_file": rule_file,
+                "url": url,
+                "fill_count": fill_count,
+                "status": status,
+                "logs": [],
+                "parsed_questions": parsed_questions,
+                "rules": rules,
+                "run_seed": run_seed,
+                "process_count": process_count,
+                "topics": topics,
+                "form_results": [],
+                "checkpoint": None,
+                "job_id": job_id,
+            }
+            self.sessions.insert(0, session)  # Add to beginning
+            self.save_sessions()
+            return session_id
 
     def get_sessions(self):
         """
@@ -110,8 +151,68 @@ class HistoryModel:
         """
         session = self.get_session(session_id)
         if session:
-            session["logs"].append(log_message)
-            self.save_sessions()
+            with self._lock:
+                session["logs"].append(log_message)
+                self.save_sessions()
+
+    def add_form_results(self, session_id, results):
+        """
+        Append per-form results to a session and advance its checkpoint.
+
+        The results are the per-form checkpoints: each records the form
+        index and its outcome. The answers of a form are sampled from an RNG
+        stream derived from the session's run_seed and the form index (see
+        automation.fill_runner.form_rng), so the seed and the indices
+        still pending are all a resumed run needs.
+
+        Args:
+            session_id (str): Session ID.
+            results (list): Result dicts with index, status and duration.
+        """
+        if not results:
+            return
+        session = self.get_session(session_id)
+        if session:
+            with self._lock:
+                form_results = session.setdefault("form_results", [])
+                form_results.extend(results)
+                session["checkpoint"] = {
+                    "completed": len(form_results),
+                    "last_index": results[-1]["index"],
+                    "last_status": results[-1]["status"],
+                    "updated_at": datetime.now().isoformat(),
+                }
+                self.save_sessions()
+
+    def pending_form_indices(self, session_id):
+        """
+        Get the form indices of a session that were not attempted yet.
+
+        Args:
+            session_id (str): Session ID.
+
+        Returns:
+            list: Ascending 1-based form indices, empty if the session is unknown.
+        """
+        session = self.get_session(session_id)
+        if not session:
+            return []
+        done = {result["index"] for result in session.get("form_results") or []}
+        return [i for i in range(1, session["fill_count"] + 1) if i not in done]
+
+    def mark_resumed(self, session_id):
+        """
+        Set a session running again and record when it was resumed.
+
+        Args:
+            session_id (str): Session ID.
+        """
+        session = self.get_session(session_id)
+        if session:
+            with self._lock:
+                session["status"] = "running"
+                session.setdefault("resumed_at", []).append(datetime.now().isoformat())
+                self.save_sessions()
 
     def update_session_status(self, session_id, status):
         """
@@ -123,13 +224,15 @@ class HistoryModel:
         """
         session = self.get_session(session_id)
         if session:
-            session["status"] = status
-            self.save_sessions()
+            with self._lock:
+                session["status"] = status
+                self.save_sessions()
 
     def clear_history(self):
         """Clear all session history."""
-        self.sessions = []
-        self.save_sessions()
+        with self._lock:
+            self.sessions = []
+            self.save_sessions()
 
     def delete_session(self, session_id):
         """
@@ -138,8 +241,9 @@ class HistoryModel:
         Args:
             session_id (str): Session ID to delete.
         """
-        self.sessions = [s for s in self.sessions if s["id"] != session_id]
-        self.save_sessions()
+        with self._lock:
+            self.sessions = [s for s in self.sessions if s["id"] != session_id]
+            self.save_sessions()
 
     def export_session_logs(self, session_id, file_path):
         """
@@ -164,6 +268,10 @@ class HistoryModel:
                 f.write(f"URL: {session['url']}\n")
                 f.write(f"Fill Count: {session['fill_count']}\n")
                 f.write(f"Status: {session['status']}\n")
+                form_results = session.get("form_results") or []
+                if form_results:
+                    submitted = sum(1 for r in form_results if r.get("status") == "submitted")
+                    f.write(f"Submitted: {submitted}/{len(form_results)}\n")
                 f.write("=" * 50 + "\n")
                 f.write("Logs:\n")
                 for log in session.get("logs", []):
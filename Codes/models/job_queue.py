@@ -0,0 +1,190 @@
+"""
+Persistent queue of fill jobs.
+
+A job is one survey URL with a snapshot of its rules, a target number of
+forms, a priority and the number of worker processes it may use at once.
+The queue is stored as JSON next to the session history so queued and
+unfinished jobs survive restarts; a job's progress lives in its
+HistoryModel session, which is resumed where it stopped.
+"""
+import json
+import os
+import threading
+from datetime import datetime
+
+
+JOB_QUEUE_FILE = "job_queue.json"
+
+
+class JobQueue:
+    """Model for the fill job queue."""
+
+    # Statuses of jobs the scheduler may start
+    RUNNABLE_STATUSES = ("queued",)
+
+    # Statuses of jobs that will not run again
+    FINISHED_STATUSES = ("completed", "cancelled", "error")
+
+    def __init__(self, queue_dir="history"):
+        """
+        Initialize the job queue.
+
+        Args:
+            queue_dir (str): Directory of the queue file.
+        """
+        os.makedirs(queue_dir, exist_ok=True)
+        self.queue_file = os.path.join(queue_dir, JOB_QUEUE_FILE)
+        self._lock = threading.RLock()
+        self.jobs = self.load_jobs()
+        self._requeue_interrupted()
+
+    def load_jobs(self):
+        """
+        Load jobs from file.
+
+        Returns:
+            list: Job dictionaries in insertion order.
+        """
+        if os.path.exists(self.queue_file):
+            try:
+                with open(self.queue_file, "r", encoding="utf-8") as file:
+                    return json.load(file)
+            except (json.JSONDecodeError, IOError):
+                return []
+        return []
+
+    def save_jobs(self):
+        """Save jobs to file, replacing it atomically."""
+        tmp_file = self.queue_file + ".tmp"
+        try:
+            with self._lock:
+                with open(tmp_file, "w", encoding="utf-8") as file:
+                    json.dump(self.jobs, file, indent=2, ensure_ascii=False)
+                os.replace(tmp_file, self.queue_file)
+        except IOError as e:
+            print(f"Error saving job queue: {e}")
+
+    def _requeue_interrupted(self):
+        """Queue jobs left "running" by a crashed or closed app again."""
+        interrupted = [job for job in self.jobs if job["status"] == "running"]
+        for job in interrupted:
+            job["status"] = "queued"
+        if interrupted:
+            self.save_jobs()
+
+    def add_job(self, name, url, rules, fill_count, priority=0, max_concurrency=1,
+                rule_file=None, topics=None, parsed_questions=None):
+        """
+        Add a job to the queue.
+
+        Args:
+            name (str): Display name, e.g. the rule file name.
+            url (str): Survey URL.
+            rules (list): Rule dicts; stored as a snapshot, so later edits
+                          of the rule file do not change a queued job.
+            fill_count (int): Target number of forms.
+            priority (int): Higher priorities are started first.
+            max_concurrency (int): Maximum worker processes of this job.
+            rule_file (str): Optional rule file the job was created from.
+            topics (list): Optional survey topic numbers of the rules.
+            parsed_questions (list): Optional parsed questions, kept in the
+                                     job's session for restoring it.
+
+        Returns:
+            str: Job ID.
+        """
+        with self._lock:
+            base_id = job_id = datetime.now().strftime("job_%Y%m%d_%H%M%S")
+            suffix = 1
+            while self.get_job(job_id) is not None:
+                suffix += 1
+                job_id = f"{base_id}_{suffix}"
+            self.jobs.append({
+                "id": job_id,
+                "name": name,
+                "created_at": datetime.now().isoformat(),
+                "url": url,
+                "rules": rules,
+                "rule_file": rule_file,
+                "topics": topics,
+                "parsed_questions": parsed_questions,
+                "fill_count": fill_count,
+                "priority": priority,
+                "max_concurrency": max(1, max_concurrency),
+                "status": "queued",
+                "session_id": None,
+                "completed": 0,
+                "error": None,
+            })
+            self.save_jobs()
+            return job_id
+
+    def get_jobs(self):
+        """
+        Get all jobs in scheduling order.
+
+        Returns:
+            list: Jobs sorted by descending priority, then insertion order.
+        """
+        with self._lock:
+            order = {job["id"]: i for i, job in enumerate(self.jobs)}
+            return sorted(self.jobs, key=lambda job: (-job["priority"], order[job["id"]]))
+
+    def get_job(self, job_id):
+        """
+        Get a job by ID.
+
+        Args:
+            job_id (str): Job ID.
+
+        Returns:
+            dict or None: Job dictionary or None if not found.
+        """
+        for job in self.jobs:
+            if job["id"] == job_id:
+                return job
+        return None
+
+    def runnable_jobs(self):
+        """Get the jobs the scheduler may start, in scheduling order."""
+        return [job for job in self.get_jobs() if job["status"] in self.RUNNABLE_STATUSES]
+
+    def update_job(self, job_id, **fields):
+        """
+        Update fields of a job.
+
+        Args:
+            job_id (str): Job ID.
+            **fields: Field names and new values.
+        """
+        with self._lock:
+            job = self.get_job(job_id)
+            if job:
+                job.update(fields)
+                self.save_jobs()
+
+    def requeue(self, job_id):
+        """
+        Queue a stopped or failed job again; it resumes its session.
+
+        Args:
+            job_id (str): Job ID.
+        """
+        self.update_job(job_id, status="queued", error=None)
+
+    def remove_job(self, job_id):
+        """
+        Remove a job from the queue.
+
+        Args:
+            job_id (str): Job ID.
+        """
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job["id"] != job_id]
+            self.save_jobs()
+
+    def clear_finished(self):
+        """Remove completed, cancelled and failed jobs."""
+        with self._lock:
+            self.jobs = [job for job in self.jobs if job["status"] not in self.FINISHED_STATUSES]
+            self.save_jobs()
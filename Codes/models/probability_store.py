@@ -0,0 +1,186 @@
+"""
+Array-backed probability store for the rule configuration tree.
+"""
+from array import array
+from functools import lru_cache
+
+
+# Parsed question type_code -> rule key
+TYPE_TO_RULE = {
+    '3': 'radio_selection',
+    '7': 'dropdown_selection',
+    '4': 'multiple_selection',
+    '6': 'matrix_radio_selection',
+    '1': 'blank_filling',
+}
+
+CHOICE_RULES = ('radio_selection', 'multiple_selection', 'dropdown_selection')
+
+
+@lru_cache(maxsize=64)
+def _equal_split(count):
+    base, rem = divmod(100, count)
+    return array('B', [base + (1 if i < rem else 0) for i in range(count)])
+
+
+def equal_split(count):
+    """Split 100 into count integer parts that differ by at most one."""
+    if count <= 0:
+        return array('B')
+    return array('B', _equal_split(count))
+
+
+def _clamp(value):
+    return max(0, min(100, int(value)))
+
+
+class ProbabilityStore:
+    """
+    Probabilities of all configured questions in one flat byte array.
+
+    Every question owns one or more rows (a matrix question one per
+    sub-question, every other question exactly one); a row is a contiguous
+    slice of values delimited by row_offsets. Blank-filling questions also
+    keep their candidate texts, aligned with the probabilities of their row.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Remove all questions."""
+        self.values = array('B')
+        self.row_offsets = array('L', [0])    # Row r is values[row_offsets[r]:row_offsets[r + 1]]
+        self.question_rows = array('L', [0])  # Question q owns rows question_rows[q]:question_rows[q + 1]
+        self.rule_keys = []
+        self.texts = []                       # Candidate texts per question (blank filling), else None
+
+    def question_count(self):
+        return len(self.rule_keys)
+
+    def append_question(self, rule_key, rows, texts=None):
+        """
+        Append a question.
+
+        Args:
+            rule_key (str): Rule key of the question.
+            rows (list): One list of probabilities per row.
+            texts (list): Candidate texts of a blank-filling question.
+        """
+        for row in rows:
+            self.values.extend(_clamp(v) for v in row)
+            self.row_offsets.append(len(self.values))
+        self.question_rows.append(len(self.row_offsets) - 1)
+        self.rule_keys.append(rule_key)
+        self.texts.append(list(texts) if texts is not None else None)
+
+    # --- Element access ---
+
+    def _offset(self, question, row):
+        return self.row_offsets[self.question_rows[question] + row]
+
+    def row_count(self, question):
+        return self.question_rows[question + 1] - self.question_rows[question]
+
+    def row_length(self, question, row=0):
+        r = self.question_rows[question] + row
+        return self.row_offsets[r + 1] - self.row_offsets[r]
+
+    def row_values(self, question, row=0):
+        r = self.question_rows[question] + row
+        return self.values[self.row_offsets[r]:self.row_offsets[r + 1]]
+
+    def get(self, question, row, position):
+        return self.values[self._offset(question, row) + position]
+
+    def set(self, question, row, position, value):
+        self.values[self._offset(question, row) + position] = _clamp(value)
+
+    def insert(self, question, row, position, value, text=None):
+        """
+        Insert a probability (and for blank filling its text) into a row.
+
+        Offsets of all following rows shift by one.
+        """
+        r = self.question_rows[question] + row
+        self.values.insert(self.row_offsets[r] + position, _clamp(value))
+        for i in range(r + 1, len(self.row_offsets)):
+            self.row_offsets[i] += 1
+        if self.texts[question] is not None:
+            self.texts[question].insert(position, text if text is not None else '')
+
+    def set_row(self, question, row, values):
+        """Overwrite a row with values of the same length."""
+        start = self._offset(question, row)
+        self.values[start:start + len(values)] = array('B', (_clamp(v) for v in values))
+
+    def replace_question(self, question, rule_key, rows, texts=None):
+        """
+        Replace a question's rows, splicing the flat arrays in place.
+
+        Args:
+            question (int): Index of the question to replace.
+            rule_key (str): New rule key.
+            rows (list): One list of probabilities per row.
+            texts (list): Candidate texts of a blank-filling question.
+        """
+        first_row, end_row = self.question_rows[question], self.question_rows[question + 1]
+        start, end = self.row_offsets[first_row], self.row_offsets[end_row]
+
+        new_values = array('B')
+        new_offsets = array('L')
+        for row in rows:
+            new_values.extend(_clamp(v) for v in row)
+            new_offsets.append(start + len(new_values))
+        value_delta = len(new_values) - (end - start)
+        row_delta = len(rows) - (end_row - first_row)
+
+        self.values[start:end] = new_values
+        tail = array('L', (offset + value_delta for offset in self.row_offsets[end_row + 1:]))
+        self.row_offsets[first_row + 1:] = new_offsets + tail
+        if row_delta:
+            for i in range(question + 1, len(self.question_rows)):
+                self.question_rows[i] += row_delta
+        self.rule_keys[question] = rule_key
+        self.texts[question] = list(texts) if texts is not None else None
+
+    # --- Bulk operations ---
+
+    def equalize(self):
+        """
+        Set all probabilities to an equal distribution.
+
+        Multiple-choice rows become 50 each (options are independent),
+        every other row is an equal split of 100. The values are rebuilt in
+        one pass from cached per-length splits.
+        """
+        values = array('B')
+        for question, rule_key in enumerate(self.rule_keys):
+            for r in range(self.question_rows[question], self.question_rows[question + 1]):
+                count = self.row_offsets[r + 1] - self.row_offsets[r]
+                if rule_key == 'multiple_selection':
+                    values.extend(array('B', [50]) * count)
+                elif count:
+                    values.extend(_equal_split(count))
+        self.values = values
+
+    def to_rules(self):
+        """
+        Serialize the store into rule dicts.
+
+        Returns:
+            list: One rule dict per question, as consumed by FormFiller.
+        """
+        rules = []
+        values, row_offsets = self.values, self.row_offsets
+        for question, rule_key in enumerate(self.rule_keys):
+            first, end = self.question_rows[question], self.question_rows[question + 1]
+            if rule_key == 'matrix_radio_selection':
+                rules.append({rule_key: [values[row_offsets[r]:row_offsets[r + 1]].tolist()
+                                         for r in range(first, end)]})
+            elif rule_key == 'blank_filling':
+                probs = values[row_offsets[first]:row_offsets[first + 1]].tolist()
+                rules.append({rule_key: [list(self.texts[question]), probs]})
+            else:
+                rules.append({rule_key: values[row_offsets[first]:row_offsets[first + 1]].tolist()})
+        return rules
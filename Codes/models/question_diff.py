@@ -0,0 +1,128 @@
+"""
+Question fingerprints and survey-change detection.
+
+Rules are stored positionally, one per configured question. When a survey
+owner inserts, removes or edits a question, the saved rules are remapped to
+the freshly analyzed questions by identity instead of by position, so only
+new or changed questions fall back to default probabilities.
+"""
+import difflib
+import hashlib
+
+from models.probability_store import TYPE_TO_RULE
+
+
+def _hash(value):
+    return hashlib.sha1(value.encode("utf-8")).hexdigest()[:12]
+
+
+def _normalize(text):
+    return " ".join((text or "").split())
+
+
+def question_fingerprint(question):
+    """
+    Compute the fingerprint of a parsed question.
+
+    Args:
+        question (dict): Parsed question dict.
+
+    Returns:
+        tuple: (topic, type_code, text_hash, structure_hash). The structure
+               hash covers option texts and matrix rows, i.e. everything a
+               saved rule's shape depends on.
+    """
+    if question.get('type_code') == '6':
+        structure = "\x1e".join(
+            _normalize(sub.get('sub_question', '')) + "\x1f" + "\x1f".join(map(str, sub.get('options', [])))
+            for sub in question.get('sub_questions', [])
+        )
+    else:
+        structure = "\x1f".join(_normalize(o) for o in question.get('options', []))
+    return (
+        str(question.get('topic', '')),
+        question.get('type_code', ''),
+        _hash(_normalize(question.get('text', ''))),
+        _hash(structure),
+    )
+
+
+def configured_questions(parsed_questions):
+    """Questions that get a rule (those with a known type), in rule order."""
+    return [q for q in parsed_questions or [] if q.get('type_code') in TYPE_TO_RULE]
+
+
+def diff_questions(old_questions, new_questions):
+    """
+    Match freshly analyzed questions to previously configured ones.
+
+    Questions are identified by type and text hash; topics are ignored for
+    matching because inserting one question renumbers all following ones.
+    Matched questions whose structure hash differs count as changed.
+
+    Args:
+        old_questions (list): Previously configured question dicts.
+        new_questions (list): Freshly analyzed configured question dicts.
+
+    Returns:
+        tuple: (matches, summary) where matches[i] is the index into
+               old_questions of an unchanged question matching
+               new_questions[i], or None for new and changed questions, and
+               summary counts unchanged, changed, added, removed and
+               renumbered (unchanged but with a different topic) questions.
+    """
+    old_prints = [question_fingerprint(q) for q in old_questions]
+    new_prints = [question_fingerprint(q) for q in new_questions]
+    matcher = difflib.SequenceMatcher(
+        None, [p[1:3] for p in old_prints], [p[1:3] for p in new_prints], autojunk=False)
+
+    matches = [None] * len(new_questions)
+    summary = {'unchanged': 0, 'changed': 0, 'added': 0, 'removed': 0, 'renumbered': 0}
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == 'equal':
+            for old_index, new_index in zip(range(i1, i2), range(j1, j2)):
+                if old_prints[old_index][3] != new_prints[new_index][3]:
+                    summary['changed'] += 1
+                    continue
+                matches[new_index] = old_index
+                summary['unchanged'] += 1
+                if old_prints[old_index][0] != new_prints[new_index][0]:
+                    summary['renumbered'] += 1
+        else:
+            # Same-position questions of the same type in a replaced block
+            # are edits of one question, the rest were inserted or deleted
+            paired = sum(1 for o, n in zip(range(i1, i2), range(j1, j2))
+                         if old_prints[o][1] == new_prints[n][1])
+            summary['changed'] += paired
+            summary['added'] += (j2 - j1) - paired
+            summary['removed'] += (i2 - i1) - paired
+    return matches, summary
+
+
+def remap_rules(old_questions, old_rules, new_questions):
+    """
+    Carry saved rules over to a freshly analyzed survey.
+
+    Args:
+        old_questions (list): Parsed questions the rules were configured for.
+        old_rules (list): Rule dicts, one per configured old question.
+        new_questions (list): Freshly analyzed parsed questions.
+
+    Returns:
+        tuple: (rules, summary) where rules has one entry per configured new
+               question: the carried-over rule dict, or None where defaults
+               should be computed. summary is as returned by diff_questions.
+    """
+    old_configured = configured_questions(old_questions)
+    matches, summary = diff_questions(old_configured, configured_questions(new_questions))
+    rules = [old_rules[m] if m is not None and m < len(old_rules) else None for m in matches]
+    return rules, summary
+
+
+def format_diff_summary(summary):
+    """Format a diff summary as a one-line log message."""
+    message = (f"问卷变化: 保留 {summary['unchanged']} 题配置，"
+               f"变更 {summary['changed']} 题，新增 {summary['added']} 题，删除 {summary['removed']} 题")
+    if summary['renumbered']:
+        message += f" (其中 {summary['renumbered']} 题题号已变化)"
+    return message
@@ -0,0 +1,114 @@
+"""
+Cache of parsed and validated rule files.
+"""
+import json
+import os
+import threading
+
+
+RULE_CACHE_FILE = ".rule_cache.json"
+
+
+class RuleCache:
+    """
+    Parsed rule content and validation results, keyed by path, mtime and size.
+
+    Entries are stored as JSON, which loads far faster than re-parsing and
+    re-validating large YAML rule files. An entry is only used while the
+    file's modification time and size are unchanged.
+    """
+
+    def __init__(self, cache_file):
+        """
+        Initialize the rule cache.
+
+        Args:
+            cache_file (str): JSON file holding the cache entries.
+        """
+        self.cache_file = cache_file
+        self._lock = threading.Lock()
+        self._dirty = False
+        self.entries = self._load()
+
+    @staticmethod
+    def _stat_key(file_path):
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return [stat.st_mtime_ns, stat.st_size]
+
+    def get(self, file_path):
+        """
+        Get the cached result for a rule file.
+
+        Args:
+            file_path (str): Path to the rule file.
+
+        Returns:
+            dict or None: Entry with "valid", "error" and "data" keys, or None
+                          if the file is not cached or changed since.
+        """
+        key = os.path.abspath(file_path)
+        stat_key = self._stat_key(file_path)
+        with self._lock:
+            entry = self.entries.get(key)
+        if entry is None or stat_key is None or entry["stat"] != stat_key:
+            return None
+        return entry
+
+    def put(self, file_path, is_valid, error, data):
+        """
+        Store the result of parsing and validating a rule file.
+
+        Args:
+            file_path (str): Path to the rule file.
+            is_valid (bool): Whether the file passed validation.
+            error (str): Validation error message, empty if valid.
+            data: Parsed content, or None if the file could not be parsed.
+        """
+        stat_key = self._stat_key(file_path)
+        if stat_key is None:
+            return
+        with self._lock:
+            self.entries[os.path.abspath(file_path)] = {
+                "stat": stat_key,
+                "valid": is_valid,
+                "error": error,
+                "data": data,
+            }
+            self._dirty = True
+
+    def discard_missing(self):
+        """Drop entries of files that no longer exist."""
+        with self._lock:
+            missing = [path for path in self.entries if not os.path.exists(path)]
+            for path in missing:
+                del self.entries[path]
+            if missing:
+                self._dirty = True
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return {}
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (json.JSONDecodeError, IOError):
+            return {}
+
+    def flush(self):
+        """Write the cache to disk if it changed."""
+        with self._lock:
+            if not self._dirty:
+                return
+            # default=str: YAML may yield dates etc. in keys rules do not use
+            data = json.dumps(self.entries, ensure_ascii=False, default=str)
+            self._dirty = False
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                file.write(data)
+            os.replace(tmp_file, self.cache_file)
+        except IOError as e:
+            print(f"Error saving rule cache: {e}")
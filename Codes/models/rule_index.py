@@ -0,0 +1,138 @@
+"""
+In-memory index of the rule files in the rules directory.
+"""
+import os
+import threading
+import time
+
+
+class RuleIndex:
+    """
+    Rule files with their metadata, kept up to date by a file-system watcher.
+
+    The directory is scanned once with os.scandir; afterwards it is only
+    rescanned when QFileSystemWatcher reports a change, or, where no watcher
+    is available, at most every POLL_INTERVAL seconds. A rescan only reads
+    files whose modification time or size changed.
+    """
+
+    # Seconds between rescans when no file-system watcher is available
+    POLL_INTERVAL = 2.0
+
+    def __init__(self, rules_dir, read_rule):
+        """
+        Initialize the rule index.
+
+        Args:
+            rules_dir (str): Directory containing YAML rule files.
+            read_rule (callable): Called with a file name, returns
+                                  (data, is_valid, error_message).
+        """
+        self.rules_dir = rules_dir
+        self.read_rule = read_rule
+        self.entries = {}
+        self._lock = threading.RLock()
+        self._stale = True
+        self._watcher = None
+        self._last_scan = 0.0
+
+    def watch(self):
+        """
+        Start watching the directory for changes.
+
+        Returns:
+            bool: True if a file-system watcher is active, False if the
+                  index falls back to polling.
+        """
+        try:
+            from PySide6.QtCore import QFileSystemWatcher
+        except ImportError:
+            return False
+        if not os.path.isdir(self.rules_dir):
+            return False
+        watcher = QFileSystemWatcher()
+        if not watcher.addPath(self.rules_dir):
+            return False
+        watcher.directoryChanged.connect(self._mark_stale)
+        watcher.fileChanged.connect(self._mark_stale)
+        self._watcher = watcher
+        self._sync_watched_files()
+        return True
+
+    def _mark_stale(self, path=None):
+        self._stale = True
+
+    def _sync_watched_files(self):
+        if self._watcher is None:
+            return
+        watched = set(self._watcher.files())
+        current = {entry["path"] for entry in self.entries.values()}
+        added = list(current - watched)
+        removed = list(watched - current)
+        if added:
+            self._watcher.addPaths(added)
+        if removed:
+            self._watcher.removePaths(removed)
+
+    def _needs_refresh(self):
+        if self._stale:
+            return True
+        if self._watcher is None:
+            return time.monotonic() - self._last_scan >= self.POLL_INTERVAL
+        return False
+
+    def refresh(self):
+        """Rescan the directory, re-reading only new or changed files."""
+        with self._lock:
+            self._stale = False
+            self._last_scan = time.monotonic()
+            if not os.path.isdir(self.rules_dir):
+                self.entries = {}
+                return
+
+            entries = {}
+            with os.scandir(self.rules_dir) as it:
+                for dir_entry in it:
+                    name = dir_entry.name
+                    if not (name.endswith('.yaml') or name.endswith('.yml')) or not dir_entry.is_file():
+                        continue
+                    stat = dir_entry.stat()
+                    old = self.entries.get(name)
+                    if old is not None and old["mtime"] == stat.st_mtime_ns and old["size"] == stat.st_size:
+                        entries[name] = old
+                    else:
+                        entries[name] = self._read_entry(name, dir_entry.path, stat)
+            self.entries = entries
+            self._sync_watched_files()
+
+    def _read_entry(self, name, path, stat):
+        data, is_valid, error = self.read_rule(name)
+        data = data if isinstance(data, dict) else {}
+        rules = data.get("rules")
+        return {
+            "path": path,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "url": str(data.get("url", "")).strip(),
+            "fill_count": data.get("number_of_questionnaires_to_be_filled_out"),
+            "question_count": len(rules) if isinstance(rules, list) else 0,
+            "valid": is_valid,
+            "error": error,
+        }
+
+    def get_entries(self):
+        """
+        Get the indexed rule files.
+
+        Returns:
+            dict: File name -> metadata dict (path, mtime, size, url,
+                  fill_count, question_count, valid, error).
+        """
+        with self._lock:
+            if self._needs_refresh():
+                self.refresh()
+            return dict(self.entries)
+
+    def invalidate(self):
+        """Force a rescan on the next access (e.g. after writing a rule file)."""
+        self._stale = True
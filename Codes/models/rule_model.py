@@ -2,8 +2,8 @@
 Rule model for YAML rule file loading and management.
 """
 import os
-import yaml
-from tools.read_list_data_from_file import list_yaml_files, read_yaml_file
+from models.rule_cache import RuleCache, RULE_CACHE_FILE
+from models.rule_index import RuleIndex
 
 
 class RuleModel:
@@ -19,31 +19,39 @@ class RuleModel:
         self.rules_dir = rules_dir
         self.current_rule = None
         self.current_rule_file = None
+        # Kept next to the rules directory so it is never listed as a rule
+        self.rule_cache = RuleCache(os.path.join(os.path.dirname(os.path.abspath(rules_dir)), RULE_CACHE_FILE))
+        self.rule_index = RuleIndex(rules_dir, lambda name: self.read_rule(name, flush=False))
 
-    def get_rules_dir(self):
-        """Get the rules directory path."""
-        return self.rules_dir
-
-    def list_yaml_files(self):
+    def watch_rules_dir(self):
         """
-        List all YAML files in the rules directory.
+        Keep the rule index up to date with a file-system watcher.
+
+        Must be called from the GUI thread once the application exists.
 
         Returns:
-            list: List of YAML file names.
+            bool: True if watching, False if the index falls back to polling.
         """
         if not os.path.exists(self.rules_dir):
             os.makedirs(self.rules_dir)
-        return list_yaml_files(self.rules_dir)
+        return self.rule_index.watch()
 
-    def get_yaml_files_dict(self):
+    def get_rules_dir(self):
+        """Get the rules directory path."""
+        return self.rules_dir
+
+    def get_rule_index(self):
         """
-        Get a dictionary of YAML files.
+        Get the indexed rule files with their metadata.
 
         Returns:
-            dict: Dictionary with file names as keys and full paths as values.
+            dict: File name -> dict with path, mtime, size, url, fill_count,
+                  question_count, valid and error.
         """
-        yaml_files = self.list_yaml_files()
-        return {name: os.path.join(self.rules_dir, name) for name in yaml_files}
+        entries = self.rule_index.get_entries()
+        # Files read during the rescan were cached without flushing each one
+        self.rule_cache.flush()
+        return entries
 
     def load_rule(self, file_name):
         """
@@ -55,14 +63,49 @@ class RuleModel:
         Returns:
             dict or None: Parsed YAML content or None if error.
         """
+        data, is_valid, error = self.read_rule(file_name)
+        if data is None:
+            print(f"Error loading rule file: {error}")
+            return None
+        self.current_rule = data
+        self.current_rule_file = file_name
+        return self.current_rule
+
+    def read_rule(self, file_name, flush=True):
+        """
+        Read and validate a rule file, using the rule cache when unchanged.
+
+        Args:
+            file_name (str): Name of the YAML file.
+            flush (bool): Write the rule cache to disk after a cache miss.
+
+        Returns:
+            tuple: (data, is_valid, error_message); data is None if the file
+                   could not be read or parsed.
+        """
         file_path = os.path.join(self.rules_dir, file_name)
+        entry = self.rule_cache.get(file_path)
+        if entry is not None:
+            return entry["data"], entry["valid"], entry["error"]
+
+        # PyYAML is only needed on a cache miss, keep it off the startup path
+        import yaml
+        from tools.read_list_data_from_file import read_yaml_file
+        from utils.yaml_validator import YamlValidator
+
         try:
-            self.current_rule = read_yaml_file(file_path)
-            self.current_rule_file = file_name
-            return self.current_rule
+            data = read_yaml_file(file_path)
+        except yaml.YAMLError as e:
+            data, is_valid, error = None, False, f"YAML语法错误: {e}"
         except Exception as e:
-            print(f"Error loading rule file: {e}")
-            return None
+            return None, False, str(e)
+        else:
+            is_valid, error = YamlValidator.validate_rule_structure(data)
+
+        self.rule_cache.put(file_path, is_valid, error, data)
+        if flush:
+            self.rule_cache.flush()
+        return data, is_valid, error
 
     def get_current_rule(self):
         """Get the currently loaded rule."""
@@ -104,10 +147,17 @@ class RuleModel:
         if not file_name.endswith('.yaml') and not file_name.endswith('.yml'):
             file_name += '.yaml'
 
+        from tools.read_list_data_from_file import dump_yaml
+        from utils.yaml_validator import YamlValidator
+
         file_path = os.path.join(self.rules_dir, file_name)
         try:
             with open(file_path, 'w', encoding='utf-8') as f:
-                yaml.dump(rule_content, f, allow_unicode=True, default_flow_style=False)
+                dump_yaml(rule_content, f)
+            is_valid, error = YamlValidator.validate_rule_structure(rule_content)
+            self.rule_cache.put(file_path, is_valid, error, rule_content)
+            self.rule_cache.flush()
+            self.rule_index.invalidate()
             self.current_rule = rule_content
             self.current_rule_file = file_name
             return True
@@ -50,7 +50,11 @@ class SurveyModel:
         default_config = {
             "last_rule_file": "",
             "last_fill_count": 1,
-            "window_geometry": ""
+            "window_geometry": "",
+            "analysis_resource_preset": "analysis-minimal",
+            "fill_resource_preset": "fill-minimal",
+            "asset_cache_max_mb": 100,
+            "har_mode": "off",
         }
         if os.path.exists(self.config_file):
             try:
@@ -0,0 +1,193 @@
+"""
+External text pools for blank_filling rules.
+
+Instead of inlining [texts, probabilities], a blank_filling rule can
+reference a UTF-8 corpus file with one candidate text per line:
+
+    - blank_filling:
+        text_pool: pools/answers.txt
+        weighted: false
+
+With weighted: true every line is "<weight>\\t<text>". Relative paths are
+resolved against the rules directory. The file is memory-mapped and only
+an offset index is kept in Python objects; a line is decoded when drawn.
+"""
+import hashlib
+import mmap
+import os
+import threading
+from array import array
+from bisect import bisect_right
+
+
+class TextPool:
+    """Memory-mapped corpus sampled through a precomputed line-offset index."""
+
+    def __init__(self, path, weighted=False):
+        """
+        Map a corpus file and index its lines.
+
+        Args:
+            path (str): Path to the UTF-8 corpus file.
+            weighted (bool): Whether lines are "<weight>\\t<text>".
+
+        Raises:
+            OSError: If the file cannot be opened.
+            ValueError: If the pool is empty or a weight is invalid.
+        """
+        self.path = path
+        self.weighted = weighted
+        self._file = open(path, 'rb')
+        try:
+            if os.fstat(self._file.fileno()).st_size == 0:
+                raise ValueError(f"文本池为空: {path}")
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            raise
+        # Byte range of each text, and cumulative weights when weighted
+        self._starts = array('Q')
+        self._ends = array('Q')
+        self._cumulative = array('Q')
+        self._sha256 = None
+        try:
+            self._build_index()
+        except Exception:
+            self.close()
+            raise
+
+    def _build_index(self):
+        data = self._map
+        size = len(data)
+        start = 3 if data[:3] == b'\xef\xbb\xbf' else 0  # Skip a UTF-8 BOM
+        total = 0
+        line_number = 0
+        while start < size:
+            end = data.find(b'\n', start)
+            if end == -1:
+                end = size
+            line_number += 1
+            text_start, text_end = start, end
+            if text_end > text_start and data[text_end - 1] == 0x0D:
+                text_end -= 1
+            if text_end > text_start:
+                if self.weighted:
+                    tab = data.find(b'\t', text_start, text_end)
+                    try:
+                        weight = int(data[text_start:tab]) if tab != -1 else -1
+                    except ValueError:
+                        weight = -1
+                    if weight < 0:
+                        raise ValueError(f"文本池第{line_number}行: 应为 \"权重<Tab>文本\" 且权重为非负整数")
+                    text_start = tab + 1
+                    total += weight
+                    self._cumulative.append(total)
+                self._starts.append(text_start)
+                self._ends.append(text_end)
+            start = end + 1
+
+        if not self._starts:
+            raise ValueError(f"文本池为空: {self.path}")
+        if self.weighted and total == 0:
+            raise ValueError(f"文本池权重之和为0: {self.path}")
+
+    def __len__(self):
+        return len(self._starts)
+
+    def text(self, index):
+        """Decode the text at index."""
+        return self._map[self._starts[index]:self._ends[index]].decode('utf-8', errors='replace')
+
+    def sample(self, rng):
+        """
+        Draw one text.
+
+        Args:
+            rng: random.Random instance (or the random module).
+
+        Returns:
+            str: The drawn text.
+        """
+        if self.weighted:
+            return self.text(bisect_right(self._cumulative, rng.randrange(self._cumulative[-1])))
+        return self.text(rng.randrange(len(self._starts)))
+
+    def sha256(self):
+        """SHA-256 of the file contents, hashed straight from the mapping."""
+        if self._sha256 is None:
+            self._sha256 = hashlib.sha256(self._map).hexdigest()
+        return self._sha256
+
+    def close(self):
+        """Unmap and close the file."""
+        if getattr(self, '_map', None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def open_text_pool(path, weighted=False):
+    """
+    Get the pool for path, reusing the mapping while the file is unchanged.
+
+    Args:
+        path (str): Path to the corpus file.
+        weighted (bool): Whether lines carry weights.
+
+    Returns:
+        TextPool: The indexed pool.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), bool(weighted))
+    with _pools_lock:
+        cached = _pools.get(key)
+        if cached is not None and cached[0] == (stat.st_mtime_ns, stat.st_size):
+            return cached[1]
+        # A replaced mapping is left to the garbage collector; a fill thread may still be drawing from it
+        pool = TextPool(path, weighted)
+        _pools[key] = ((stat.st_mtime_ns, stat.st_size), pool)
+        return pool
+
+
+def is_text_pool(value):
+    """Whether a blank_filling rule value references a text pool."""
+    return isinstance(value, dict) and 'text_pool' in value
+
+
+def resolve_text_pools(rules, base_dir):
+    """
+    Resolve text pool references for a run.
+
+    Paths become absolute (sharded workers run in other processes) and each
+    reference gets the pool's content hash, so a session records which
+    corpus it drew from without storing the texts.
+
+    Args:
+        rules (list): Rule dicts.
+        base_dir (str): Directory relative pool paths are resolved against.
+
+    Returns:
+        tuple: (resolved rules, warnings); warnings list pools whose
+               contents differ from a previously recorded hash.
+
+    Raises:
+        OSError: If a pool file cannot be opened.
+        ValueError: If a pool is empty or malformed.
+    """
+    resolved, warnings = [], []
+    for rule in rules:
+        key, value = list(rule.items())[0]
+        if key != 'blank_filling' or not is_text_pool(value):
+            resolved.append(rule)
+            continue
+        path = os.path.join(base_dir, os.path.expanduser(str(value['text_pool'])))
+        weighted = bool(value.get('weighted', False))
+        digest = open_text_pool(path, weighted).sha256()
+        if value.get('sha256') and value['sha256'] != digest:
+            warnings.append(f"文本池内容已变化: {path}")
+        resolved.append({key: {'text_pool': os.path.abspath(path), 'weighted': weighted, 'sha256': digest}})
+    return resolved, warnings
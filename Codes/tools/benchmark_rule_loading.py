@@ -0,0 +1,63 @@
+"""
+Benchmark loading, validating and saving a large rule file.
+
+Compares the pure-Python PyYAML loader/dumper with the libyaml-backed ones
+selected by read_list_data_from_file, and a RuleCache hit.
+
+Usage:
+    python tools/benchmark_rule_loading.py [--rules N] [--texts N]
+"""
+import os
+import sys
+import tempfile
+import time
+
+
+def _timed(label, func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<36} {best * 1000:8.1f} ms")
+    return result
+
+
+def main():
+    import argparse
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    import yaml
+    from tools.benchmark_yaml_highlighter import generate_rule_yaml
+    from tools.read_list_data_from_file import YAML_LOADER, YAML_DUMPER
+    from models.rule_cache import RuleCache
+
+    parser = argparse.ArgumentParser(description="Rule file loading benchmark")
+    parser.add_argument("--rules", type=int, default=2000)
+    parser.add_argument("--texts", type=int, default=50)
+    args = parser.parse_args()
+
+    content = generate_rule_yaml(args.rules, args.texts)
+    print(f"Rule file: {len(content.splitlines())} lines, {len(content) / 1024:.0f} KB, "
+          f"libyaml: {YAML_LOADER is not yaml.SafeLoader}")
+
+    data = _timed("load (pure-Python SafeLoader)", lambda: yaml.load(content, Loader=yaml.SafeLoader))
+    _timed("load (selected loader)", lambda: yaml.load(content, Loader=YAML_LOADER))
+    dump_options = dict(allow_unicode=True, default_flow_style=False)
+    _timed("dump (pure-Python SafeDumper)", lambda: yaml.dump(data, Dumper=yaml.SafeDumper, **dump_options))
+    _timed("dump (selected dumper)", lambda: yaml.dump(data, Dumper=YAML_DUMPER, **dump_options))
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        rule_file = os.path.join(tmp_dir, "rule.yaml")
+        with open(rule_file, "w", encoding="utf-8") as file:
+            file.write(content)
+        cache = RuleCache(os.path.join(tmp_dir, "cache.json"))
+        cache.put(rule_file, True, "", data)
+        cache.flush()
+        _timed("cache hit (fresh process)", lambda: RuleCache(cache.cache_file).get(rule_file)["data"])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Benchmark building the global stylesheet with and without its disk cache.
+
+Each measurement runs in a fresh process, as at application start: "cold"
+renders the arrow icons and formats the QSS, "warm" reads the cached file.
+
+Usage:
+    python tools/benchmark_stylesheet.py [--runs N]
+"""
+import os
+import subprocess
+import sys
+import tempfile
+
+CODES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_MEASURE = """
+import sys, time
+sys.path.insert(0, {codes_dir!r})
+from PySide6.QtGui import QGuiApplication
+app = QGuiApplication(sys.argv)
+from views.styles import get_global_stylesheet
+started = time.perf_counter()
+get_global_stylesheet({cache_dir!r})
+print((time.perf_counter() - started) * 1000)
+"""
+
+
+def _measure(cache_dir):
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    code = _MEASURE.format(codes_dir=CODES_DIR, cache_dir=cache_dir)
+    output = subprocess.run([sys.executable, "-c", code], env=env, check=True,
+                            capture_output=True, text=True).stdout
+    return float(output.strip().splitlines()[-1])
+
+
+def main():
+    import argparse
+    import shutil
+
+    parser = argparse.ArgumentParser(description="Stylesheet cache benchmark")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cold.append(_measure(cache_dir))
+            warm.append(_measure(cache_dir))
+        finally:
+            shutil.rmtree(cache_dir, ignore_errors=True)
+
+    print(f"get_global_stylesheet, cold (render + write): {min(cold):6.1f} ms")
+    print(f"get_global_stylesheet, warm (cached file):    {min(warm):6.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
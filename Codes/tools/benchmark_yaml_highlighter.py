@@ -0,0 +1,96 @@
+"""
+Benchmark YamlSyntaxHighlighter on a large generated rule file.
+
+Measures the initial highlight of the whole document and the cost of
+single-line edits, which should only rehighlight the edited block as long
+as its block state does not change.
+
+Usage:
+    python tools/benchmark_yaml_highlighter.py [--rules N] [--texts N]
+"""
+import os
+import sys
+import time
+
+
+def generate_rule_yaml(rule_count=2000, texts_per_blank=20):
+    """
+    Generate a rule file mixing all rule types, with long blank_filling pools.
+
+    Args:
+        rule_count (int): Number of rules.
+        texts_per_blank (int): Candidate texts per blank_filling rule.
+
+    Returns:
+        str: YAML document.
+    """
+    lines = [
+        "# Generated benchmark rule file",
+        "url: https://www.wjx.cn/vm/benchmark.aspx#survey",
+        "number_of_questionnaires_to_be_filled_out: 100",
+        "rules:",
+    ]
+    for i in range(rule_count):
+        kind = i % 5
+        if kind == 0:
+            lines.append(f"  - radio_selection: [25, 25, 25, 25]  # 第{i + 1}题")
+        elif kind == 1:
+            lines.append("  - multiple_selection: [50, 50, 50, 50, 50]")
+        elif kind == 2:
+            lines.append("  - matrix_radio_selection:")
+            lines.extend("      - [20, 20, 20, 20, 20]" for _ in range(5))
+        elif kind == 3:
+            lines.append("  - dropdown_selection: [34, 33, 33]")
+        else:
+            lines.append("  - blank_filling:")
+            lines.append("      - - |")
+            lines.append(f"            多行文本 {i} 第一行")
+            lines.append("            第二行 # 不是注释")
+            lines.extend(f"        - '候选文本 {i}-{t}: 包含冒号和 # 号'" for t in range(texts_per_blank))
+            lines.append(f"      - [{', '.join(['5'] * (texts_per_blank + 1))}]")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    import argparse
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    from PySide6.QtGui import QGuiApplication, QTextDocument, QTextCursor
+    from views.rule_editor_view import YamlSyntaxHighlighter
+
+    parser = argparse.ArgumentParser(description="YamlSyntaxHighlighter benchmark")
+    parser.add_argument("--rules", type=int, default=2000)
+    parser.add_argument("--texts", type=int, default=20)
+    parser.add_argument("--edits", type=int, default=200)
+    args = parser.parse_args()
+
+    app = QGuiApplication.instance() or QGuiApplication(sys.argv)
+    content = generate_rule_yaml(args.rules, args.texts)
+
+    document = QTextDocument()
+    document.setPlainText(content)
+    print(f"Document: {document.blockCount()} lines, {len(content) / 1024:.0f} KB")
+
+    started = time.perf_counter()
+    highlighter = YamlSyntaxHighlighter(document)
+    highlighter.rehighlight()
+    elapsed = time.perf_counter() - started
+    print(f"Full highlight: {elapsed * 1000:.0f} ms "
+          f"({elapsed / document.blockCount() * 1e6:.1f} us/line)")
+
+    # Typing in the middle of the document
+    block = document.findBlockByNumber(document.blockCount() // 2)
+    cursor = QTextCursor(block)
+    cursor.movePosition(QTextCursor.MoveOperation.EndOfBlock)
+    started = time.perf_counter()
+    for _ in range(args.edits):
+        cursor.insertText("x")
+    elapsed = time.perf_counter() - started
+    print(f"Single-character edits: {elapsed / args.edits * 1000:.2f} ms/edit")
+
+    del app
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Startup regression check.
+
+1. Runs "python -X importtime -c 'import app'" and fails if a module that
+   should be deferred (Playwright, BeautifulSoup, pyautogui, PyYAML) is
+   imported at startup, or if importing app exceeds its budget.
+2. Launches the application with AUTOFILLFORM_EXIT_AFTER_SHOW set, which
+   quits right after the main window is shown, and fails if that takes
+   longer than the time-to-first-window budget.
+
+Exits with status 1 on a regression, so it can run in CI.
+
+Usage:
+    python tools/check_startup.py [--import-budget-ms N] [--window-budget-ms N] [--runs N]
+"""
+import os
+import subprocess
+import sys
+import time
+
+# Top-level packages that must not be imported before the window is shown
+DEFERRED_MODULES = ('playwright', 'bs4', 'pyautogui', 'yaml')
+
+CODES_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def parse_importtime(stderr):
+    """
+    Parse -X importtime output.
+
+    Args:
+        stderr (str): Output of a python -X importtime run.
+
+    Returns:
+        dict: Module name -> cumulative import time in microseconds.
+    """
+    modules = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # Header line
+        modules[parts[2].strip()] = int(parts[1])
+    return modules
+
+
+def _environment():
+    env = dict(os.environ)
+    env.setdefault("QT_QPA_PLATFORM", "offscreen")
+    return env
+
+
+def check_imports(budget_ms):
+    """Check what importing app loads and how long it takes. Returns a list of problems."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app"],
+        cwd=CODES_DIR, env=_environment(), capture_output=True, text=True,
+    )
+    if result.returncode != 0:
+        return [f"import app failed:\n{result.stderr[-2000:]}"]
+
+    modules = parse_importtime(result.stderr)
+    problems = []
+    loaded = sorted({name.split(".")[0] for name in modules} & set(DEFERRED_MODULES))
+    if loaded:
+        problems.append(f"deferred modules imported at startup: {', '.join(loaded)}")
+
+    total_ms = modules.get("app", 0) / 1000
+    print(f"import app: {total_ms:.0f} ms (budget {budget_ms} ms)")
+    slowest = sorted(modules.items(), key=lambda item: item[1], reverse=True)
+    for name, cumulative in slowest[:10]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+    if total_ms > budget_ms:
+        problems.append(f"import app took {total_ms:.0f} ms, budget {budget_ms} ms")
+    return problems
+
+
+def check_first_window(budget_ms, runs):
+    """Time process start to first window shown. Returns a list of problems."""
+    env = _environment()
+    env["AUTOFILLFORM_EXIT_AFTER_SHOW"] = "1"
+    env["AUTOFILLFORM_STARTUP_TRACE"] = "1"
+    timings = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = subprocess.run([sys.executable, "app.py"], cwd=CODES_DIR, env=env,
+                                capture_output=True, text=True, timeout=60)
+        timings.append((time.perf_counter() - started) * 1000)
+        if result.returncode != 0:
+            return [f"app.py failed:\n{result.stderr[-2000:]}"]
+
+    best = min(timings)
+    print(f"time to first window: best {best:.0f} ms of {runs} (budget {budget_ms} ms)")
+    # Per-component trace of the last run (see utils/startup_trace.py)
+    for line in result.stderr.splitlines():
+        if line.startswith("启动耗时"):
+            print(f"  {line}")
+    if best > budget_ms:
+        return [f"time to first window {best:.0f} ms, budget {budget_ms} ms"]
+    return []
+
+
+def main():
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Startup regression check")
+    parser.add_argument("--import-budget-ms", type=int, default=800)
+    parser.add_argument("--window-budget-ms", type=int, default=2500)
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    problems = check_imports(args.import_budget_ms)
+    problems += check_first_window(args.window_budget_ms, args.runs)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
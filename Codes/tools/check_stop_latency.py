@@ -0,0 +1,105 @@
+"""
+Stop latency check against the local stand-in survey server.
+
+Starts a fill run, sets its stop event while the run is in a given phase
+and measures how long FillRunner.run takes to return afterwards:
+
+    navigate  - the survey page is slow to respond
+    fill      - sleeping between questions
+    submit    - waiting for the page to leave the survey after submitting
+
+Exits with status 1 if any phase exceeds the budget.
+
+Usage:
+    python tools/check_stop_latency.py [--budget-ms N] [--headed]
+"""
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RULES = [
+    {'radio_selection': [50, 50]},
+    {'radio_selection': [25, 25, 25, 25]},
+    {'multiple_selection': [50, 50, 50, 50]},
+    {'matrix_radio_selection': [[20, 20, 20, 20, 20]] * 3},
+    {'dropdown_selection': [34, 33, 33]},
+    {'blank_filling': [['很好', '一般'], [50, 50]]},
+]
+
+# Phase -> (server options, seconds between questions, seconds until stop)
+SCENARIOS = {
+    "navigate": ({"response_delay": 20.0}, 0.05, 1.0),
+    "fill": ({}, 3.0, 2.0),
+    "submit": ({"submit_delay": 20.0}, 0.0, 2.5),
+}
+
+
+def measure(page, phase):
+    """
+    Run one scenario on a page.
+
+    Returns:
+        float: Milliseconds from setting the stop event to run() returning.
+    """
+    from automation.fill_runner import FillRunner, new_run_seed
+    from tools.stand_in_survey_server import StandInSurveyServer
+
+    server_options, delay, stop_after = SCENARIOS[phase]
+    server = StandInSurveyServer(**server_options).start()
+    stop_event = threading.Event()
+    stopped_at = []
+
+    def stop():
+        stopped_at.append(time.perf_counter())
+        stop_event.set()
+
+    runner = FillRunner(server.url, RULES, 100, new_run_seed(),
+                        stop_event=stop_event, delay=delay)
+    timer = threading.Timer(stop_after, stop)
+    timer.start()
+    try:
+        runner.run(page, range(1, 101))
+        returned_at = time.perf_counter()
+    finally:
+        timer.cancel()
+        server.stop()
+    if not stopped_at:
+        raise RuntimeError(f"{phase}: run finished before the stop request")
+    return (returned_at - stopped_at[0]) * 1000
+
+
+def main():
+    import argparse
+    from automation.browser_setup import BrowserSetup
+
+    parser = argparse.ArgumentParser(description="Stop latency check")
+    parser.add_argument("--budget-ms", type=int, default=300)
+    parser.add_argument("--headed", action="store_true", help="show the browser")
+    args = parser.parse_args()
+
+    playwright_instance, browser, context, page = BrowserSetup.setup_browser(
+        headless=not args.headed)
+    problems = []
+    try:
+        for phase in SCENARIOS:
+            latency = measure(page, phase)
+            print(f"{phase:>8}: stopped in {latency:.0f} ms (budget {args.budget_ms} ms)")
+            if latency > args.budget_ms:
+                problems.append(f"{phase}: {latency:.0f} ms")
+            # Start the next scenario from a fresh page
+            page.close()
+            page = BrowserSetup.new_page(context)
+    finally:
+        browser.close()
+        playwright_instance.stop()
+
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    sys.exit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
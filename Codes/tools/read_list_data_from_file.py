@@ -4,6 +4,11 @@ YAML configuration file reader for survey rules.
 import os
 import yaml
 
+# libyaml-backed loader/dumper when PyYAML was built with it (much faster on
+# large rule files), otherwise the pure-Python implementations
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YAML_DUMPER = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
 
 def list_yaml_files(directory):
     """
@@ -33,10 +38,24 @@ def read_yaml_file(file_path):
         dict: The parsed YAML content.
     """
     with open(file_path, 'r', encoding="utf-8") as file:
-        data = yaml.safe_load(file)
+        data = yaml.load(file, Loader=YAML_LOADER)
     return data
 
 
+def dump_yaml(data, stream=None):
+    """
+    Dump data as YAML in the format used for rule files.
+
+    Args:
+        data: Data to dump.
+        stream: Optional file object; without one the YAML text is returned.
+
+    Returns:
+        str or None: YAML text if no stream was given.
+    """
+    return yaml.dump(data, stream, Dumper=YAML_DUMPER, allow_unicode=True, default_flow_style=False)
+
+
 def read_data_from_yaml_file(folder_path, file_name=None):
     """
     Read a YAML file from the specified folder.
@@ -0,0 +1,247 @@
+"""
+Local stand-in survey server for offline end-to-end runs.
+
+Serves a page with the same DOM structure as a WJX survey (the parts that
+_analyze_survey_page and FormFiller rely on) and counts submissions, so fill
+runs can be exercised and measured without touching a real survey.
+"""
+import html
+import json
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+
+# (type_code, title, options) - matrix options are (rows, columns)
+DEFAULT_QUESTIONS = [
+    ('3', '您的性别', ['男', '女']),
+    ('3', '您的年级', ['大一', '大二', '大三', '大四']),
+    ('4', '您常用的学习工具', ['电脑', '平板', '手机', '纸质书']),
+    ('6', '请评价以下方面', (['课程内容', '教学方式', '考核方式'], 5)),
+    ('7', '您所在的城市', ['北京', '上海', '广州']),
+    ('1', '其他建议', None),
+]
+
+
+def build_survey_html(questions=None):
+    """
+    Build a WJX-like survey page.
+
+    Args:
+        questions (list): (type_code, title, options) tuples. Defaults to
+                          DEFAULT_QUESTIONS.
+
+    Returns:
+        str: HTML document.
+    """
+    questions = questions or DEFAULT_QUESTIONS
+    fields = []
+    for topic, (type_code, title, options) in enumerate(questions, start=1):
+        body = []
+        if type_code in ('3', '4'):
+            input_type, link_class = ('radio', 'jqradio') if type_code == '3' else ('checkbox', 'jqcheck')
+            for i, text in enumerate(options, start=1):
+                body.append(
+                    f'<div class="ui-controlgroup">'
+                    f'<input type="{input_type}" id="q{topic}_{i}" name="q{topic}" value="{i}" style="display:none">'
+                    f'<a class="{link_class}" href="javascript:;" onclick="toggle(this)"></a>'
+                    f'<div class="label">{html.escape(text)}</div></div>'
+                )
+        elif type_code == '6':
+            rows, columns = options
+            body.append('<table>')
+            for r, row_title in enumerate(rows, start=1):
+                body.append(f'<tr class="rowtitle"><th><span class="itemTitleSpan">{html.escape(row_title)}</span></th></tr>')
+                cells = ''.join(
+                    f'<td><a href="javascript:;" dval="{c}" onclick="pick(this)"></a></td>'
+                    for c in range(1, columns + 1)
+                )
+                body.append(f'<tr id="drv{topic}_{r}" tp="d">{cells}</tr>')
+            body.append('</table>')
+        elif type_code == '7':
+            opts = ''.join(f'<option value="{i}">{html.escape(t)}</option>'
+                           for i, t in enumerate(options, start=1))
+            body.append(f'<select id="q{topic}"><option value="">请选择</option>{opts}</select>')
+        elif type_code == '1':
+            body.append(f'<input type="text" id="q{topic}">')
+
+        fields.append(
+            f'<div class="field" topic="{topic}" type="{type_code}">'
+            f'<div class="topichtml">{html.escape(title)}</div>{"".join(body)}</div>'
+        )
+
+    return f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Stand-in Survey</title></head>
+<body>
+<div id="divQuestion"><fieldset>{''.join(fields)}</fieldset></div>
+<div class="submitbtn" onclick="submitSurvey()">提交</div>
+<script>
+function toggle(a) {{
+    var input = a.previousElementSibling;
+    if (input.type === 'radio') {{
+        document.querySelectorAll('input[name="' + input.name + '"]').forEach(function (el) {{ el.checked = false; }});
+        input.checked = true;
+    }} else {{
+        input.checked = !input.checked;
+    }}
+}}
+function pick(a) {{
+    a.closest('tr').setAttribute('data-value', a.getAttribute('dval'));
+}}
+function submitSurvey() {{
+    var answers = {{}};
+    document.querySelectorAll('#divQuestion input:checked').forEach(function (el) {{
+        (answers[el.name] = answers[el.name] || []).push(el.value);
+    }});
+    document.querySelectorAll('#divQuestion tr[data-value]').forEach(function (tr) {{
+        answers[tr.id] = tr.getAttribute('data-value');
+    }});
+    document.querySelectorAll('#divQuestion select, #divQuestion input[type=text]').forEach(function (el) {{
+        answers[el.id] = el.value;
+    }});
+    fetch('/submit', {{method: 'POST', body: JSON.stringify(answers)}}).then(function () {{
+        location.href = '/complete';
+    }});
+}}
+</script>
+</body></html>"""
+
+
+class StandInSurveyServer:
+    """Threaded HTTP server serving a stand-in survey on localhost."""
+
+    def __init__(self, port=0, questions=None, response_delay=0.0, submit_delay=0.0):
+        """
+        Initialize the server.
+
+        Args:
+            port (int): Port to listen on; 0 picks a free port.
+            questions (list): Survey questions, see build_survey_html.
+            response_delay (float): Seconds to wait before answering each
+                                    survey page request (simulates a slow server).
+            submit_delay (float): Seconds to wait before acknowledging each
+                                  submission, keeping the page on the survey.
+        """
+        self.page = build_survey_html(questions).encode("utf-8")
+        self.response_delay = response_delay
+        self.submit_delay = submit_delay
+        self.stats = {"page_views": 0, "submissions": 0}
+        self.submissions = []
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """URL of the survey page."""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/survey"
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def _send(self, status, body, content_type="text/html; charset=utf-8"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/survey":
+                    if server.response_delay:
+                        time.sleep(server.response_delay)
+                    with server._lock:
+                        server.stats["page_views"] += 1
+                    self._send(200, server.page)
+                elif path == "/complete":
+                    self._send(200, "<html><body>提交成功</body></html>".encode("utf-8"))
+                elif path == "/stats":
+                    with server._lock:
+                        body = json.dumps(server.stats).encode("utf-8")
+                    self._send(200, body, "application/json")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                payload = self.rfile.read(length)
+                if self.path.split("?", 1)[0] != "/submit":
+                    self._send(404, b"not found", "text/plain")
+                    return
+                try:
+                    answers = json.loads(payload or b"{}")
+                except ValueError:
+                    answers = None
+                with server._lock:
+                    server.stats["submissions"] += 1
+                    server.submissions.append(answers)
+                if server.submit_delay:
+                    time.sleep(server.submit_delay)
+                self._send(200, b"ok", "text/plain")
+
+        return Handler
+
+    def start(self):
+        """Start serving in a background thread."""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop the server."""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+    import os
+    import sys
+
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    parser = argparse.ArgumentParser(description="Stand-in survey server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--delay", type=float, default=0.0, help="survey page response delay (s)")
+    parser.add_argument("--fill", type=int, default=0, help="run a sharded fill of N forms against the server")
+    parser.add_argument("--processes", type=int, default=2)
+    parser.add_argument("--pipeline", action="store_true", help="preload the next form on a second page")
+    args = parser.parse_args()
+
+    server = StandInSurveyServer(port=args.port, response_delay=args.delay).start()
+    print(f"Serving stand-in survey at {server.url}")
+
+    if args.fill:
+        from automation.fill_runner import new_run_seed, summarize_timings
+        from automation.sharded_runner import ShardedFillRunner
+
+        rules = [
+            {'radio_selection': [50, 50]},
+            {'radio_selection': [25, 25, 25, 25]},
+            {'multiple_selection': [50, 50, 50, 50]},
+            {'matrix_radio_selection': [[20, 20, 20, 20, 20]] * 3},
+            {'dropdown_selection': [34, 33, 33]},
+            {'blank_filling': [['很好', '一般'], [50, 50]]},
+        ]
+        started = time.perf_counter()
+        runner = ShardedFillRunner(server.url, rules, args.fill, new_run_seed(),
+                                   args.processes, pipeline=args.pipeline, log_callback=print)
+        results = runner.run()
+        elapsed = time.perf_counter() - started
+        submitted = sum(1 for r in results if r["status"] == "submitted")
+        print(f"Submitted {submitted}/{args.fill} in {elapsed:.1f}s, server stats: {server.stats}")
+        print(f"Average phase timings (s): {summarize_timings(results)}")
+        server.stop()
+    else:
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            server.stop()
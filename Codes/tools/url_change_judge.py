@@ -23,7 +23,7 @@ class url_has_changed:
         return page.url != self.old_url
 
 
-def wait_for_url_change(page, old_url, timeout=10000):
+def wait_for_url_change(page, old_url, timeout=10000, stop_event=None):
     """
     Wait for the URL to change using Playwright's wait_for_function.
 
@@ -31,16 +31,27 @@ def wait_for_url_change(page, old_url, timeout=10000):
         page: Playwright Page instance.
         old_url (str): The original URL to compare against.
         timeout (int): Maximum time to wait in milliseconds.
+        stop_event: Optional event that interrupts the wait (see
+                    automation.cancellation.wait_sliced).
 
     Returns:
         bool: True if URL changed, False if timeout.
+
+    Raises:
+        FillCancelled: If stop_event is set during the wait.
     """
+    from automation.cancellation import FillCancelled, wait_sliced
     try:
-        page.wait_for_function(
-            "url => window.location.href !== url",
-            arg=old_url,
-            timeout=timeout
+        return wait_sliced(
+            lambda slice_ms: page.wait_for_function(
+                "url => window.location.href !== url",
+                arg=old_url,
+                timeout=slice_ms
+            ),
+            timeout,
+            stop_event,
         )
-        return True
+    except FillCancelled:
+        raise
     except Exception:
         return False
@@ -1,6 +1,22 @@
 # Utils package
-from .yaml_validator import YamlValidator
-from .logger import GuiLogger
-from .updater import UpdateChecker
+#
+# Exports are imported on first access: yaml_validator pulls in PyYAML and
+# updater pulls in urllib/QtCore, neither of which startup needs.
+import importlib
 
-__all__ = ['YamlValidator', 'GuiLogger', 'UpdateChecker']
+_EXPORTS = {
+    'YamlValidator': '.yaml_validator',
+    'GuiLogger': '.logger',
+    'UpdateChecker': '.updater',
+    'ShutdownCoordinator': '.shutdown',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    if name not in _EXPORTS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    globals()[name] = value
+    return value
@@ -0,0 +1,145 @@
+"""
+Environment probes run once in the background and persisted across launches.
+
+Detecting the DPI scale ratio runs external tools (xrdb on Linux,
+system_profiler on macOS, each with a 5 s timeout), and detecting the
+browser channel runs a series of shutil.which/os.path.isfile checks. The
+results only change when the environment does, so they are stored with a
+fingerprint of the environment and reused while it matches.
+"""
+import hashlib
+import json
+import os
+import platform
+import sys
+import threading
+import time
+
+
+ENV_PROBE_FILE = "env_probe.json"
+
+
+def _probe_scale_ratio():
+    from tools.screen_resolution import get_scale_ratio
+    return get_scale_ratio()
+
+
+def _probe_browser_channel():
+    from automation.browser_setup import BrowserSetup
+    return BrowserSetup._detect_channel()
+
+
+# Probe name -> callable returning a JSON-serializable result
+PROBES = {
+    "scale_ratio": _probe_scale_ratio,
+    "browser_channel": _probe_browser_channel,
+}
+
+
+def environment_fingerprint():
+    """
+    Fingerprint of everything the probes depend on.
+
+    Returns:
+        str: Hex digest over the OS, Python, PATH and display settings.
+    """
+    parts = [
+        platform.platform(),
+        sys.version,
+        os.environ.get("PATH", ""),
+        os.environ.get("GDK_SCALE", ""),
+        os.environ.get("DISPLAY", ""),
+        os.environ.get("WAYLAND_DISPLAY", ""),
+    ]
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()
+
+
+class EnvironmentProbe:
+    """
+    Runs PROBES on a background thread, or loads their persisted results.
+
+    Results are reused while the environment fingerprint matches and they
+    are younger than MAX_AGE; older results are still used, but refreshed in
+    the background.
+    """
+
+    # Seconds after which persisted results are re-probed in the background
+    MAX_AGE = 7 * 24 * 3600
+
+    def __init__(self, cache_file, probes=None):
+        """
+        Initialize the environment probe.
+
+        Args:
+            cache_file (str): JSON file holding the persisted results.
+            probes (dict): Probe name -> callable. Defaults to PROBES.
+        """
+        self.cache_file = cache_file
+        self.probes = probes if probes is not None else PROBES
+        self.results = {}
+        self._ready = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Make results available, probing in the background if needed.
+
+        Persisted results matching the current environment are available
+        immediately; otherwise get() waits for the background probe.
+        """
+        cached = self._load()
+        fingerprint = environment_fingerprint()
+        if cached is not None and cached.get("fingerprint") == fingerprint \
+                and set(self.probes) <= set(cached.get("results", {})):
+            self.results = cached["results"]
+            self._ready.set()
+            if time.time() - cached.get("probed_at", 0) < self.MAX_AGE:
+                return
+        self._thread = threading.Thread(target=self._probe, args=(fingerprint,),
+                                        name="env-probe", daemon=True)
+        self._thread.start()
+
+    def _probe(self, fingerprint):
+        results = {}
+        for name, probe in self.probes.items():
+            try:
+                results[name] = probe()
+            except Exception as e:
+                print(f"Environment probe {name} failed: {e}")
+        self.results = results
+        self._ready.set()
+        self._save({"fingerprint": fingerprint, "probed_at": time.time(), "results": results})
+
+    def get(self, name, default=None, timeout=None):
+        """
+        Get a probe result.
+
+        Args:
+            name (str): Probe name.
+            default: Returned if the probe failed or did not finish in time.
+            timeout (float): Seconds to wait for the background probe;
+                             None waits until it finishes.
+
+        Returns:
+            The probe result, or default.
+        """
+        self._ready.wait(timeout)
+        return self.results.get(name, default)
+
+    def _load(self):
+        if not os.path.exists(self.cache_file):
+            return None
+        try:
+            with open(self.cache_file, "r", encoding="utf-8") as file:
+                return json.load(file)
+        except (json.JSONDecodeError, IOError):
+            return None
+
+    def _save(self, data):
+        tmp_file = self.cache_file + ".tmp"
+        try:
+            with open(tmp_file, "w", encoding="utf-8") as file:
+                json.dump(data, file, ensure_ascii=False, indent=2)
+            os.replace(tmp_file, self.cache_file)
+        except IOError as e:
+            print(f"Error saving environment probe results: {e}")
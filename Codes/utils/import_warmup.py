@@ -0,0 +1,56 @@
+"""
+Background import of heavy dependencies after the window is shown.
+
+Startup only imports what the first window needs. The modules the first
+analysis or fill will need are imported here on a daemon thread once the
+window is up, so that the first click does not pay for them either.
+"""
+import importlib
+import threading
+import time
+
+
+# pyautogui is left out: importing it connects to the display server and it
+# is only needed when a verification challenge appears.
+WARM_UP_MODULES = (
+    'yaml',
+    'bs4',
+    'playwright.sync_api',
+    'automation.browser_setup',
+    'models.rule_model',
+    'utils.yaml_validator',
+)
+
+
+def start_import_warmup(modules=WARM_UP_MODULES, log_callback=None):
+    """
+    Import modules on a background thread.
+
+    Args:
+        modules (tuple): Module names to import.
+        log_callback (callable): Optional callback receiving a summary line.
+
+    Returns:
+        threading.Thread: The started daemon thread.
+    """
+    thread = threading.Thread(target=_warm_up, args=(modules, log_callback),
+                              name="import-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def _warm_up(modules, log_callback):
+    started = time.perf_counter()
+    failed = []
+    for name in modules:
+        try:
+            importlib.import_module(name)
+        except Exception:
+            # Reported properly by the code that actually uses the module
+            failed.append(name)
+    if log_callback:
+        elapsed = (time.perf_counter() - started) * 1000
+        message = f"后台预加载模块完成，耗时 {elapsed:.0f} ms"
+        if failed:
+            message += f"（未能加载: {', '.join(failed)}）"
+        log_callback(message)
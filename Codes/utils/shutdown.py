@@ -0,0 +1,102 @@
+"""
+Concurrent, time-bounded teardown of background resources.
+"""
+import threading
+import time
+
+
+class ShutdownCoordinator:
+    """
+    Closes registered resources concurrently, each within its own timeout.
+
+    Every step's close function runs on its own daemon thread. A step that
+    has not finished when its timeout expires is abandoned and its kill
+    function, if any, is called instead, so one unresponsive browser or
+    worker process cannot hold up the others or the caller.
+    """
+
+    # Seconds a step may take before it is killed
+    DEFAULT_TIMEOUT = 3.0
+
+    def __init__(self, log_callback=None):
+        """
+        Initialize the shutdown coordinator.
+
+        Args:
+            log_callback (callable): Optional callback receiving a line per step.
+        """
+        self.log_callback = log_callback or (lambda msg: None)
+        self._steps = []
+
+    def add(self, name, close, timeout=None, kill=None):
+        """
+        Register a teardown step.
+
+        Args:
+            name (str): Name used in the log.
+            close (callable): Closes the resource; may block.
+            timeout (float): Seconds close may take. Defaults to DEFAULT_TIMEOUT.
+            kill (callable): Optional fallback forcibly ending the resource,
+                             called if close does not finish in time.
+        """
+        self._steps.append((name, close, timeout if timeout is not None else self.DEFAULT_TIMEOUT, kill))
+
+    def run(self):
+        """
+        Run all steps concurrently and wait for them, bounded by their timeouts.
+
+        Returns:
+            dict: Step name -> (seconds taken, status), where status is
+                  "ok", "error", "killed" or "timeout".
+        """
+        started = time.perf_counter()
+        running = []
+        for name, close, timeout, kill in self._steps:
+            outcome = {}
+            thread = threading.Thread(target=self._run_step, args=(close, outcome),
+                                      name=f"shutdown-{name}", daemon=True)
+            thread.start()
+            running.append((name, timeout, kill, thread, outcome))
+
+        report = {}
+        for name, timeout, kill, thread, outcome in running:
+            thread.join(max(0.0, started + timeout - time.perf_counter()))
+            if not thread.is_alive():
+                status = "error" if "error" in outcome else "ok"
+                elapsed = outcome["elapsed"]
+            else:
+                status = "timeout"
+                if kill is not None:
+                    try:
+                        kill()
+                        status = "killed"
+                    except Exception as e:
+                        outcome["error"] = e
+                elapsed = time.perf_counter() - started
+            report[name] = (elapsed, status)
+            self._log_step(name, elapsed, status, outcome.get("error"))
+
+        self._steps = []
+        self.log_callback(f"清理完成，总耗时 {(time.perf_counter() - started) * 1000:.0f} ms")
+        return report
+
+    @staticmethod
+    def _run_step(close, outcome):
+        begin = time.perf_counter()
+        try:
+            close()
+        except Exception as e:
+            outcome["error"] = e
+        outcome["elapsed"] = time.perf_counter() - begin
+
+    def _log_step(self, name, elapsed, status, error):
+        ms = elapsed * 1000
+        if status == "ok":
+            self.log_callback(f"关闭{name}: {ms:.0f} ms")
+        elif status == "error":
+            self.log_callback(f"关闭{name}出错 ({ms:.0f} ms): {error}")
+        elif status == "killed":
+            self.log_callback(f"关闭{name}超时 ({ms:.0f} ms)，已强制结束")
+        else:
+            suffix = f"，强制结束失败: {error}" if error else ""
+            self.log_callback(f"关闭{name}超时 ({ms:.0f} ms){suffix}")
@@ -0,0 +1,56 @@
+"""
+Per-component timing of application startup.
+"""
+import os
+import sys
+import time
+from contextlib import contextmanager
+
+
+class StartupTrace:
+    """
+    Records how long each startup component takes.
+
+    Spans are measured from the moment the trace was created (process
+    start, as far as the application can tell). Set AUTOFILLFORM_STARTUP_TRACE
+    to also print the report to stderr.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.spans = []  # (name, start offset ms, duration ms)
+
+    @contextmanager
+    def span(self, name):
+        """Time the enclosed block as component name."""
+        begin = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans.append((name, (begin - self.started) * 1000, (end - begin) * 1000))
+
+    def mark(self, name):
+        """Record a point in time, e.g. the first window being shown."""
+        self.spans.append((name, (time.perf_counter() - self.started) * 1000, 0.0))
+
+    def report(self, log_callback=None, start=0):
+        """
+        Format the recorded spans.
+
+        Args:
+            log_callback (callable): Optional callback receiving each line.
+            start (int): Index of the first span to report, to report spans
+                         recorded after an earlier report.
+
+        Returns:
+            list: Report lines.
+        """
+        lines = [f"启动耗时 {name}: +{offset:.0f} ms, {duration:.1f} ms"
+                 for name, offset, duration in self.spans[start:]]
+        for line in lines:
+            if log_callback:
+                log_callback(line)
+            if os.environ.get("AUTOFILLFORM_STARTUP_TRACE"):
+                print(line, file=sys.stderr)
+        return lines
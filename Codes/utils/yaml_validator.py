@@ -2,6 +2,7 @@
 YAML syntax validation utility.
 """
 import yaml
+from tools.read_list_data_from_file import YAML_LOADER
 
 
 class YamlValidator:
@@ -19,7 +20,7 @@ class YamlValidator:
             tuple: (is_valid, error_message, parsed_data)
         """
         try:
-            data = yaml.safe_load(yaml_content)
+            data = yaml.load(yaml_content, Loader=YAML_LOADER)
             if data is None:
                 return False, "YAML内容为空", None
             return True, "", data
@@ -42,65 +43,132 @@ class YamlValidator:
         Returns:
             tuple: (is_valid, error_message)
         """
+        is_valid, error_msg, _ = YamlValidator._check_rule_structure(data)
+        return is_valid, error_msg
+
+    @staticmethod
+    def _check_rule_structure(data):
+        """
+        Validate rule file structure and locate the offending value.
+
+        Returns:
+            tuple: (is_valid, error_message, path) where path is the key path
+                   of the offending value, e.g. ('rules', 2), or () for the
+                   whole document.
+        """
         if not isinstance(data, dict):
-            return False, "规则文件必须是一个对象/字典"
+            return False, "规则文件必须是一个对象/字典", ()
 
         required_keys = ['url', 'number_of_questionnaires_to_be_filled_out', 'rules']
         missing_keys = [k for k in required_keys if k not in data]
         if missing_keys:
-            return False, f"缺少必需的字段: {', '.join(missing_keys)}"
+            return False, f"缺少必需的字段: {', '.join(missing_keys)}", ()
 
         # Validate URL
-        url = data.get('url', '').strip()
+        url = str(data.get('url') or '').strip()
         if not url:
-            return False, "URL不能为空"
+            return False, "URL不能为空", ('url',)
         if not url.startswith('http://') and not url.startswith('https://'):
-            return False, "URL必须以http://或https://开头"
+            return False, "URL必须以http://或https://开头", ('url',)
 
         # Validate fill count
         fill_count = data.get('number_of_questionnaires_to_be_filled_out', 0)
         if not isinstance(fill_count, int) or fill_count < 1:
-            return False, "填写数量必须是大于0的整数"
+            return False, "填写数量必须是大于0的整数", ('number_of_questionnaires_to_be_filled_out',)
 
         # Validate rules
         rules = data.get('rules', [])
         if not isinstance(rules, list):
-            return False, "rules必须是一个列表"
+            return False, "rules必须是一个列表", ('rules',)
 
         if len(rules) == 0:
-            return False, "rules列表不能为空"
+            return False, "rules列表不能为空", ('rules',)
 
         # Validate each rule
         for i, rule in enumerate(rules):
             if not isinstance(rule, dict):
-                return False, f"规则{i + 1}必须是一个对象/字典"
+                return False, f"规则{i + 1}必须是一个对象/字典", ('rules', i)
 
             if len(rule) != 1:
-                return False, f"规则{i + 1}必须只有一个键值对"
+                return False, f"规则{i + 1}必须只有一个键值对", ('rules', i)
 
             key = list(rule.keys())[0]
             valid_types = ['radio_selection', 'multiple_selection', 'matrix_radio_selection', 'blank_filling', 'dropdown_selection']
             if key not in valid_types:
-                return False, f"规则{i + 1}: 未知的问题类型 '{key}'"
+                return False, f"规则{i + 1}: 未知的问题类型 '{key}'", ('rules', i)
 
             value = rule[key]
-            if key == 'blank_filling':
+            if key == 'blank_filling' and isinstance(value, dict):
+                if not isinstance(value.get('text_pool'), str) or not value['text_pool'].strip():
+                    return False, f"规则{i + 1}: blank_filling的text_pool必须是文本池文件路径", ('rules', i)
+                if not isinstance(value.get('weighted', False), bool):
+                    return False, f"规则{i + 1}: blank_filling的weighted必须是true或false", ('rules', i)
+
+            elif key == 'blank_filling':
                 if not isinstance(value, list) or len(value) != 2:
-                    return False, f"规则{i + 1}: blank_filling必须是一个包含两个元素的列表 [文本列表, 概率列表]"
+                    return False, f"规则{i + 1}: blank_filling必须是一个包含两个元素的列表 [文本列表, 概率列表] 或 {{text_pool: 文件路径}}", ('rules', i)
                 if not isinstance(value[0], list) or not isinstance(value[1], list):
-                    return False, f"规则{i + 1}: blank_filling的两个元素都必须是列表"
+                    return False, f"规则{i + 1}: blank_filling的两个元素都必须是列表", ('rules', i)
                 if len(value[0]) != len(value[1]):
-                    return False, f"规则{i + 1}: 文本列表和概率列表长度必须相同"
+                    return False, f"规则{i + 1}: 文本列表和概率列表长度必须相同", ('rules', i)
 
             elif key == 'matrix_radio_selection':
                 if not isinstance(value, list) or len(value) == 0:
-                    return False, f"规则{i + 1}: matrix_radio_selection必须是一个非空列表"
+                    return False, f"规则{i + 1}: matrix_radio_selection必须是一个非空列表", ('rules', i)
 
             else:  # radio_selection or multiple_selection
                 if not isinstance(value, list) or len(value) == 0:
-                    return False, f"规则{i + 1}: {key}必须是一个非空列表"
+                    return False, f"规则{i + 1}: {key}必须是一个非空列表", ('rules', i)
+
+        return True, "", ()
+
+    @staticmethod
+    def validate_content(yaml_content):
+        """
+        Validate syntax and structure, locating the error in the source.
 
-        return True, ""
+        The document is parsed once; the node tree is kept to map a
+        structural error back to the line of the offending value.
+
+        Args:
+            yaml_content (str): YAML content as string.
+
+        Returns:
+            tuple: (is_valid, error_message, line) where line is the 0-based
+                   line of the error, or None if it cannot be located.
+        """
+        loader = YAML_LOADER(yaml_content)
+        try:
+            node = loader.get_single_node()
+            if node is None:
+                return False, "YAML内容为空", None
+            data = loader.construct_document(node)
+        except yaml.YAMLError as e:
+            mark = getattr(e, 'problem_mark', None)
+            if mark is not None:
+                return False, f"YAML语法错误: 第{mark.line + 1}行，第{mark.column + 1}列: {e.problem}", mark.line
+            return False, f"YAML语法错误: {e}", None
+        finally:
+            loader.dispose()
+
+        is_valid, error_msg, path = YamlValidator._check_rule_structure(data)
+        if is_valid:
+            return True, "", None
+        return False, error_msg, YamlValidator._node_line(node, path)
+
+    @staticmethod
+    def _node_line(node, path):
+        """0-based start line of the node at a key path."""
+        for key in path:
+            if isinstance(node, yaml.MappingNode):
+                node = next((v for k, v in node.value if k.value == key), None)
+            elif isinstance(node, yaml.SequenceNode) and isinstance(key, int) and key < len(node.value):
+                node = node.value[key]
+            else:
+                node = None
+            if node is None:
+                return None
+        return node.start_mark.line
 
     @staticmethod
     def validate_file(file_path):
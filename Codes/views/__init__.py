@@ -1,7 +1,9 @@
 # Views package
 from .main_view import MainView
 from .workflow_view import WorkflowView
+from .rule_editor_view import RuleEditorView
 from .history_view import HistoryView
+from .queue_view import QueueView
 from .loading_window import LoadingWindow
 
-__all__ = ['MainView', 'WorkflowView', 'HistoryView', 'LoadingWindow']
+__all__ = ['MainView', 'WorkflowView', 'RuleEditorView', 'HistoryView', 'QueueView', 'LoadingWindow']
@@ -58,6 +58,11 @@ class HistoryView(QWidget):
         self.view_logs_button.setFixedWidth(100)
         toolbar_layout.addWidget(self.view_logs_button)
 
+        self.resume_button = QPushButton("断点续填")
+        self.resume_button.setToolTip("以相同的规则和随机种子，从中断处继续填写选中的会话")
+        self.resume_button.setFixedWidth(100)
+        toolbar_layout.addWidget(self.resume_button)
+
         toolbar_layout.addStretch()
         layout.addLayout(toolbar_layout)
 
@@ -108,6 +113,7 @@ class HistoryView(QWidget):
             "export": self.export_button,
             "clear": self.clear_button,
             "view_logs": self.view_logs_button,
+            "resume": self.resume_button,
         }
         if button_name in button_map:
             button_map[button_name].clicked.connect(command)
@@ -125,7 +131,7 @@ class HistoryView(QWidget):
             timestamp (str): ISO format timestamp.
             rule_file (str): Rule file name.
             url (str): Survey URL.
-            fill_count (int): Number of forms filled.
+            fill_count: Number of forms, or a "done/target" progress string.
             status (str): Session status.
         """
         # Format timestamp for display
@@ -224,6 +230,16 @@ class HistoryView(QWidget):
         """Show an error dialog."""
         QMessageBox.critical(self, title, message)
 
+    def ask_to_confirm_resume(self, done, fill_count):
+        """Ask user to confirm resuming a session with done of fill_count forms filled."""
+        reply = QMessageBox.question(
+            self,
+            "断点续填",
+            f"该会话已完成 {done}/{fill_count} 份，确定继续填写剩余的 {fill_count - done} 份吗？",
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        return reply == QMessageBox.StandardButton.Yes
+
     def ask_to_confirm_clear(self):
         """Ask user to confirm clearing history."""
         reply = QMessageBox.question(
@@ -17,9 +17,6 @@ from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QTabWidget,
 from PySide6.QtCore import Qt
 from PySide6.QtGui import QColor, QPalette
 
-from utils.updater import UpdateChecker
-from utils.markdown_renderer import MarkdownRenderer
-
 
 class MainView(QWidget):
     """Main application window with tabbed interface using PySide6."""
@@ -49,26 +46,61 @@ class MainView(QWidget):
 
         # Create widgets for each tab
         self.workflow_widget = QWidget()
+        self.rule_editor_widget = QWidget()
         self.history_widget = QWidget()
+        self.queue_widget = QWidget()
         self.about_widget = QWidget()
 
         # Add tabs to notebook
         self.notebook.addTab(self.workflow_widget, "问卷工作流")
+        self.notebook.addTab(self.rule_editor_widget, "规则编辑")
         self.notebook.addTab(self.history_widget, "历史记录")
+        self.notebook.addTab(self.queue_widget, "任务队列")
         self.notebook.addTab(self.about_widget, "关于")
 
-        # Build about page content
-        self._setup_about_page()
+        # Tabs other than the first are built on first activation
+        self._tab_builders = {}
+        self.notebook.currentChanged.connect(self._build_tab)
+        self.set_tab_builder(self.about_widget, self._setup_about_page)
 
         # Set up status bar on main window
         self.setup_status_bar(main_window)
 
+    # ------------------------------------------------------------------
+    # Deferred tabs
+    # ------------------------------------------------------------------
+
+    def set_tab_builder(self, tab_widget, builder):
+        """
+        Build a tab's content when the tab is first activated.
+
+        Args:
+            tab_widget (QWidget): The tab's page widget.
+            builder (callable): Called without arguments to fill the page.
+        """
+        self._tab_builders[tab_widget] = builder
+        if self.notebook.currentWidget() is tab_widget:
+            self._build_tab(self.notebook.currentIndex())
+
+    def _build_tab(self, index):
+        builder = self._tab_builders.pop(self.notebook.widget(index), None)
+        if builder is not None:
+            builder()
+
+    def ensure_tab_built(self, tab_widget):
+        """Build a deferred tab now, e.g. before another component needs it."""
+        builder = self._tab_builders.pop(tab_widget, None)
+        if builder is not None:
+            builder()
+
     # ------------------------------------------------------------------
     # About page
     # ------------------------------------------------------------------
 
     def _setup_about_page(self):
         """Set up the about tab page content with update checker UI."""
+        from utils.updater import UpdateChecker
+
         # Use a scroll area so the page is scrollable on small screens
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
@@ -210,6 +242,7 @@ class MainView(QWidget):
                 bg_color = palette.color(QPalette.ColorRole.Base).name()
                 link_color = palette.color(QPalette.ColorRole.Link).name()
 
+                from utils.markdown_renderer import MarkdownRenderer
                 renderer = MarkdownRenderer(
                     text_color=text_color,
                     background_color=bg_color,
@@ -334,6 +367,14 @@ class MainView(QWidget):
         """Get the workflow tab widget."""
         return self.workflow_widget
 
+    def get_rule_editor_widget(self):
+        """Get the rule editor tab widget."""
+        return self.rule_editor_widget
+
     def get_history_widget(self):
         """Get the history tab widget."""
         return self.history_widget
+
+    def get_queue_widget(self):
+        """Get the job queue tab widget."""
+        return self.queue_widget
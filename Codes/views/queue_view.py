@@ -0,0 +1,312 @@
+"""
+Job queue view - queued fill jobs and their scheduler.
+"""
+import os
+from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
+                              QSpinBox, QPushButton, QTextEdit, QMessageBox,
+                              QGroupBox, QTableWidget, QTableWidgetItem,
+                              QAbstractItemView, QHeaderView, QFileDialog,
+                              QListWidget, QListWidgetItem)
+from PySide6.QtCore import Signal, QObject, Qt
+from PySide6.QtGui import QFont
+
+
+# Job status -> display text
+STATUS_TEXT = {
+    "queued": "排队中",
+    "running": "运行中",
+    "completed": "已完成",
+    "cancelled": "已取消",
+    "error": "出错",
+}
+
+
+class QueueViewSignals(QObject):
+    """Signals for thread-safe updates from scheduler threads."""
+
+    log_append = Signal(str)
+    jobs_changed = Signal()
+    shown = Signal()
+
+
+class QueueView(QWidget):
+    """View for the job queue tab."""
+
+    def __init__(self, parent_widget):
+        """
+        Initialize the queue view.
+
+        Args:
+            parent_widget: Parent widget to contain this view.
+        """
+        super().__init__(parent_widget)
+
+        parent_layout = QVBoxLayout(parent_widget)
+        parent_layout.setContentsMargins(0, 0, 0, 0)
+        parent_layout.addWidget(self)
+
+        self.signals = QueueViewSignals()
+        self.setup_ui()
+
+    def setup_ui(self):
+        """Set up the UI components."""
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(12, 12, 12, 12)
+        layout.setSpacing(10)
+
+        # Adding jobs
+        add_group = QGroupBox("添加任务")
+        add_group_layout = QVBoxLayout(add_group)
+
+        self.rule_list = QListWidget()
+        self.rule_list.setSelectionMode(QAbstractItemView.SelectionMode.ExtendedSelection)
+        self.rule_list.setMaximumHeight(110)
+        self.rule_list.setToolTip("规则目录中的规则文件，可多选")
+        add_group_layout.addWidget(self.rule_list)
+
+        add_layout = QHBoxLayout()
+        add_layout.addWidget(QLabel("填写数量:"))
+        self.count_spinbox = QSpinBox()
+        self.count_spinbox.setRange(1, 100000)
+        self.count_spinbox.setValue(100)
+        self.count_spinbox.setToolTip("添加当前问卷时的目标份数；规则文件使用其中设置的数量")
+        add_layout.addWidget(self.count_spinbox)
+        add_layout.addWidget(QLabel("优先级:"))
+        self.priority_spinbox = QSpinBox()
+        self.priority_spinbox.setRange(-99, 99)
+        self.priority_spinbox.setValue(0)
+        self.priority_spinbox.setToolTip("数值越大越先运行")
+        add_layout.addWidget(self.priority_spinbox)
+        add_layout.addWidget(QLabel("最多进程:"))
+        self.concurrency_spinbox = QSpinBox()
+        self.concurrency_spinbox.setRange(1, os.cpu_count() or 1)
+        self.concurrency_spinbox.setValue(1)
+        self.concurrency_spinbox.setToolTip("该任务同时使用的填写进程数上限")
+        add_layout.addWidget(self.concurrency_spinbox)
+        add_layout.addStretch()
+        self.add_selected_button = QPushButton("添加所选规则")
+        add_layout.addWidget(self.add_selected_button)
+        self.add_files_button = QPushButton("添加其他文件...")
+        add_layout.addWidget(self.add_files_button)
+        self.add_current_button = QPushButton("添加当前问卷")
+        self.add_current_button.setProperty("class", "primary")
+        add_layout.addWidget(self.add_current_button)
+        add_group_layout.addLayout(add_layout)
+        layout.addWidget(add_group)
+
+        # Job list
+        jobs_group = QGroupBox("任务队列")
+        jobs_layout = QVBoxLayout(jobs_group)
+
+        self.table = QTableWidget(0, 6)
+        self.table.setHorizontalHeaderLabels(["名称", "URL", "进度", "优先级", "最多进程", "状态"])
+        self.table.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
+        self.table.setSelectionMode(QAbstractItemView.SelectionMode.SingleSelection)
+        self.table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        self.table.verticalHeader().setVisible(False)
+        header = self.table.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        header.setSectionResizeMode(1, QHeaderView.ResizeMode.Stretch)
+        for column in range(2, 6):
+            header.setSectionResizeMode(column, QHeaderView.ResizeMode.ResizeToContents)
+        jobs_layout.addWidget(self.table)
+
+        toolbar_layout = QHBoxLayout()
+        self.raise_button = QPushButton("提高优先级")
+        toolbar_layout.addWidget(self.raise_button)
+        self.lower_button = QPushButton("降低优先级")
+        toolbar_layout.addWidget(self.lower_button)
+        self.requeue_button = QPushButton("重新排队")
+        self.requeue_button.setToolTip("将已取消或出错的任务放回队列，从中断处继续")
+        toolbar_layout.addWidget(self.requeue_button)
+        self.remove_button = QPushButton("删除")
+        self.remove_button.setProperty("class", "danger")
+        toolbar_layout.addWidget(self.remove_button)
+        self.clear_finished_button = QPushButton("清除已结束")
+        toolbar_layout.addWidget(self.clear_finished_button)
+        toolbar_layout.addStretch()
+        toolbar_layout.addWidget(QLabel("同时进程:"))
+        self.pool_spinbox = QSpinBox()
+        self.pool_spinbox.setRange(1, os.cpu_count() or 1)
+        self.pool_spinbox.setToolTip("所有任务共用的填写进程数（无头浏览器，不处理验证）")
+        toolbar_layout.addWidget(self.pool_spinbox)
+        self.start_button = QPushButton("开始队列")
+        self.start_button.setProperty("class", "success")
+        toolbar_layout.addWidget(self.start_button)
+        self.stop_button = QPushButton("停止队列")
+        self.stop_button.setProperty("class", "danger")
+        self.stop_button.setEnabled(False)
+        toolbar_layout.addWidget(self.stop_button)
+        jobs_layout.addLayout(toolbar_layout)
+
+        layout.addWidget(jobs_group, 1)
+
+        # Log
+        log_group = QGroupBox("日志")
+        log_layout = QVBoxLayout(log_group)
+        self.log_text = QTextEdit()
+        self.log_text.setReadOnly(True)
+        self.log_text.setFont(QFont("Consolas", 9))
+        self.log_text.setMaximumHeight(150)
+        log_layout.addWidget(self.log_text)
+        layout.addWidget(log_group)
+
+        self.signals.log_append.connect(self._append_log_slot)
+
+    # --- Command setters ---
+
+    def set_button_command(self, button_name, command):
+        """Set command for a button."""
+        button_map = {
+            "add_selected": self.add_selected_button,
+            "add_files": self.add_files_button,
+            "add_current": self.add_current_button,
+            "raise": self.raise_button,
+            "lower": self.lower_button,
+            "requeue": self.requeue_button,
+            "remove": self.remove_button,
+            "clear_finished": self.clear_finished_button,
+            "start": self.start_button,
+            "stop": self.stop_button,
+        }
+        if button_name in button_map:
+            button_map[button_name].clicked.connect(command)
+
+    def set_jobs_changed_command(self, command):
+        self.signals.jobs_changed.connect(command)
+
+    def set_pool_size_changed_command(self, command):
+        self.pool_spinbox.valueChanged.connect(command)
+
+    def set_shown_command(self, command):
+        self.signals.shown.connect(command)
+
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.signals.shown.emit()
+
+    # --- Getters ---
+
+    def get_fill_count(self):
+        return self.count_spinbox.value()
+
+    def get_priority(self):
+        return self.priority_spinbox.value()
+
+    def get_max_concurrency(self):
+        return self.concurrency_spinbox.value()
+
+    def get_pool_size(self):
+        return self.pool_spinbox.value()
+
+    def set_pool_size(self, pool_size):
+        self.pool_spinbox.setValue(pool_size)
+
+    def get_selected_rule_files(self):
+        """Get the names of the selected rule files."""
+        return [item.data(Qt.ItemDataRole.UserRole) for item in self.rule_list.selectedItems()]
+
+    def get_selected_job_id(self):
+        """Get the selected job ID."""
+        row = self.table.currentRow()
+        if row < 0 or not self.table.selectedItems():
+            return None
+        return self.table.item(row, 0).data(Qt.ItemDataRole.UserRole)
+
+    # --- Updates ---
+
+    def show_jobs(self, jobs):
+        """
+        Show jobs in the table, keeping the selection.
+
+        Args:
+            jobs (list): Job dicts in scheduling order.
+        """
+        selected = self.get_selected_job_id()
+        self.table.setRowCount(len(jobs))
+        for row, job in enumerate(jobs):
+            url = job["url"]
+            cells = [
+                job["name"],
+                url if len(url) <= 50 else url[:47] + "...",
+                f"{job.get('completed', 0)}/{job['fill_count']}",
+                str(job["priority"]),
+                str(job["max_concurrency"]),
+                STATUS_TEXT.get(job["status"], job["status"]),
+            ]
+            for column, text in enumerate(cells):
+                item = QTableWidgetItem(text)
+                if column >= 2:
+                    item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
+                self.table.setItem(row, column, item)
+            self.table.item(row, 0).setData(Qt.ItemDataRole.UserRole, job["id"])
+            if job.get("error"):
+                self.table.item(row, 5).setToolTip(job["error"])
+            if job["id"] == selected:
+                self.table.selectRow(row)
+
+    def show_rule_files(self, entries):
+        """
+        Show the rule files of the rules directory, keeping the selection.
+
+        Args:
+            entries (dict): File name -> rule index entry (see RuleModel.get_rule_index).
+        """
+        selected = set(self.get_selected_rule_files())
+        self.rule_list.clear()
+        for name, entry in sorted(entries.items()):
+            if entry["valid"]:
+                text = f"{name}  ({entry['fill_count']}份, {entry['question_count']}题)"
+            else:
+                text = f"{name}  (无效: {entry['error']})"
+            item = QListWidgetItem(text)
+            item.setData(Qt.ItemDataRole.UserRole, name)
+            item.setToolTip(entry["url"] or entry["path"])
+            if not entry["valid"]:
+                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsSelectable)
+            self.rule_list.addItem(item)
+            item.setSelected(name in selected and entry["valid"])
+
+    def set_queue_running(self, is_running):
+        self.start_button.setEnabled(not is_running)
+        self.stop_button.setEnabled(is_running)
+
+    def notify_jobs_changed(self):
+        """Request a table refresh; safe to call from any thread."""
+        self.signals.jobs_changed.emit()
+
+    def append_log(self, message):
+        self.signals.log_append.emit(message)
+
+    def _append_log_slot(self, message):
+        cursor = self.log_text.textCursor()
+        cursor.movePosition(cursor.MoveOperation.End)
+        cursor.insertText(message + "\n")
+        self.log_text.setTextCursor(cursor)
+        self.log_text.ensureCursorVisible()
+
+    # --- Dialogs ---
+
+    def ask_rule_files(self, rules_dir):
+        """Ask for rule files to enqueue. Returns a list of paths."""
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self, "选择规则文件", rules_dir, "YAML files (*.yaml *.yml);;All files (*.*)"
+        )
+        return file_paths
+
+    def ask_to_confirm_remove(self, name, is_running):
+        """Ask user to confirm removing a job."""
+        message = f"确定要删除任务「{name}」吗？"
+        if is_running:
+            message += "\n该任务正在运行，将被停止。"
+        reply = QMessageBox.question(
+            self, "删除任务", message,
+            QMessageBox.StandardButton.Yes | QMessageBox.StandardButton.No
+        )
+        return reply == QMessageBox.StandardButton.Yes
+
+    def show_info(self, title, message):
+        QMessageBox.information(self, title, message)
+
+    def show_error(self, title, message):
+        QMessageBox.critical(self, title, message)
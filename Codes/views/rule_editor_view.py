@@ -1,72 +1,93 @@
 """
 YAML rule editor view - Migrated to PySide6 with syntax highlighting.
 """
+import re
+
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                               QPushButton, QTextEdit, QPlainTextEdit,
-                              QFileDialog, QMessageBox, QFrame, QSplitter)
-from PySide6.QtCore import Qt, Signal, QTimer
+                              QFileDialog, QMessageBox, QFrame, QSplitter,
+                              QToolTip)
+from PySide6.QtCore import Qt, Signal, QTimer, QObject, QEvent
 from PySide6.QtGui import (QFont, QTextCharFormat, QColor, QSyntaxHighlighter,
                            QTextDocument, QPainter, QTextCursor, QTextFormat,
                            QTextBlock, QPaintEvent)
 
 
+def _make_format(color):
+    char_format = QTextCharFormat()
+    char_format.setForeground(QColor(color))
+    return char_format
+
+
 class YamlSyntaxHighlighter(QSyntaxHighlighter):
     """Simple YAML syntax highlighter."""
 
+    # Quoted strings (possibly unterminated) or a comment starting at a word boundary
+    _TOKEN_RE = re.compile(r""""(?:[^"\\]|\\.)*"?|'(?:[^']|'')*'?|(?:(?<=\s)|^)#""")
+    # Optional list dashes, then a plain or quoted key followed by ": " or ":" at end
+    _KEY_RE = re.compile(r"""^(\s*(?:-\s+)*)("[^"]*"|'[^']*'|[^\s#'"-][^:]*?|-[^\s:][^:]*?)\s*:(?=\s|$)""")
+    # Block scalar indicator: | or > with optional chomping/indentation modifiers
+    _BLOCK_SCALAR_RE = re.compile(r"^[|>][-+0-9]*$")
+    _ITEM_RE = re.compile(r"^\s*(?:-\s+)+")
+    _INDENT_RE = re.compile(r"^\s*")
+
+    # Block state outside of block scalars; inside, the state is the column
+    # of the key or list item that opened the scalar
+    NORMAL_STATE = -1
+
     def __init__(self, document):
         super().__init__(document)
+        self.key_format = _make_format("#0000ff")      # Blue
+        self.value_format = _make_format("#008000")    # Green
+        self.comment_format = _make_format("#808080")  # Gray
 
     def highlightBlock(self, text):
         """Apply syntax highlighting to a block of text."""
-        # Key format (before colon)
-        key_format = QTextCharFormat()
-        key_format.setForeground(QColor("#0000ff"))  # Blue
-
-        # Value format (after colon)
-        value_format = QTextCharFormat()
-        value_format.setForeground(QColor("#008000"))  # Green
-
-        # Comment format
-        comment_format = QTextCharFormat()
-        comment_format.setForeground(QColor("#808080"))  # Gray
-
-        # Check for comments
-        if '#' in text:
-            comment_pos = text.find('#')
-            # Check if # is inside a string (escaped or quoted)
-            in_string = False
-            escape_next = False
-            for i in range(comment_pos):
-                if text[i] == '\\' and not escape_next:
-                    escape_next = True
-                    continue
-                if text[i] == '"' or text[i] == "'":
-                    in_string = not in_string
-                    escape_next = False
-                    continue
-                escape_next = False
-
-            if not in_string:
-                self.setFormat(comment_pos, len(text) - comment_pos, comment_format)
-                text = text[:comment_pos]  # Only process text before comment
-
-        # Check for key: value pairs
-        colon_pos = text.find(':')
-        if colon_pos > 0:
-            # Highlight key
-            key = text[:colon_pos].strip()
-            if key:
-                key_pos = text.find(key)
-                self.setFormat(key_pos, len(key), key_format)
-
-            # Highlight value (after colon)
-            value_start = colon_pos + 1
-            if value_start < len(text):
-                value = text[value_start:].strip()
-                if value and value not in ('|', '>', '-', '---'):
-                    value_pos = text.find(value, value_start)
-                    if value_pos >= 0:
-                        self.setFormat(value_pos, len(value), value_format)
+        indent = self._INDENT_RE.match(text).end()
+        scalar_indent = self.previousBlockState()
+
+        # Continuation lines of a | or > block scalar are plain value text
+        if scalar_indent != self.NORMAL_STATE:
+            if indent == len(text) or indent > scalar_indent:
+                if indent < len(text):
+                    self.setFormat(indent, len(text) - indent, self.value_format)
+                self.setCurrentBlockState(scalar_indent)
+                return
+
+        self.setCurrentBlockState(self.NORMAL_STATE)
+        if indent == len(text):
+            return
+
+        # Comment: the first # outside of quotes that starts a word
+        end = len(text)
+        for match in self._TOKEN_RE.finditer(text):
+            if match.group() == '#':
+                end = match.start()
+                self.setFormat(end, len(text) - end, self.comment_format)
+                break
+
+        match = self._KEY_RE.match(text, 0, end)
+        if match:
+            self.setFormat(match.start(2), match.end(2) - match.start(2), self.key_format)
+            value_start = match.end()
+            node_column = match.start(2)
+        else:
+            # A list item may open a block scalar too ("- |")
+            item = self._ITEM_RE.match(text, 0, end)
+            if not item:
+                return
+            value_start = item.end()
+            node_column = text.rfind('-', 0, value_start)
+
+        value = text[value_start:end].strip()
+        if not value:
+            return
+        if self._BLOCK_SCALAR_RE.match(value):
+            # Scalar content is indented deeper than the node that opened it
+            self.setCurrentBlockState(node_column)
+        elif match and value not in ('-', '---'):
+            value_pos = text.find(value, value_start)
+            self.setFormat(value_pos, len(value), self.value_format)
 
 
 class YamlEditor(QPlainTextEdit):
@@ -76,11 +97,58 @@ class YamlEditor(QPlainTextEdit):
         super().__init__(parent)
         self.setFont(QFont("Consolas", 10))
         self.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        self._error_markers = {}
+
+    def set_error_markers(self, markers):
+        """
+        Mark lines with validation errors.
+
+        Args:
+            markers (dict): 0-based line number -> error message.
+        """
+        self._error_markers = dict(markers)
+        selections = []
+        marker_format = QTextCharFormat()
+        marker_format.setBackground(QColor(239, 68, 68, 60))
+        marker_format.setUnderlineStyle(QTextCharFormat.UnderlineStyle.WaveUnderline)
+        marker_format.setUnderlineColor(QColor("#EF4444"))
+        marker_format.setProperty(QTextFormat.Property.FullWidthSelection, True)
+        document = self.document()
+        for line in self._error_markers:
+            block = document.findBlockByNumber(line)
+            if not block.isValid():
+                continue
+            selection = QTextEdit.ExtraSelection()
+            selection.format = marker_format
+            selection.cursor = QTextCursor(block)
+            selections.append(selection)
+        self.setExtraSelections(selections)
+
+    def event(self, event):
+        """Show the error message of a marked line as tooltip."""
+        if event.type() == QEvent.Type.ToolTip and self._error_markers:
+            cursor = self.cursorForPosition(self.viewport().mapFromGlobal(event.globalPos()))
+            message = self._error_markers.get(cursor.blockNumber())
+            if message:
+                QToolTip.showText(event.globalPos(), message, self)
+            else:
+                QToolTip.hideText()
+            return True
+        return super().event(event)
+
+
+class RuleEditorViewSignals(QObject):
+    """Signals for thread-safe updates from the validation worker."""
+
+    validation_finished = Signal(int, object)
 
 
 class RuleEditorView:
     """View for the YAML rule editor tab using PySide6."""
 
+    # Milliseconds of typing inactivity before live validation runs
+    VALIDATION_DELAY_MS = 400
+
     def __init__(self, parent_widget):
         """
         Initialize the rule editor view.
@@ -91,6 +159,7 @@ class RuleEditorView:
         self.widget = parent_widget
         self._current_file = None
         self._modified = False
+        self.signals = RuleEditorViewSignals()
         self.setup_ui()
 
     @property
@@ -165,6 +234,11 @@ class RuleEditorView:
         # Set placeholder text
         self.editor.setPlaceholderText("Open a YAML file to start editing...")
 
+        # Live validation runs once typing pauses
+        self._validation_timer = QTimer(self.widget)
+        self._validation_timer.setSingleShot(True)
+        self._validation_timer.setInterval(self.VALIDATION_DELAY_MS)
+
         # Status bar
         self.status_label = QLabel("就绪")
         self.status_label.setStyleSheet("border-top: 1px solid #ccc; padding-top: 5px;")
@@ -183,8 +257,13 @@ class RuleEditorView:
         if button_name in button_map:
             button_map[button_name].clicked.connect(command)
 
+    def set_validation_command(self, command):
+        """Set the command run (debounced) after the content changes."""
+        self._validation_timer.timeout.connect(command)
+
     def on_text_changed(self):
         """Handle text changed event."""
+        self._validation_timer.start()
         if not self._modified:
             self._modified = True
             self.modified_label.setText("*")
@@ -200,6 +279,7 @@ class RuleEditorView:
         self.editor.blockSignals(False)
         self._modified = False
         self.modified_label.setText("")
+        self._validation_timer.start()
 
     def new_file(self):
         """Create a new file."""
@@ -279,6 +359,15 @@ class RuleEditorView:
         """Set the status bar message."""
         self.status_label.setText(message)
 
+    def show_live_validation(self, is_valid, message, line):
+        """Show a live validation result as status and line marker."""
+        if is_valid:
+            self.editor.set_error_markers({})
+            self.set_status("实时验证: 通过")
+            return
+        self.editor.set_error_markers({line: message} if line is not None else {})
+        self.set_status("实时验证: " + message)
+
     def show_validation_result(self, is_valid, message):
         """Show validation result in status bar."""
         if is_valid:
@@ -0,0 +1,499 @@
+"""
+Item model and delegate for the rule configuration tree.
+
+The tree used to create one QSpinBox per option. The model keeps the
+probabilities in a ProbabilityStore and the delegate creates a spin box only
+for the cell being edited, so the view only ever touches the visible rows.
+"""
+from PySide6.QtCore import QAbstractItemModel, QModelIndex, Qt
+from PySide6.QtGui import QColor
+from PySide6.QtWidgets import QStyledItemDelegate, QSpinBox
+
+from models.probability_store import ProbabilityStore, TYPE_TO_RULE, CHOICE_RULES, equal_split
+from models.text_pool import is_text_pool
+from views.styles import PRIMARY
+
+
+HEADER_LABELS = ["#", "类型", "内容", "概率"]
+TEXT_COLUMN = 2
+PROBABILITY_COLUMN = 3
+
+ADD_TEXT_LABEL = "+ 添加文本"
+TEXT_POOL_LABEL = "  文本池"
+
+
+class _Question:
+    """
+    Tree node of one question; the parent of its option/sub-question rows.
+
+    row is also the question's index in the ProbabilityStore.
+    """
+
+    __slots__ = ('row', 'topic', 'type_name', 'text', 'rule_key',
+                 'options', 'matrix_rows', 'text_pool')
+
+    def __init__(self, row, topic, type_name, text, rule_key):
+        self.row = row
+        self.topic = topic
+        self.type_name = type_name
+        self.text = text
+        self.rule_key = rule_key
+        self.options = []      # Option labels (choice questions)
+        self.matrix_rows = []
+        self.text_pool = None  # Text pool reference (blank filling questions)
+
+
+class _MatrixRow:
+    """Tree node of one matrix sub-question; the parent of its option cells."""
+
+    __slots__ = ('question', 'row', 'title', 'options')
+
+    def __init__(self, question, row, title, options):
+        self.question = question
+        self.row = row
+        self.title = title
+        self.options = options
+
+
+class RuleTreeModel(QAbstractItemModel):
+    """Three-level model of questions, options/sub-questions and matrix cells."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self._questions = []
+        self.store = ProbabilityStore()
+
+    # --- Loading and export ---
+
+    def load(self, parsed_questions, rules=None):
+        """
+        Replace the model contents.
+
+        Args:
+            parsed_questions: List of parsed question dicts.
+            rules: Optional list of rule dicts with saved probabilities.
+                   When provided, restores saved probabilities instead of defaults.
+        """
+        self.beginResetModel()
+        self._questions = []
+        self.store.clear()
+        rule_index = 0  # Tracks position in rules list
+        for q in parsed_questions or []:
+            rule_key = TYPE_TO_RULE.get(q.get('type_code', ''))
+            if not rule_key:
+                continue
+            saved_rule = rules[rule_index] if rules and rule_index < len(rules) else None
+            rule_index += 1
+            node, rows, texts = self._build_question(len(self._questions), q, rule_key, saved_rule)
+            self._questions.append(node)
+            self.store.append_question(rule_key, rows, texts)
+        self.endResetModel()
+
+    def update(self, parsed_questions, rules=None):
+        """
+        Bring the model in line with parsed_questions without a full reset.
+
+        Questions whose structure (type, texts, options, matrix rows) is
+        unchanged only get their changed probabilities and texts pushed;
+        questions whose structure differs have their children rebuilt. A
+        different number of configured questions falls back to load.
+
+        Args:
+            parsed_questions: List of parsed question dicts.
+            rules: Optional list of rule dicts with saved probabilities.
+
+        Returns:
+            list or None: Rows of the rebuilt questions, or None after a full reset.
+        """
+        built = []
+        rule_index = 0
+        for q in parsed_questions or []:
+            rule_key = TYPE_TO_RULE.get(q.get('type_code', ''))
+            if not rule_key:
+                continue
+            saved_rule = rules[rule_index] if rules and rule_index < len(rules) else None
+            rule_index += 1
+            built.append(self._build_question(len(built), q, rule_key, saved_rule))
+
+        if len(built) != len(self._questions):
+            self.load(parsed_questions, rules)
+            return None
+
+        rebuilt = []
+        for row, (node, rows, texts) in enumerate(built):
+            old = self._questions[row]
+            if self._signature(old, self._row_lengths(row)) != self._signature(node, [len(r) for r in rows]):
+                self._replace_question(row, node, rows, texts)
+                rebuilt.append(row)
+            else:
+                self._push_values(old, rows, texts)
+        return rebuilt
+
+    @staticmethod
+    def _signature(node, row_lengths):
+        """Everything about a question that determines its tree rows."""
+        return (node.rule_key, node.topic, node.type_name, node.text, tuple(node.options),
+                tuple((m.title, tuple(m.options)) for m in node.matrix_rows), tuple(row_lengths),
+                tuple(sorted(node.text_pool.items())) if node.text_pool else None)
+
+    def _row_lengths(self, question):
+        return [self.store.row_length(question, r) for r in range(self.store.row_count(question))]
+
+    def _replace_question(self, row, node, rows, texts):
+        """Swap in a rebuilt question, replacing only its children."""
+        parent = self.createIndex(row, 0)
+        old_count = self.rowCount(parent)
+        if old_count:
+            self.beginRemoveRows(parent, 0, old_count - 1)
+            # Childless placeholder between removal and insertion
+            self._questions[row] = _Question(row, node.topic, node.type_name, node.text, None)
+            self.store.replace_question(row, None, [], None)
+            self.endRemoveRows()
+
+        self._questions[row] = node
+        new_count = len(node.matrix_rows) if node.rule_key == 'matrix_radio_selection' else (
+            len(rows[0]) + 1 if node.rule_key == 'blank_filling' else len(node.options))
+        if new_count:
+            self.beginInsertRows(parent, 0, new_count - 1)
+        self.store.replace_question(row, node.rule_key, rows, texts)
+        if new_count:
+            self.endInsertRows()
+        self.dataChanged.emit(self.index(row, 0), self.index(row, TEXT_COLUMN))
+
+    def _push_values(self, node, rows, texts):
+        """Write changed probabilities/texts of a structurally unchanged question."""
+        question = node.row
+        for r, values in enumerate(rows):
+            current = self.store.row_values(question, r)
+            changed = [i for i, v in enumerate(values) if current[i] != max(0, min(100, int(v)))]
+            if not changed:
+                continue
+            self.store.set_row(question, r, values)
+            if node.rule_key == 'matrix_radio_selection':
+                parent = self.createIndex(r, 0, node)
+            else:
+                parent = self.createIndex(question, 0)
+            self.dataChanged.emit(self.index(changed[0], PROBABILITY_COLUMN, parent),
+                                  self.index(changed[-1], PROBABILITY_COLUMN, parent))
+
+        if texts is not None and texts != self.store.texts[question]:
+            changed = [i for i, t in enumerate(texts) if self.store.texts[question][i] != t]
+            self.store.texts[question] = list(texts)
+            parent = self.createIndex(question, 0)
+            self.dataChanged.emit(self.index(changed[0], TEXT_COLUMN, parent),
+                                  self.index(changed[-1], TEXT_COLUMN, parent))
+
+    @staticmethod
+    def _build_question(row, q, rule_key, saved_rule):
+        """Build a question node with its probability rows and candidate texts."""
+        node = _Question(row, str(q.get('topic', '?')), q.get('type', '未知'),
+                         q.get('text', ''), rule_key)
+        saved = saved_rule.get(rule_key) if saved_rule else None
+        rows, texts = [], None
+
+        if rule_key in CHOICE_RULES:
+            node.options = list(q.get('options', []))
+            count = len(node.options)
+            if rule_key == 'multiple_selection':
+                defaults = [50] * count
+            else:
+                defaults = equal_split(count)
+            rows.append(_fill_probs(saved, defaults))
+
+        elif rule_key == 'matrix_radio_selection':
+            for si, sub_q in enumerate(q.get('sub_questions', [])):
+                opts = list(sub_q.get('options', []))
+                saved_opts = saved[si] if saved and si < len(saved) else None
+                node.matrix_rows.append(_MatrixRow(node, si, sub_q.get('sub_question', ''), opts))
+                rows.append(_fill_probs(saved_opts, equal_split(len(opts))))
+
+        elif rule_key == 'blank_filling' and is_text_pool(saved):
+            # A pool has no inline entries; it is shown as a single row
+            node.text_pool = dict(saved)
+            texts = []
+            rows.append([])
+
+        elif rule_key == 'blank_filling':
+            saved_texts = saved_probs = None
+            if isinstance(saved, list) and len(saved) == 2:
+                saved_texts, saved_probs = saved
+            if saved_texts and saved_probs:
+                pairs = list(zip(saved_texts, saved_probs))
+            else:
+                # Default: 2 example entries
+                pairs = [('示例文本1', 50), ('示例文本2', 50)]
+            texts = [text for text, _ in pairs]
+            rows.append([prob for _, prob in pairs])
+
+        return node, rows, texts
+
+    def to_rules(self):
+        """
+        Serialize the configured probabilities.
+
+        Returns:
+            list: Rule dicts in the order of the configured questions.
+        """
+        rules = self.store.to_rules()
+        for node in self._questions:
+            if node.text_pool:
+                rules[node.row] = {'blank_filling': dict(node.text_pool)}
+        return rules
+
+    def topics(self):
+        """Survey topic numbers of the configured questions, in rule order."""
+        return [node.topic for node in self._questions]
+
+    def equalize(self):
+        """Set all probabilities to an equal distribution."""
+        self.store.equalize()
+        self._emit_all_probabilities_changed()
+
+    def _emit_all_probabilities_changed(self):
+        for node in self._questions:
+            if node.rule_key == 'matrix_radio_selection':
+                for matrix_row in node.matrix_rows:
+                    self._emit_probabilities_changed(self.createIndex(matrix_row.row, 0, node),
+                                                     len(matrix_row.options))
+            else:
+                self._emit_probabilities_changed(self.createIndex(node.row, 0),
+                                                 self.store.row_length(node.row))
+
+    def _emit_probabilities_changed(self, parent, count):
+        if count:
+            self.dataChanged.emit(self.index(0, PROBABILITY_COLUMN, parent),
+                                  self.index(count - 1, PROBABILITY_COLUMN, parent))
+
+    # --- Blank filling entries ---
+
+    def is_add_text_row(self, index):
+        """Whether index is the "add text" row of a blank-filling question."""
+        node = index.internalPointer() if index.isValid() else None
+        return (isinstance(node, _Question) and node.rule_key == 'blank_filling'
+                and not node.text_pool and index.row() == self.store.row_length(node.row))
+
+    def add_text_entry(self, question_index, text='示例文本', prob=50):
+        """
+        Append a candidate text to a blank-filling question.
+
+        Args:
+            question_index (QModelIndex): Index of the question row.
+            text (str): Initial text.
+            prob (int): Initial probability.
+        """
+        node = self._questions[question_index.row()]
+        position = self.store.row_length(node.row)
+        self.beginInsertRows(self.index(node.row, 0), position, position)
+        self.store.insert(node.row, 0, position, prob, text)
+        self.endInsertRows()
+
+    def is_blank_question(self, index):
+        """Whether index is the row of a blank-filling question."""
+        return (index.isValid() and index.internalPointer() is None
+                and self._questions[index.row()].rule_key == 'blank_filling')
+
+    def text_pool(self, question_index):
+        """Text pool reference of a blank-filling question, or None."""
+        return self._questions[question_index.row()].text_pool
+
+    def set_text_pool(self, question_index, reference):
+        """
+        Switch a blank-filling question between a text pool and inline texts.
+
+        Args:
+            question_index (QModelIndex): Index of the question row.
+            reference (dict): {"text_pool": path, "weighted": bool}, or None
+                              for the default inline texts.
+        """
+        row = question_index.row()
+        old = self._questions[row]
+        node, rows, texts = self._build_question(
+            row, {'topic': old.topic, 'type': old.type_name, 'text': old.text}, 'blank_filling',
+            {'blank_filling': reference} if reference else None)
+        self._replace_question(row, node, rows, texts)
+
+    # --- QAbstractItemModel interface ---
+
+    def index(self, row, column, parent=QModelIndex()):
+        if not self.hasIndex(row, column, parent):
+            return QModelIndex()
+        if not parent.isValid():
+            return self.createIndex(row, column)
+        owner = parent.internalPointer()
+        if owner is None:
+            # Children of a question point at the question node
+            return self.createIndex(row, column, self._questions[parent.row()])
+        if isinstance(owner, _Question) and owner.rule_key == 'matrix_radio_selection':
+            return self.createIndex(row, column, owner.matrix_rows[parent.row()])
+        return QModelIndex()
+
+    def parent(self, index):
+        if not index.isValid():
+            return QModelIndex()
+        owner = index.internalPointer()
+        if owner is None:
+            return QModelIndex()
+        if isinstance(owner, _Question):
+            return self.createIndex(owner.row, 0)
+        return self.createIndex(owner.row, 0, owner.question)
+
+    def rowCount(self, parent=QModelIndex()):
+        if parent.column() > 0:
+            return 0
+        if not parent.isValid():
+            return len(self._questions)
+        owner = parent.internalPointer()
+        if owner is None:
+            node = self._questions[parent.row()]
+            if node.rule_key == 'matrix_radio_selection':
+                return len(node.matrix_rows)
+            if node.rule_key == 'blank_filling':
+                if node.text_pool:
+                    return 1
+                return self.store.row_length(node.row) + 1  # Trailing "add text" row
+            return len(node.options)
+        if isinstance(owner, _Question) and owner.rule_key == 'matrix_radio_selection':
+            return len(owner.matrix_rows[parent.row()].options)
+        return 0
+
+    def columnCount(self, parent=QModelIndex()):
+        return len(HEADER_LABELS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return HEADER_LABELS[section]
+            if role == Qt.ItemDataRole.TextAlignmentRole:
+                return int(Qt.AlignmentFlag.AlignCenter)
+        return None
+
+    def _cell(self, index):
+        """
+        Resolve an index to (kind, node, position).
+
+        kind is one of "question", "option", "sub_question", "matrix_option",
+        "text_entry", "add_button" or "text_pool".
+        """
+        owner = index.internalPointer()
+        row = index.row()
+        if owner is None:
+            return 'question', self._questions[row], row
+        if isinstance(owner, _MatrixRow):
+            return 'matrix_option', owner, row
+        if owner.rule_key == 'matrix_radio_selection':
+            return 'sub_question', owner.matrix_rows[row], row
+        if owner.rule_key == 'blank_filling':
+            if owner.text_pool:
+                return 'text_pool', owner, row
+            if row == self.store.row_length(owner.row):
+                return 'add_button', owner, row
+            return 'text_entry', owner, row
+        return 'option', owner, row
+
+    @staticmethod
+    def _address(kind, node, position):
+        """ProbabilityStore (question, row, position) of a probability cell."""
+        if kind == 'matrix_option':
+            return node.question.row, node.row, position
+        return node.row, 0, position
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        kind, node, position = self._cell(index)
+        column = index.column()
+
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == PROBABILITY_COLUMN:
+            return int(Qt.AlignmentFlag.AlignCenter)
+        if role == Qt.ItemDataRole.ForegroundRole and kind == 'add_button':
+            return QColor(PRIMARY)
+        if role not in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.EditRole):
+            return None
+
+        if column == PROBABILITY_COLUMN:
+            if kind in ('option', 'matrix_option', 'text_entry'):
+                value = self.store.get(*self._address(kind, node, position))
+                return value if role == Qt.ItemDataRole.EditRole else f"{value}%"
+            return None
+
+        if kind == 'question':
+            return (node.topic, node.type_name, node.text)[column]
+        if kind == 'option':
+            return {0: f"  选项{position + 1}", 2: node.options[position]}.get(column)
+        if kind == 'sub_question':
+            return {0: f"  子题{position + 1}", 2: node.title}.get(column)
+        if kind == 'matrix_option':
+            return f"    选项{node.options[position]}" if column == 0 else None
+        if kind == 'text_entry':
+            return {0: f"  文本{position + 1}", 2: self.store.texts[node.row][position]}.get(column)
+        if kind == 'add_button':
+            return ADD_TEXT_LABEL if column == TEXT_COLUMN else None
+        if kind == 'text_pool':
+            weighted = "（带权重）" if node.text_pool.get('weighted') else ""
+            return {0: TEXT_POOL_LABEL, 2: f"{node.text_pool['text_pool']}{weighted}"}.get(column)
+        return None
+
+    def flags(self, index):
+        if not index.isValid():
+            return Qt.ItemFlag.NoItemFlags
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        kind, _, _ = self._cell(index)
+        column = index.column()
+        if column == PROBABILITY_COLUMN and kind in ('option', 'matrix_option', 'text_entry'):
+            flags |= Qt.ItemFlag.ItemIsEditable
+        elif column == TEXT_COLUMN and kind == 'text_entry':
+            flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        kind, node, position = self._cell(index)
+        column = index.column()
+        if column == PROBABILITY_COLUMN and kind in ('option', 'matrix_option', 'text_entry'):
+            try:
+                self.store.set(*self._address(kind, node, position), int(value))
+            except (TypeError, ValueError):
+                return False
+        elif column == TEXT_COLUMN and kind == 'text_entry':
+            self.store.texts[node.row][position] = str(value)
+        else:
+            return False
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+
+class ProbabilityDelegate(QStyledItemDelegate):
+    """Edits probability cells with a spin box created only while editing."""
+
+    def createEditor(self, parent, option, index):
+        if index.column() != PROBABILITY_COLUMN:
+            return super().createEditor(parent, option, index)
+        spinbox = QSpinBox(parent)
+        spinbox.setRange(0, 100)
+        spinbox.setSuffix("%")
+        spinbox.setAlignment(Qt.AlignmentFlag.AlignCenter)
+        spinbox.setFrame(False)
+        return spinbox
+
+    def setEditorData(self, editor, index):
+        if index.column() != PROBABILITY_COLUMN:
+            super().setEditorData(editor, index)
+            return
+        editor.setValue(int(index.data(Qt.ItemDataRole.EditRole) or 0))
+
+    def setModelData(self, editor, model, index):
+        if index.column() != PROBABILITY_COLUMN:
+            super().setModelData(editor, model, index)
+            return
+        editor.interpretText()
+        model.setData(index, editor.value(), Qt.ItemDataRole.EditRole)
+
+
+def _fill_probs(saved, defaults):
+    """Use saved probabilities where present and defaults for the rest."""
+    probs = list(defaults)
+    if saved:
+        count = min(len(saved), len(probs))
+        probs[:count] = saved[:count]
+    return probs
@@ -37,14 +37,24 @@ SCROLLBAR_BG   = "#1E1E2E"
 SCROLLBAR_FG   = "#4A4A5E"
 SCROLLBAR_HOVER = "#5E5E76"
 
+import hashlib
 import os
+import shutil
 import tempfile
 
 # Cache generated arrow icon paths
 _arrow_icon_cache = {}
 
+STYLESHEET_FILE = "stylesheet.qss"
+ARROW_ICON_FILES = {
+    "up": "arrow_up.png",
+    "down": "arrow_down.png",
+    "up_hover": "arrow_up_hover.png",
+    "down_hover": "arrow_down_hover.png",
+}
 
-def _generate_arrow_icons():
+
+def _generate_arrow_icons(icon_dir):
     """Generate small triangle arrow PNG images for QSpinBox buttons."""
     if _arrow_icon_cache:
         return _arrow_icon_cache
@@ -52,7 +62,6 @@ def _generate_arrow_icons():
     from PySide6.QtGui import QPainter, QColor, QPolygonF, QImage
     from PySide6.QtCore import QPointF, Qt
 
-    icon_dir = os.path.join(tempfile.gettempdir(), "autofillform_icons")
     os.makedirs(icon_dir, exist_ok=True)
 
     def _make_arrow(filename, color_hex, direction):
@@ -72,16 +81,82 @@ def _generate_arrow_icons():
         img.save(path, "PNG")
         return path.replace("\\", "/")
 
-    _arrow_icon_cache["up"] = _make_arrow("arrow_up.png", TEXT_SECONDARY, "up")
-    _arrow_icon_cache["down"] = _make_arrow("arrow_down.png", TEXT_SECONDARY, "down")
-    _arrow_icon_cache["up_hover"] = _make_arrow("arrow_up_hover.png", PRIMARY, "up")
-    _arrow_icon_cache["down_hover"] = _make_arrow("arrow_down_hover.png", PRIMARY, "down")
+    _arrow_icon_cache["up"] = _make_arrow(ARROW_ICON_FILES["up"], TEXT_SECONDARY, "up")
+    _arrow_icon_cache["down"] = _make_arrow(ARROW_ICON_FILES["down"], TEXT_SECONDARY, "down")
+    _arrow_icon_cache["up_hover"] = _make_arrow(ARROW_ICON_FILES["up_hover"], PRIMARY, "up")
+    _arrow_icon_cache["down_hover"] = _make_arrow(ARROW_ICON_FILES["down_hover"], PRIMARY, "down")
     return _arrow_icon_cache
 
 
-def get_global_stylesheet() -> str:
-    """Return the complete QSS stylesheet string."""
-    arrows = _generate_arrow_icons()
+def _code_constants(code):
+    """Literal constants of a function, including nested functions."""
+    constants = []
+    for const in code.co_consts:
+        if hasattr(const, "co_consts"):
+            constants.extend(_code_constants(const))
+        else:
+            constants.append(repr(const))
+    return constants
+
+
+def _style_cache_key(cache_dir):
+    """
+    Hash of everything the generated stylesheet and icons depend on.
+
+    The palette, the app version, the cache location (icon paths are
+    embedded in the QSS) and the literals of the QSS template and icon
+    drawing code, so editing either invalidates the cache.
+    """
+    import version as version_info
+
+    palette = sorted((name, value) for name, value in globals().items()
+                     if name.isupper() and isinstance(value, str))
+    parts = [repr(palette), version_info.__version__, os.path.abspath(cache_dir)]
+    parts += _code_constants(_build_stylesheet.__code__)
+    parts += _code_constants(_generate_arrow_icons.__code__)
+    return hashlib.sha256("\0".join(parts).encode("utf-8")).hexdigest()[:16]
+
+
+def get_global_stylesheet(cache_dir=None) -> str:
+    """
+    Return the complete QSS stylesheet string.
+
+    The stylesheet and the arrow icons it references are rendered once and
+    stored under cache_dir, keyed by _style_cache_key; later launches read
+    the cached file instead of painting the icons and formatting the QSS.
+
+    Args:
+        cache_dir (str): Directory for the rendered stylesheet and icons.
+                         Defaults to a directory in the system temp dir.
+    """
+    cache_dir = cache_dir or os.path.join(tempfile.gettempdir(), "autofillform_style")
+    key_dir = os.path.join(cache_dir, _style_cache_key(cache_dir))
+    qss_path = os.path.join(key_dir, STYLESHEET_FILE)
+    if all(os.path.exists(os.path.join(key_dir, name)) for name in ARROW_ICON_FILES.values()):
+        try:
+            with open(qss_path, "r", encoding="utf-8") as file:
+                return file.read()
+        except OSError:
+            pass
+
+    stylesheet = _build_stylesheet(_generate_arrow_icons(key_dir))
+    try:
+        # Written last, so its presence implies the icons are complete
+        tmp_path = qss_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as file:
+            file.write(stylesheet)
+        os.replace(tmp_path, qss_path)
+        # Drop caches of older themes/versions
+        for entry in os.scandir(cache_dir):
+            if entry.is_dir() and entry.path != key_dir:
+                shutil.rmtree(entry.path, ignore_errors=True)
+    except OSError as e:
+        print(f"Error saving stylesheet cache: {e}")
+    return stylesheet
+
+
+def _build_stylesheet(arrows):
+    """Format the QSS template with the palette and arrow icon paths."""
     up_arrow_path = arrows["up"]
     down_arrow_path = arrows["down"]
     up_arrow_hover_path = arrows["up_hover"]
@@ -336,8 +411,8 @@ def get_global_stylesheet() -> str:
         border-radius: 5px;
     }}
 
-    /* ── QTreeWidget ───────────────────────────────────────── */
-    QTreeWidget {{
+    /* ── QTreeView / QTreeWidget ───────────────────────────── */
+    QTreeView {{
         background-color: {BG_MID};
         alternate-background-color: {BG_DARK};
         color: {TEXT_PRIMARY};
@@ -346,18 +421,18 @@ def get_global_stylesheet() -> str:
         outline: none;
         font-size: 13px;
     }}
-    QTreeWidget::item {{
+    QTreeView::item {{
         padding: 4px 2px;
         border: none;
     }}
-    QTreeWidget::item:selected {{
+    QTreeView::item:selected {{
         background-color: rgba(59, 130, 246, 0.2);
         color: {TEXT_PRIMARY};
     }}
-    QTreeWidget::item:hover:!selected {{
+    QTreeView::item:hover:!selected {{
         background-color: rgba(59, 130, 246, 0.08);
     }}
-    QTreeWidget::branch {{
+    QTreeView::branch {{
         background-color: transparent;
     }}
 
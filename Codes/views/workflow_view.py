@@ -1,12 +1,16 @@
 """
 Workflow view - integrated analyze + configure + fill workflow.
 """
+import os
 from PySide6.QtWidgets import (QWidget, QVBoxLayout, QHBoxLayout, QLabel,
                               QLineEdit, QSpinBox, QPushButton, QProgressBar,
+                              QCheckBox,
                               QTextEdit, QMessageBox, QGroupBox,
-                              QTreeWidget, QTreeWidgetItem, QHeaderView)
+                              QTreeView, QAbstractItemView, QHeaderView,
+                              QMenu, QFileDialog)
 from PySide6.QtCore import Signal, QObject, QMutex, QMutexLocker, Qt
 from PySide6.QtGui import QFont
+from views.rule_tree_model import RuleTreeModel, ProbabilityDelegate, TEXT_COLUMN
 
 
 class WorkflowViewSignals(QObject):
@@ -57,9 +61,18 @@ class WorkflowView(QWidget):
         tree_group = QGroupBox("Step 2: 问题配置")
         tree_layout = QVBoxLayout(tree_group)
 
-        self.tree = QTreeWidget()
-        self.tree.setHeaderLabels(["#", "类型", "内容", "概率"])
-        self.tree.setColumnCount(4)
+        self.tree_model = RuleTreeModel(self)
+        self.tree = QTreeView()
+        self.tree.setModel(self.tree_model)
+        self.tree.setItemDelegate(ProbabilityDelegate(self.tree))
+        self.tree.setUniformRowHeights(True)
+        self.tree.setEditTriggers(QAbstractItemView.EditTrigger.DoubleClicked |
+                                  QAbstractItemView.EditTrigger.SelectedClicked |
+                                  QAbstractItemView.EditTrigger.EditKeyPressed |
+                                  QAbstractItemView.EditTrigger.AnyKeyPressed)
+        self.tree.clicked.connect(self._tree_clicked)
+        self.tree.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.tree.customContextMenuRequested.connect(self._tree_context_menu)
         header = self.tree.header()
         header.setStretchLastSection(False)
         header.setSectionResizeMode(0, QHeaderView.ResizeMode.Fixed)
@@ -96,6 +109,15 @@ class WorkflowView(QWidget):
         self.count_spinbox.setRange(1, 1000)
         self.count_spinbox.setValue(1)
         controls_layout.addWidget(self.count_spinbox)
+        controls_layout.addWidget(QLabel("并行进程:"))
+        self.process_spinbox = QSpinBox()
+        self.process_spinbox.setRange(1, os.cpu_count() or 1)
+        self.process_spinbox.setValue(1)
+        self.process_spinbox.setToolTip("大于1时按进程分片并行填写（无头浏览器，不处理验证）")
+        controls_layout.addWidget(self.process_spinbox)
+        self.pipeline_checkbox = QCheckBox("预加载下一份")
+        self.pipeline_checkbox.setToolTip("提交当前问卷时在第二个页面提前打开下一份问卷，隐藏页面加载时间")
+        controls_layout.addWidget(self.pipeline_checkbox)
         controls_layout.addStretch()
         self.start_button = QPushButton("开始填写")
         self.start_button.setProperty("class", "success")
@@ -134,7 +156,6 @@ class WorkflowView(QWidget):
         self.signals.progress_update.connect(self._set_progress_slot)
         self.signals.status_update.connect(self._set_status_slot)
         self.signals.running_state_changed.connect(self._set_running_state_slot)
-        self.signals.analysis_complete.connect(self._analysis_complete_slot)
 
     # --- Command setters ---
 
@@ -153,6 +174,12 @@ class WorkflowView(QWidget):
     def set_reset_command(self, command):
         self.reset_button.clicked.connect(command)
 
+    def set_analysis_complete_command(self, command):
+        self.signals.analysis_complete.connect(command)
+
+    def set_link_changed_command(self, command):
+        self.link_edit.textChanged.connect(command)
+
     # --- Getters ---
 
     def get_survey_link(self):
@@ -164,282 +191,98 @@ class WorkflowView(QWidget):
     def set_fill_count(self, count):
         self.count_spinbox.setValue(count)
 
+    def get_process_count(self):
+        return self.process_spinbox.value()
+
+    def get_pipeline_enabled(self):
+        return self.pipeline_checkbox.isChecked()
+
     # --- Tree methods ---
 
     def populate_tree(self, parsed_questions, rules=None):
-        """Populate the tree widget with parsed question data.
+        """Populate the tree with parsed question data.
 
         Args:
             parsed_questions: List of parsed question dicts.
             rules: Optional list of rule dicts with saved probabilities.
                    When provided, restores saved probabilities instead of defaults.
         """
-        self.clear_tree()
-
-        type_to_rule = {
-            '3': 'radio_selection',
-            '7': 'dropdown_selection',
-            '4': 'multiple_selection',
-            '6': 'matrix_radio_selection',
-            '1': 'blank_filling',
-        }
-
-        rule_index = 0  # Tracks position in rules list
-
-        for q in parsed_questions:
-            topic = q.get('topic', '?')
-            q_type_code = q.get('type_code', '')
-            q_type_name = q.get('type', '未知')
-            q_text = q.get('text', '')
-            rule_key = type_to_rule.get(q_type_code)
-
-            if not rule_key:
-                continue
-
-            # Get saved rule for this question if available
-            saved_rule = None
-            if rules and rule_index < len(rules):
-                saved_rule = rules[rule_index]
-            rule_index += 1
-
-            # Create question-level item
-            q_item = QTreeWidgetItem(self.tree)
-            q_item.setText(0, str(topic))
-            q_item.setText(1, q_type_name)
-            q_item.setText(2, q_text)
-            q_item.setData(0, Qt.ItemDataRole.UserRole, {
-                'role': 'question',
-                'type_code': q_type_code,
-                'rule_key': rule_key
-            })
-
-            if rule_key in ('radio_selection', 'multiple_selection', 'dropdown_selection'):
-                options = q.get('options', [])
-                count = len(options)
-
-                # Extract saved probabilities if available
-                saved_probs = None
-                if saved_rule and rule_key in saved_rule:
-                    saved_probs = saved_rule[rule_key]
-
-                for idx, opt_text in enumerate(options):
-                    opt_item = QTreeWidgetItem(q_item)
-                    opt_item.setText(0, f"  选项{idx + 1}")
-                    opt_item.setText(2, opt_text)
-                    opt_item.setData(0, Qt.ItemDataRole.UserRole, {'role': 'option'})
-
-                    spinbox = QSpinBox()
-                    spinbox.setRange(0, 100)
-                    spinbox.setSuffix("%")
-
-                    if saved_probs and idx < len(saved_probs):
-                        spinbox.setValue(saved_probs[idx])
-                    elif rule_key in ('radio_selection', 'dropdown_selection') and count > 0:
-                        base = 100 // count
-                        rem = 100 % count
-                        spinbox.setValue(base + (1 if idx < rem else 0))
-                    else:
-                        spinbox.setValue(50)
-                    self.tree.setItemWidget(opt_item, 3, spinbox)
-
-            elif rule_key == 'matrix_radio_selection':
-                sub_questions = q.get('sub_questions', [])
-
-                # Extract saved sub-probabilities if available
-                saved_sub_probs = None
-                if saved_rule and 'matrix_radio_selection' in saved_rule:
-                    saved_sub_probs = saved_rule['matrix_radio_selection']
-
-                for si, sub_q in enumerate(sub_questions):
-                    sub_item = QTreeWidgetItem(q_item)
-                    sub_item.setText(0, f"  子题{si + 1}")
-                    sub_item.setText(2, sub_q.get('sub_question', ''))
-                    sub_item.setData(0, Qt.ItemDataRole.UserRole, {'role': 'sub_question'})
-
-                    opts = sub_q.get('options', [])
-                    opt_count = len(opts)
-
-                    # Get saved probs for this sub-question
-                    saved_opts = None
-                    if saved_sub_probs and si < len(saved_sub_probs):
-                        saved_opts = saved_sub_probs[si]
-
-                    for oi, opt_val in enumerate(opts):
-                        opt_item = QTreeWidgetItem(sub_item)
-                        opt_item.setText(0, f"    选项{opt_val}")
-                        opt_item.setData(0, Qt.ItemDataRole.UserRole, {'role': 'matrix_option'})
-
-                        spinbox = QSpinBox()
-                        spinbox.setRange(0, 100)
-                        spinbox.setSuffix("%")
-
-                        if saved_opts and oi < len(saved_opts):
-                            spinbox.setValue(saved_opts[oi])
-                        elif opt_count > 0:
-                            base = 100 // opt_count
-                            rem = 100 % opt_count
-                            spinbox.setValue(base + (1 if oi < rem else 0))
-                        else:
-                            spinbox.setValue(50)
-                        self.tree.setItemWidget(opt_item, 3, spinbox)
-
-                    sub_item.setExpanded(True)
-
-            elif rule_key == 'blank_filling':
-                # Check for saved text entries
-                saved_texts = None
-                saved_probs = None
-                if saved_rule and 'blank_filling' in saved_rule:
-                    data = saved_rule['blank_filling']
-                    if isinstance(data, list) and len(data) == 2:
-                        saved_texts, saved_probs = data
-
-                if saved_texts and saved_probs:
-                    for ti, (text, prob) in enumerate(zip(saved_texts, saved_probs)):
-                        self._add_text_entry(q_item, text, prob)
-                else:
-                    # Default: 2 example entries
-                    self._add_text_entry(q_item, '示例文本1', 50)
-                    self._add_text_entry(q_item, '示例文本2', 50)
-
-                # Add "add text" button
-                add_item = QTreeWidgetItem(q_item)
-                add_item.setData(0, Qt.ItemDataRole.UserRole, {'role': 'add_button'})
-                add_btn = QPushButton("+ 添加文本")
-                add_btn.setFlat(True)
-                self.tree.setItemWidget(add_item, 2, add_btn)
-                add_btn.clicked.connect(lambda checked, qi=q_item: self._add_text_entry(qi))
-
-            q_item.setExpanded(True)
-
-    def _add_text_entry(self, q_item, text='示例文本', prob=50):
-        """Add a text entry child to a blank-filling question item."""
-        # Count existing text entries
-        text_count = 0
-        add_btn_index = q_item.childCount()
-        for i in range(q_item.childCount()):
-            child_data = q_item.child(i).data(0, Qt.ItemDataRole.UserRole)
-            if child_data and child_data.get('role') == 'text_entry':
-                text_count += 1
-            if child_data and child_data.get('role') == 'add_button':
-                add_btn_index = i
-
-        entry_item = QTreeWidgetItem()
-        entry_item.setText(0, f"  文本{text_count + 1}")
-        entry_item.setData(0, Qt.ItemDataRole.UserRole, {'role': 'text_entry'})
-
-        q_item.insertChild(add_btn_index, entry_item)
-
-        line_edit = QLineEdit(text)
-        self.tree.setItemWidget(entry_item, 2, line_edit)
-
-        spinbox = QSpinBox()
-        spinbox.setRange(0, 100)
-        spinbox.setValue(prob)
-        spinbox.setSuffix("%")
-        self.tree.setItemWidget(entry_item, 3, spinbox)
+        self.tree_model.load(parsed_questions, rules)
+        self.tree.expandAll()
+
+    def update_tree(self, parsed_questions, rules=None):
+        """Update the tree in place, rebuilding only questions that changed.
+
+        Args:
+            parsed_questions: List of parsed question dicts.
+            rules: Optional list of rule dicts with saved probabilities.
+        """
+        self._commit_open_editor()
+        rebuilt = self.tree_model.update(parsed_questions, rules)
+        if rebuilt is None:
+            self.tree.expandAll()
+            return
+        for row in rebuilt:
+            self.tree.expandRecursively(self.tree_model.index(row, 0))
+
+    def _tree_clicked(self, index):
+        """Add a text entry when the "add text" row of a question is clicked."""
+        if index.column() == TEXT_COLUMN and self.tree_model.is_add_text_row(index):
+            self.tree_model.add_text_entry(index.parent())
+
+    def _tree_context_menu(self, pos):
+        """Offer switching a blank-filling question to/from an external text pool."""
+        index = self.tree.indexAt(pos)
+        if index.isValid() and index.parent().isValid():
+            index = index.parent()
+        index = index.siblingAtColumn(0)
+        if not self.tree_model.is_blank_question(index):
+            return
+
+        menu = QMenu(self.tree)
+        pool_action = menu.addAction("使用文本池文件...")
+        weighted_action = menu.addAction("使用带权重的文本池文件 (权重<Tab>文本)...")
+        inline_action = menu.addAction("改用内联文本") if self.tree_model.text_pool(index) else None
+        action = menu.exec(self.tree.viewport().mapToGlobal(pos))
+        if action is None or (action is not inline_action
+                              and action not in (pool_action, weighted_action)):
+            return
+
+        self._commit_open_editor()
+        if action is inline_action:
+            self.tree_model.set_text_pool(index, None)
+        else:
+            file_path, _ = QFileDialog.getOpenFileName(
+                self, "选择文本池文件", "", "文本文件 (*.txt *.tsv);;所有文件 (*)")
+            if not file_path:
+                return
+            self.tree_model.set_text_pool(index, {'text_pool': file_path,
+                                                  'weighted': action is weighted_action})
+        self.tree.expandRecursively(index)
 
     def build_rules_from_tree(self):
-        """Build rules list from the current tree widget state."""
-        rules = []
-        for i in range(self.tree.topLevelItemCount()):
-            q_item = self.tree.topLevelItem(i)
-            data = q_item.data(0, Qt.ItemDataRole.UserRole)
-            if not data:
-                continue
-            rule_key = data.get('rule_key', '')
-
-            if rule_key in ('radio_selection', 'multiple_selection', 'dropdown_selection'):
-                probs = []
-                for j in range(q_item.childCount()):
-                    child = q_item.child(j)
-                    spinbox = self.tree.itemWidget(child, 3)
-                    if spinbox:
-                        probs.append(spinbox.value())
-                rules.append({rule_key: probs})
-
-            elif rule_key == 'matrix_radio_selection':
-                sub_probs = []
-                for j in range(q_item.childCount()):
-                    sub_item = q_item.child(j)
-                    sub_data = sub_item.data(0, Qt.ItemDataRole.UserRole)
-                    if sub_data and sub_data.get('role') == 'sub_question':
-                        probs = []
-                        for k in range(sub_item.childCount()):
-                            opt_item = sub_item.child(k)
-                            spinbox = self.tree.itemWidget(opt_item, 3)
-                            if spinbox:
-                                probs.append(spinbox.value())
-                        sub_probs.append(probs)
-                rules.append({'matrix_radio_selection': sub_probs})
-
-            elif rule_key == 'blank_filling':
-                texts = []
-                probs = []
-                for j in range(q_item.childCount()):
-                    child = q_item.child(j)
-                    child_data = child.data(0, Qt.ItemDataRole.UserRole)
-                    if child_data and child_data.get('role') == 'text_entry':
-                        line_edit = self.tree.itemWidget(child, 2)
-                        spinbox = self.tree.itemWidget(child, 3)
-                        if line_edit and spinbox:
-                            texts.append(line_edit.text())
-                            probs.append(spinbox.value())
-                rules.append({'blank_filling': [texts, probs]})
-
-        return rules
+        """Build rules list from the current tree state."""
+        self._commit_open_editor()
+        return self.tree_model.to_rules()
+
+    def _commit_open_editor(self):
+        """Write back a cell that is still being edited."""
+        editor = self.tree.focusWidget() if self.tree.state() == QAbstractItemView.State.EditingState else None
+        if editor is not None:
+            self.tree.commitData(editor)
+
+    def get_question_topics(self):
+        """Topics of the configured questions, aligned with build_rules_from_tree."""
+        return self.tree_model.topics()
 
     def clear_tree(self):
-        """Clear the tree widget."""
-        self.tree.clear()
+        """Clear the tree."""
+        self.tree_model.load([])
 
     def equalize_probabilities(self):
         """Set all probabilities to equal distribution."""
-        for i in range(self.tree.topLevelItemCount()):
-            q_item = self.tree.topLevelItem(i)
-            data = q_item.data(0, Qt.ItemDataRole.UserRole)
-            if not data:
-                continue
-            rule_key = data.get('rule_key', '')
-
-            if rule_key in ('radio_selection', 'blank_filling', 'dropdown_selection'):
-                spinboxes = []
-                for j in range(q_item.childCount()):
-                    child = q_item.child(j)
-                    child_data = child.data(0, Qt.ItemDataRole.UserRole)
-                    if child_data and child_data.get('role') in ('option', 'text_entry'):
-                        spinbox = self.tree.itemWidget(child, 3)
-                        if spinbox:
-                            spinboxes.append(spinbox)
-                if spinboxes:
-                    base = 100 // len(spinboxes)
-                    rem = 100 % len(spinboxes)
-                    for idx, sb in enumerate(spinboxes):
-                        sb.setValue(base + (1 if idx < rem else 0))
-
-            elif rule_key == 'multiple_selection':
-                for j in range(q_item.childCount()):
-                    child = q_item.child(j)
-                    spinbox = self.tree.itemWidget(child, 3)
-                    if spinbox:
-                        spinbox.setValue(50)
-
-            elif rule_key == 'matrix_radio_selection':
-                for j in range(q_item.childCount()):
-                    sub_item = q_item.child(j)
-                    sub_data = sub_item.data(0, Qt.ItemDataRole.UserRole)
-                    if sub_data and sub_data.get('role') == 'sub_question':
-                        spinboxes = []
-                        for k in range(sub_item.childCount()):
-                            opt_item = sub_item.child(k)
-                            spinbox = self.tree.itemWidget(opt_item, 3)
-                            if spinbox:
-                                spinboxes.append(spinbox)
-                        if spinboxes:
-                            base = 100 // len(spinboxes)
-                            rem = 100 % len(spinboxes)
-                            for idx, sb in enumerate(spinboxes):
-                                sb.setValue(base + (1 if idx < rem else 0))
+        self._commit_open_editor()
+        self.tree_model.equalize()
 
     # --- Thread-safe update methods via signals ---
 
@@ -474,6 +317,8 @@ class WorkflowView(QWidget):
     def _set_running_state_slot(self, is_running):
         with QMutexLocker(self._mutex):
             self._running_state = is_running
+        self.process_spinbox.setEnabled(not is_running)
+        self.pipeline_checkbox.setEnabled(not is_running)
         if is_running:
             self.start_button.setEnabled(False)
             self.stop_button.setEnabled(True)
@@ -489,9 +334,6 @@ class WorkflowView(QWidget):
         with QMutexLocker(self._mutex):
             return self._running_state
 
-    def _analysis_complete_slot(self, questions):
-        self.populate_tree(questions)
-
     # --- Dialogs ---
 
     def show_info(self, title, message):